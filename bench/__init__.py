@@ -0,0 +1,7 @@
+"""
+오프라인 벤치마크 도구 모음
+
+- mock_nedrug_server: 의약품안전나라 목록/상세/첨부파일을 흉내내는 로컬 HTTP 서버
+- run_bench: 모의 서버를 상대로 세 스크립트의 처리량/지연시간을 측정
+- make_fixtures: 샘플 공문 PDF 재생성
+"""
@@ -0,0 +1,66 @@
+"""
+벤치마크용 샘플 PDF(공문) 생성 스크립트
+
+bench/fixtures/*.pdf 는 저장소에 포함되어 있으므로 평소에는 실행할 필요가 없습니다.
+공문 문구를 바꾸고 싶을 때만 PyMuPDF 가 설치된 환경에서 다시 생성합니다.
+
+사용법:
+    python -m bench.make_fixtures
+"""
+
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 파일명 -> 페이지별 본문 (실제 공문의 주요 문구 배치를 흉내냄)
+SAMPLE_PDFS = {
+    "sample_opinion.pdf": [
+        "식 품 의 약 품 안 전 처\n"
+        "수신  수신자 참조\n"
+        "(경유)\n"
+        "제목  의약품 허가사항 변경명령(안) 의견조회(Acetaminophen 성분 제제)\n"
+        "1. 관련: 약사법 제31조의 4\n"
+        "2. 위 성분 제제에 대한 허가사항 변경명령(안)을 붙임과 같이 알려드리니\n"
+        "   의견이 있는 경우 의견제출기한: 2024. 5. 31. 까지 제출하여 주시기 바랍니다.\n"
+        "   - 의견수렴기간: 2024. 5. 1. ~ 2024. 5. 31.\n",
+        "붙임  변경명령(안) 1부.  끝.\n"
+        "식품의약품안전처장\n"
+        "시행  의약품안전평가과-1234 (2024. 5. 1.)  접수\n",
+    ],
+    "sample_command.pdf": [
+        "식 품 의 약 품 안 전 처\n"
+        "수신  수신자 참조\n"
+        "제목  의약품 허가사항 변경명령 알림(Ibuprofen 성분 제제)\n"
+        "1. 위 성분 제제의 허가사항을 붙임과 같이 변경하도록 명령합니다.\n"
+        "2. 허가반영일자: 2024. 7. 15.\n",
+        "붙임  변경대비표 1부.  끝.\n"
+        "식품의약품안전처장\n"
+        "시행  의약품안전평가과-2345 (2024. 6. 20.)  접수\n",
+    ],
+    "sample_preview.pdf": [
+        "식 품 의 약 품 안 전 처\n"
+        "제목  의약품 허가사항 변경명령 사전예고 알림(Metformin 성분 제제)\n"
+        "○ 허가사항 변경 명령 예정일: 2024. 9. 1.\n"
+        "○ 의견수렴기간 : 2024. 8. 1. ~ 2024. 8. 21.\n",
+    ],
+}
+
+
+def make_fixtures(target_dir=FIXTURES_DIR):
+    """SAMPLE_PDFS 내용으로 텍스트 레이어가 있는 PDF 생성"""
+    import fitz  # PyMuPDF
+
+    os.makedirs(target_dir, exist_ok=True)
+    for filename, pages in SAMPLE_PDFS.items():
+        doc = fitz.open()
+        for page_text in pages:
+            page = doc.new_page()
+            page.insert_text((56, 72), page_text, fontname="korea", fontsize=11)
+        path = os.path.join(target_dir, filename)
+        doc.save(path, garbage=4, deflate=True)
+        doc.close()
+        print(f"✅ 생성: {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    make_fixtures()
@@ -0,0 +1,370 @@
+"""
+의약품안전나라(nedrug.mfds.go.kr) 로컬 모의 서버
+
+저장된 목록/상세 페이지 템플릿과 샘플 PDF로 다음 경로를 흉내냅니다.
+    /CCBAR01F012/getList                 목록 (page, limit 파라미터)
+    /CCBAR01F012/getList/getItem         상세 (infoNo 파라미터)
+    (다른 게시판 경로 .../getList, .../getList/getItem 도 같은 목록/상세를 내려줌 - 여러 게시판 수집 시험용)
+    /cmn/edms/down/{docId}               첨부파일 (HEAD, Range: bytes=0-0 지원)
+
+응답 지연(latency_ms, jitter_ms)과 오류율(error_rate, 503 응답)을 설정할 수 있습니다.
+
+사용법:
+    python -m bench.mock_nedrug_server --port 8765 --items 200 --latency-ms 30 --error-rate 0.02
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, quote, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+STATUSES = ["변경명령(안) 의견조회", "사전예고", "변경명령", "종료"]
+INGREDIENTS = [
+    ("아세트아미노펜", "Acetaminophen"),
+    ("이부프로펜", "Ibuprofen"),
+    ("메트포르민염산염", "Metformin Hydrochloride"),
+    ("암로디핀베실산염", "Amlodipine Besylate"),
+    ("세티리진염산염", "Cetirizine Hydrochloride"),
+]
+# 상태별로 내려줄 샘플 공문
+STATUS_PDF = {
+    "변경명령(안) 의견조회": "sample_opinion.pdf",
+    "사전예고": "sample_preview.pdf",
+    "변경명령": "sample_command.pdf",
+    "종료": "sample_command.pdf",
+}
+# 사용하지 않는 대용량 첨부파일(ZIP) 크기
+ZIP_ATTACHMENT_BYTES = 2 * 1024 * 1024
+
+
+def _load_template(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+def _load_pdf(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+class MockCatalog:
+    """모의 서버가 내려줄 항목/첨부파일 목록 (항목 번호로 결정적으로 생성)"""
+
+    def __init__(self, items=100, per_page=10, zip_every=3):
+        self.items = items
+        self.per_page = per_page
+        self.zip_every = zip_every
+        self.list_template = _load_template("list_page.html")
+        self.row_template = _load_template("list_row.html")
+        self.detail_template = _load_template("detail_page.html")
+        self.attachment_template = _load_template("attachment_row.html")
+        self.pdfs = {name: _load_pdf(name) for name in set(STATUS_PDF.values())}
+        self.zip_bytes = b"PK\x03\x04" + b"\0" * (ZIP_ATTACHMENT_BYTES - 4)
+
+    @property
+    def total_pages(self):
+        return max(1, (self.items + self.per_page - 1) // self.per_page)
+
+    def item(self, index):
+        """index: 0 이 가장 최신 항목"""
+        info_no = 20240000 + (self.items - index)
+        status = STATUSES[index % len(STATUSES)]
+        ingredient_ko, ingredient_en = INGREDIENTS[index % len(INGREDIENTS)]
+        month = index % 12 + 1
+        return {
+            'index': index,
+            'sequence': self.items - index,
+            'info_no': info_no,
+            'status': status,
+            'title': f"{ingredient_ko} 성분 제제 허가사항 변경명령 ({info_no})",
+            'ingredient_ko': ingredient_ko,
+            'ingredient_en': ingredient_en,
+            'registered': f"2024-{month:02d}-01",
+            'submit_deadline': f"2024-{month:02d}-28" if status == "변경명령(안) 의견조회" else "",
+            'reflect_date': f"2024-{month:02d}-15" if status in ("변경명령", "종료") else "",
+        }
+
+    def item_by_info_no(self, info_no):
+        index = self.items - (info_no - 20240000)
+        if 0 <= index < self.items:
+            return self.item(index)
+        return None
+
+    def attachments(self, item):
+        """(doc_id, filename) 목록. 일부 항목에는 사용하지 않는 ZIP 첨부파일도 붙음"""
+        info_no = item['info_no']
+        files = [(f"D{info_no}P", f"[공문] {item['ingredient_ko']} 성분 제제 변경명령.pdf")]
+        if self.zip_every and item['index'] % self.zip_every == 0:
+            files.append((f"D{info_no}Z", f"{item['ingredient_ko']} 허가사항 변경대비표.zip"))
+        return files
+
+    def attachment_body(self, doc_id):
+        """docId -> (본문, Content-Type, 파일명). 없으면 None"""
+        if not doc_id.startswith("D") or len(doc_id) < 3 or not doc_id[1:-1].isdigit():
+            return None
+        item = self.item_by_info_no(int(doc_id[1:-1]))
+        if item is None:
+            return None
+        for candidate_id, filename in self.attachments(item):
+            if candidate_id == doc_id:
+                if doc_id.endswith("Z"):
+                    return self.zip_bytes, "application/zip", filename
+                return self.pdfs[STATUS_PDF[item['status']]], "application/pdf", filename
+        return None
+
+    def render_list(self, base_url, page, list_path="/CCBAR01F012/getList"):
+        start = (page - 1) * self.per_page
+        rows = []
+        for index in range(start, min(start + self.per_page, self.items)):
+            item = self.item(index)
+            rows.append(self.row_template.substitute(
+                sequence=item['sequence'],
+                detail_href=f"{base_url}{list_path}/getItem?infoNo={item['info_no']}&infoClassCode=4",
+                title=item['title'],
+                category="의약품",
+                registered=item['registered'],
+                reflect_date=item['reflect_date'],
+                status=item['status'],
+            ))
+        pagination = "\n".join(
+            f'    <a href="#list" onclick="goPage({p})">{p}</a>' for p in range(1, min(self.total_pages, 10) + 1)
+        )
+        return self.list_template.substitute(
+            rows="".join(rows),
+            pagination=pagination,
+            last_page_href=f"{base_url}{list_path}?totalPages={self.total_pages}&page={self.total_pages}&limit={self.per_page}",
+        )
+
+    def render_detail(self, item):
+        content = (
+            f"{item['ingredient_ko']} 성분 제제에 대한 허가사항 변경명령 관련 안내입니다.\n"
+            f"○ 허가사항 변경 명령 예정일 : {item['registered'][:4]}.{int(item['registered'][5:7])}.20\n"
+        )
+        attachments = "".join(
+            self.attachment_template.substitute(seq_num=i, filename=filename, doc_id=doc_id)
+            for i, (doc_id, filename) in enumerate(self.attachments(item), 1)
+        )
+        return self.detail_template.substitute(
+            title=item['title'],
+            status=item['status'],
+            submit_deadline=item['submit_deadline'],
+            reflect_date=item['reflect_date'],
+            content=content,
+            ingredient_ko=item['ingredient_ko'],
+            ingredient_en=item['ingredient_en'],
+            attachments=attachments,
+        )
+
+
+class MockNedrugHandler(BaseHTTPRequestHandler):
+    server_version = "MockNedrug/1.0"
+    protocol_version = "HTTP/1.1"
+    # 헤더/본문이 따로 전송될 때 Nagle 지연(약 40ms)이 측정값에 섞이지 않도록 비활성화
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- 공통 처리 ---
+
+    def _delay_and_maybe_fail(self):
+        server = self.server
+        delay_ms = server.latency_ms + (server.rng.uniform(0, server.jitter_ms) if server.jitter_ms else 0)
+        if delay_ms:
+            time.sleep(delay_ms / 1000.0)
+        if server.error_rate and server.rng.random() < server.error_rate:
+            server.stats.record("error", 0)
+            self._send(503, b"Service Unavailable", "text/plain; charset=utf-8")
+            return True
+        return False
+
+    def _send(self, status, body, content_type, extra_headers=None, head_only=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _base_url(self):
+        host = self.headers.get("Host") or f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+        return f"http://{host}"
+
+    # --- 라우팅 ---
+
+    def do_HEAD(self):
+        self._route(head_only=True)
+
+    def do_GET(self):
+        self._route(head_only=False)
+
+    def _route(self, head_only):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if self._delay_and_maybe_fail():
+            return
+        if parsed.path.endswith("/getList"):
+            self._list(parsed.path, query, head_only)
+        elif parsed.path.endswith("/getList/getItem"):
+            self._detail(query, head_only)
+        elif parsed.path.startswith("/cmn/edms/down/"):
+            self._download(parsed.path.rsplit("/", 1)[-1], head_only)
+        else:
+            self._send(404, b"Not Found", "text/plain; charset=utf-8", head_only=head_only)
+
+    def _list(self, list_path, query, head_only):
+        catalog = self.server.catalog
+        page = int(query.get('page', ['1'])[0] or 1)
+        if 'totalPages' not in query and page > catalog.total_pages:
+            # 실제 사이트처럼 범위를 넘는 페이지는 totalPages 가 붙은 마지막 페이지로 이동
+            location = f"{list_path}?totalPages={catalog.total_pages}&page={catalog.total_pages}&limit={catalog.per_page}"
+            self._send(302, b"", "text/html; charset=utf-8", {"Location": location}, head_only)
+            return
+        body = catalog.render_list(self._base_url(), page, list_path).encode('utf-8')
+        self.server.stats.record("list", len(body))
+        self._send(200, body, "text/html; charset=utf-8", head_only=head_only)
+
+    def _detail(self, query, head_only):
+        try:
+            info_no = int(query.get('infoNo', ['0'])[0])
+        except ValueError:
+            info_no = 0
+        item = self.server.catalog.item_by_info_no(info_no)
+        if item is None:
+            self._send(404, b"Not Found", "text/plain; charset=utf-8", head_only=head_only)
+            return
+        body = self.server.catalog.render_detail(item).encode('utf-8')
+        self.server.stats.record("detail", len(body))
+        self._send(200, body, "text/html; charset=utf-8", head_only=head_only)
+
+    def _download(self, doc_id, head_only):
+        found = self.server.catalog.attachment_body(doc_id)
+        if found is None:
+            self._send(404, b"Not Found", "text/plain; charset=utf-8", head_only=head_only)
+            return
+        body, content_type, filename = found
+        headers = {
+            "Content-Disposition": f"attachment; filename=\"{quote(filename)}\"",
+            "ETag": '"' + hashlib.md5(body).hexdigest() + '"',
+            "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+            "Accept-Ranges": "bytes",
+        }
+        if head_only:
+            self.server.stats.record("head", 0)
+            self._send(200, body, content_type, headers, head_only=True)
+            return
+        if self.headers.get("Range", "").strip() == "bytes=0-0":
+            headers["Content-Range"] = f"bytes 0-0/{len(body)}"
+            self.server.stats.record("range", 1)
+            self._send(206, body[:1], content_type, headers)
+            return
+        self.server.stats.record("download", len(body))
+        self._send(200, body, content_type, headers)
+
+
+class ServerStats:
+    """경로 종류별 요청 수/전송 바이트 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.bytes_sent = {}
+
+    def record(self, kind, n_bytes):
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            self.bytes_sent[kind] = self.bytes_sent.get(kind, 0) + n_bytes
+
+    def snapshot(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'bytes_sent': dict(self.bytes_sent)}
+
+
+class MockNedrugServer:
+    """
+    스레드에서 동작하는 모의 서버
+
+        with MockNedrugServer(items=50, latency_ms=20) as server:
+            scraper.base_url = server.list_url
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, items=100, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=0):
+        self.httpd = ThreadingHTTPServer((host, port), MockNedrugHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.catalog = MockCatalog(items=items)
+        self.httpd.latency_ms = latency_ms
+        self.httpd.jitter_ms = jitter_ms
+        self.httpd.error_rate = error_rate
+        self.httpd.rng = random.Random(seed)
+        self.httpd.stats = ServerStats()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def list_url(self):
+        return f"{self.base_url}/CCBAR01F012/getList"
+
+    @property
+    def catalog(self):
+        return self.httpd.catalog
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    def detail_url(self, info_no):
+        return f"{self.base_url}/CCBAR01F012/getList/getItem?infoNo={info_no}&infoClassCode=4"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의약품안전나라 로컬 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--items", type=int, default=100, help="목록 항목 수")
+    parser.add_argument("--latency-ms", type=float, default=0, help="응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="추가 무작위 지연 상한 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockNedrugServer(args.host, args.port, args.items, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    print(f"🧪 모의 서버 시작: {server.list_url}")
+    print(f"   항목 {args.items}개, 지연 {args.latency_ms}ms(+{args.jitter_ms}ms), 오류율 {args.error_rate:.0%}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n모의 서버 종료")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""
+오프라인 벤치마크 실행기
+
+로컬 모의 서버(bench.mock_nedrug_server)를 띄우고 다음 시나리오의 처리량/지연시간을 측정합니다.
+    url_beta         IntegratedNedrugScraper: 목록 수집 + 상세 내용 추출
+    url_beta_cached  같은 수집을 HTTP 캐시(nedrug_http_cache)가 채워진 상태에서 다시 실행
+    downloader       MFDSFileDownloader: 상세 페이지 파싱 + 첨부파일 다운로드
+    downloader_batch MFDSFileDownloader.download_batch: 같은 작업을 연결 풀 + 작업 스레드로 일괄 처리
+    boards           nedrug_boards.BoardCrawler: 등록된 게시판 전체(모의 서버)를 한 번에 수집
+    finale_extract   nedrug_extract 의 PDF 텍스트/날짜 추출 함수 (엔진별)
+    report           엑셀 보고서 작성: 예전 pandas 방식 대비 nedrug_report (--report-rows 건수별, 서버 불필요)
+
+사용법:
+    python -m bench.run_bench --items 100 --latency-ms 20 --output bench_result.json
+    python -m bench.run_bench --compare bench_result.json      # 이전 결과 대비 회귀 확인
+
+--compare 로 넘긴 결과보다 처리량이 --threshold 이상 떨어진 시나리오가 있으면 종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+import warnings
+
+from bench.mock_nedrug_server import FIXTURES_DIR, MockNedrugServer
+from nedrug_http_cache import HttpCache
+from nedrug_metrics import start_metrics_server
+from nedrug_profile import profiler
+from nedrug_retry import RetryQueue
+
+SAMPLE_PDFS = ["sample_opinion.pdf", "sample_command.pdf", "sample_preview.pdf"]
+
+# 키워드 사전 검색(NEDRUG_KEYWORD_PREFILTER)을 켜고 끈 결과가 같아야 하는 본문 (날짜가 키워드에서 먼 경우 포함)
+PREFILTER_TEXTS = [
+    "이 고시는 공포한 날부터 시행 합니다. " + "부칙 내용 " * 30 + " (2024. 5. 1.)",
+    "의견제출기한:\n" + " " * 130 + "2024.5.31",
+    "시행 관련 안내 " + "가" * 200 + "\n끝 (2023. 2. 2.) 시행일: 2024년 3월 3일",
+    "2024년 6월 1일" + " " * 80 + "\n부터 시행 예정\n허가반영일자:" + "\t" * 150 + "2024.7.15",
+    "반영 참고 까지 예정 안내\n" * 50 + "변경 반영일자 : 2024 7 15",
+]
+
+
+@contextlib.contextmanager
+def _quiet(enabled=True):
+    """스크립트들의 진행 상황 출력은 벤치마크 결과에 섞이지 않도록 숨김"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _scenario_result(name, items, elapsed, server=None, extra=None):
+    data = profiler.summary()
+    result = {
+        'scenario': name,
+        'items': items,
+        'elapsed_s': round(elapsed, 4),
+        'items_per_sec': round(items / elapsed, 3) if elapsed > 0 else 0.0,
+        'bytes_transferred': data['bytes_transferred'],
+        'stages': data['stages'],
+        'counters': data['counters'],
+    }
+    if server is not None:
+        result['server'] = server.stats.snapshot()
+    if extra:
+        result.update(extra)
+    return result
+
+
+def _retry_stats(queue):
+    """재시도 큐 결과: 다시 시도해 성공한 작업 수와 끝까지 실패한 작업 수"""
+    counters = profiler.summary()['counters']
+    retried = sum(value for key, value in counters.items() if key.startswith("retry_succeeded_"))
+    return {'retried': retried, 'dead': len(queue.dead)}
+
+
+def bench_url_beta(server, quiet=True, http_cache=None, name="url_beta"):
+    """IntegratedNedrugScraper 전체 수집(목록 + 상세) 처리량"""
+    from nedrug_url_beta import IntegratedNedrugScraper
+
+    scraper = IntegratedNedrugScraper()
+    scraper.base_url = server.list_url
+    scraper.page_delay = 0
+    scraper.http_cache = http_cache or HttpCache(enabled=False)
+    scraper.retry_queue = RetryQueue(base_delay=0.01)  # 실패 보관소 파일은 남기지 않음
+
+    profiler.reset()
+    start = time.perf_counter()
+    with _quiet(quiet):
+        links = scraper.collect_all_urls()
+        details, failed = scraper.extract_details_from_urls(links, delay=0)
+    elapsed = time.perf_counter() - start
+    return _scenario_result(name, len(details), elapsed, server,
+                            {'links': len(links), 'failed': len(failed), **_retry_stats(scraper.retry_queue)})
+
+
+def bench_url_beta_cached(server, quiet=True):
+    """url_beta 를 한 번 실행해 HTTP 캐시를 채운 뒤, 두 번째 실행(재실행) 처리량"""
+    with tempfile.TemporaryDirectory(prefix="nedrug_bench_cache_") as cache_dir:
+        http_cache = HttpCache(cache_dir, enabled=True)
+        bench_url_beta(server, quiet, http_cache)
+        requests_before = sum(server.stats.snapshot()['requests'].values())
+        result = bench_url_beta(server, quiet, http_cache, name="url_beta_cached")
+    result['server_requests'] = sum(result['server']['requests'].values()) - requests_before
+    return result
+
+
+def bench_downloader(server, limit=None, quiet=True):
+    """MFDSFileDownloader 로 상세 페이지별 첨부파일 다운로드 처리량"""
+    from mfds_downloader import MFDSFileDownloader
+
+    downloader = MFDSFileDownloader()
+    downloader.base_url = server.base_url
+    downloader.download_delay = 0
+    downloader.http_cache = HttpCache(enabled=False)
+
+    catalog = server.catalog
+    count = min(limit or catalog.items, catalog.items)
+    info_numbers = [catalog.item(i)['info_no'] for i in range(count)]
+
+    profiler.reset()
+    with tempfile.TemporaryDirectory(prefix="nedrug_bench_") as download_dir:
+        start = time.perf_counter()
+        succeeded = 0
+        with _quiet(quiet):
+            for info_no in info_numbers:
+                if downloader.download_attachments_from_url(server.detail_url(info_no), download_dir):
+                    succeeded += 1
+        elapsed = time.perf_counter() - start
+    return _scenario_result("downloader", succeeded, elapsed, server, {'pages': count})
+
+
+def bench_downloader_batch(server, limit=None, workers=4, quiet=True):
+    """MFDSFileDownloader.download_batch 로 같은 상세 페이지들을 일괄 다운로드할 때의 처리량"""
+    from mfds_downloader import SUCCESS_STATUSES, MFDSFileDownloader
+
+    downloader = MFDSFileDownloader()
+    downloader.base_url = server.base_url
+    downloader.download_delay = 0
+    downloader.http_cache = HttpCache(enabled=False)
+    downloader.retry_queue = RetryQueue(base_delay=0.01)  # 실패 보관소 파일은 남기지 않음
+
+    catalog = server.catalog
+    count = min(limit or catalog.items, catalog.items)
+    info_numbers = [str(catalog.item(i)['info_no']) for i in range(count)]
+
+    profiler.reset()
+    with tempfile.TemporaryDirectory(prefix="nedrug_bench_") as download_dir:
+        start = time.perf_counter()
+        with _quiet(quiet):
+            manifest = downloader.download_batch(info_numbers, download_dir, workers=workers)
+        elapsed = time.perf_counter() - start
+    succeeded = len({row['info_no'] for row in manifest if row['status'] in SUCCESS_STATUSES})
+    return _scenario_result("downloader_batch", succeeded, elapsed, server,
+                            {'pages': count, 'workers': workers, **_retry_stats(downloader.retry_queue)})
+
+
+def bench_boards(server, workers=4, quiet=True):
+    """BoardCrawler 로 등록된 모든 게시판을 모의 서버에서 동시에 수집할 때의 처리량"""
+    from nedrug_boards import BOARDS, BoardCrawler, BoardDefinition
+
+    boards = [BoardDefinition.from_dict({'site_url': server.base_url, 'verified': True}, board) for board in BOARDS.values()]
+    crawler = BoardCrawler(boards, workers=workers, rate=0, http_cache=HttpCache(enabled=False),
+                           retry_queue=RetryQueue(base_delay=0.01))  # 실패 보관소 파일은 남기지 않음
+
+    profiler.reset()
+    start = time.perf_counter()
+    with _quiet(quiet):
+        results = crawler.crawl()
+    elapsed = time.perf_counter() - start
+    items = sum(len(records) for records in results.values())
+    return _scenario_result("boards", items, elapsed, server,
+                            {'boards': len(boards), 'workers': workers, 'failed': len(crawler.failed),
+                             **_retry_stats(crawler.retry_queue)})
+
+
+def bench_finale_extract(repeat=20, quiet=True):
+    """PDF 텍스트 추출 엔진(fitz/PyPDF2)과 날짜 추출 함수별 지연시간"""
+    import nedrug_extract as finale
+
+    pdf_paths = [os.path.join(FIXTURES_DIR, name) for name in SAMPLE_PDFS]
+    results = {}
+
+    engines = {
+        'fitz': finale._extract_text_from_pdf_with_fitz,
+        'pypdf2': finale._extract_text_from_pdf_with_pypdf2,
+    }
+    for engine_name, extract in engines.items():
+        profiler.reset()
+        start = time.perf_counter()
+        with _quiet(quiet):
+            for _ in range(repeat):
+                for path in pdf_paths:
+                    extract(path)
+        elapsed = time.perf_counter() - start
+        results[engine_name] = _scenario_result(f"finale_extract[{engine_name}]", repeat * len(pdf_paths), elapsed)
+
+    profiler.reset()
+    start = time.perf_counter()
+    found = {'exec': 0, 'submit': 0, 'plan': 0, 'reflect': 0, 'ingredient': 0}
+    with _quiet(quiet):
+        for _ in range(repeat):
+            for path in pdf_paths:
+                # finale 파이프라인과 같이 PDF 를 한 번 mmap 해서 텍스트/시행날짜 추출에 함께 사용
+                with finale.PdfSource.open(path) as pdf:
+                    text = finale._extract_text_from_pdf_with_fitz(pdf)
+                    found['exec'] += bool(finale.extract_exec_date_from_pdf(pdf))
+                found['submit'] += bool(finale.extract_submit_deadline_from_pdf(text))
+                found['plan'] += bool(finale.extract_plan_date_from_pdf(text))
+                found['reflect'] += bool(finale.extract_reflect_date_from_pdf(text))
+                found['ingredient'] += bool(finale.extract_ingredient_name_from_pdf(text))
+    elapsed = time.perf_counter() - start
+    results['pipeline'] = _scenario_result("finale_extract[pipeline]", repeat * len(pdf_paths), elapsed,
+                                           extra={'fields_found': found,
+                                                  'prefilter_mismatches': check_keyword_prefilter(finale)})
+    return results
+
+
+def check_keyword_prefilter(finale):
+    """PREFILTER_TEXTS 에서 키워드 사전 검색을 켜고 끈 추출 결과가 다른 본문 수"""
+    extractors = [finale.extract_exec_date_from_text, finale.extract_submit_deadline_from_pdf,
+                  finale.extract_plan_date_from_pdf, finale.extract_reflect_date_from_pdf]
+    previous = os.environ.get("NEDRUG_KEYWORD_PREFILTER")
+    mismatches = 0
+    try:
+        for text in PREFILTER_TEXTS:
+            outputs = []
+            for enabled in ("1", "0"):
+                os.environ["NEDRUG_KEYWORD_PREFILTER"] = enabled
+                outputs.append([extract(text) for extract in extractors])
+            if outputs[0] != outputs[1]:
+                mismatches += 1
+                print(f"❌ 키워드 사전 검색 결과 불일치: {outputs[0]} != {outputs[1]} ({text[:40]!r}...)")
+    finally:
+        if previous is None:
+            os.environ.pop("NEDRUG_KEYWORD_PREFILTER", None)
+        else:
+            os.environ["NEDRUG_KEYWORD_PREFILTER"] = previous
+    return mismatches
+
+
+def _report_records(count, pdf_dir):
+    """보고서 벤치마크용 가상 레코드 (단계/성분/PDF 유무가 섞이도록)"""
+    from nedrug_ingredients import default_dictionary
+    from nedrug_records import FinaleRecord
+
+    stages = ["의견조회", "사전예고", "변경명령", "변경명령"]
+    names = default_dictionary().names() or ["Acetaminophen"]
+    pdf_paths = []
+    for i in range(20):
+        path = os.path.join(pdf_dir, f"공문_{i}.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+        pdf_paths.append(path)
+    records = []
+    for i in range(count):
+        stage = stages[i % len(stages)]
+        records.append(FinaleRecord(
+            title=f"[{i}] {names[i % len(names)]} 성분 제제 허가사항 {stage}",
+            stage=stage,
+            exec_date="2024-05-01" if stage != "사전예고" else "",
+            submit_deadline="2024-04-15" if stage == "의견조회" else "",
+            plan_date="2024-06-01" if stage == "사전예고" else "",
+            reflect_date="2024-05-20" if stage == "변경명령" else "",
+            ingredient=names[(i * 7) % len(names)],
+            url=f"https://nedrug.mfds.go.kr/CCBAR01F012/getList/getItem?infoNo={20240000 + i}&infoClassCode=4",
+            pdf_path=pdf_paths[i % len(pdf_paths)] if i % 3 else os.path.join(pdf_dir, f"없음_{i}.pdf"),
+        ))
+    return records
+
+
+def _legacy_pandas_report(records, output_path):
+    """비교 기준: 예전 write_excel_report 의 pandas 방식 (단계별 DataFrame 복사 + to_excel + 칸 덮어쓰기)"""
+    import pandas as pd
+    from nedrug_ingredients import group_by_ingredient
+    from nedrug_records import FinaleRecord, records_to_rows
+
+    df = pd.DataFrame.from_records(records_to_rows(records), columns=FinaleRecord.KEYS).drop_duplicates()
+    sheets = {
+        '의견조회': (['A_제목', 'B_단계', 'C_시행날짜', 'D_제출날짜', 'G_원료성분명', 'H_관련 URL', 'I_관련 PDF'],
+                 ['제목', '단계', '시행날짜', '제출날짜', '원료/성분명(영문)', '관련 URL', 'PDF파일']),
+        '사전예고': (['A_제목', 'B_단계', 'E_예정일', 'G_원료성분명', 'H_관련 URL', 'I_관련 PDF'],
+                 ['제목', '단계', '예정일', '원료/성분명(영문)', '관련 URL', 'PDF파일']),
+        '변경명령': (['A_제목', 'B_단계', 'C_시행날짜', 'F_반영일자', 'G_원료성분명', 'H_관련 URL', 'I_관련 PDF'],
+                 ['제목', '단계', '시행날짜', '반영일자', '원료/성분명(영문)', '관련 URL', 'PDF파일']),
+    }
+    with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+        hyperlink_format = writer.book.add_format({'font_color': 'blue', 'underline': 1})
+        for sheet_name, (keys, titles) in sheets.items():
+            stage_df = df[df['B_단계'] == sheet_name].copy()
+            if stage_df.empty:
+                continue
+            final = stage_df[keys]
+            final.columns = titles
+            final.to_excel(writer, sheet_name=sheet_name, index=False)
+            worksheet = writer.sheets[sheet_name]
+            url_col_idx = final.columns.get_loc('관련 URL')
+            for row_num, url in enumerate(final['관련 URL'], start=1):
+                if url:
+                    worksheet.write_url(row_num, url_col_idx, url, hyperlink_format, url)
+            pdf_col_idx = final.columns.get_loc('PDF파일')
+            for row_num, pdf_path in enumerate(final['PDF파일'], start=1):
+                if pdf_path and os.path.exists(pdf_path):
+                    worksheet.write_string(row_num, pdf_col_idx, os.path.basename(pdf_path))
+                else:
+                    worksheet.write_string(row_num, pdf_col_idx, "")
+        groups = group_by_ingredient(df.to_dict('records'))
+        rows = [{'원료/성분명(영문)': name, '건수': len(group),
+                 '의견조회': sum(1 for row in group if row['B_단계'] == '의견조회'),
+                 '사전예고': sum(1 for row in group if row['B_단계'] == '사전예고'),
+                 '변경명령': sum(1 for row in group if row['B_단계'] == '변경명령'),
+                 '제목': " / ".join(dict.fromkeys(row['A_제목'] for row in group))}
+                for name, group in groups.items() if name]
+        if rows:
+            pd.DataFrame(rows).to_excel(writer, sheet_name='성분별', index=False)
+
+
+def bench_report(row_counts=(10000, 100000), quiet=True):
+    """엑셀 보고서 작성 시간: 예전 pandas 방식 vs nedrug_report (xlsxwriter 직접 쓰기, +CSV 부가 출력)"""
+    from nedrug_report import write_workbook
+
+    writers = {
+        'pandas': _legacy_pandas_report,
+        'xlsxwriter': lambda records, path: write_workbook(records, path, side_outputs=[]),
+        'xlsxwriter+csv': lambda records, path: write_workbook(records, path, side_outputs=["csv"]),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nedrug_bench_report_") as work_dir:
+        for count in row_counts:
+            records = _report_records(count, work_dir)
+            for writer_name, write in writers.items():
+                output_path = os.path.join(work_dir, f"report_{writer_name}_{count}.xlsx")
+                profiler.reset()
+                start = time.perf_counter()
+                with _quiet(quiet), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")  # 예전 방식의 하이퍼링크 수/셀 길이 초과 경고
+                    write(records, output_path)
+                elapsed = time.perf_counter() - start
+                results[f"{writer_name},{count}"] = _scenario_result(
+                    f"report[{writer_name},{count}]", count, elapsed,
+                    extra={'file_bytes': os.path.getsize(output_path)})
+    return results
+
+
+def compare_results(current, baseline, threshold):
+    """처리량이 threshold 비율 이상 떨어진 시나리오 목록 반환"""
+    regressions = []
+    for name, result in current.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('items_per_sec'):
+            continue
+        change = (result['items_per_sec'] - previous['items_per_sec']) / previous['items_per_sec']
+        result['change_vs_baseline'] = round(change, 4)
+        if change < -threshold:
+            regressions.append((name, previous['items_per_sec'], result['items_per_sec'], change))
+    return regressions
+
+
+def print_results(results):
+    print("\n📊 벤치마크 결과")
+    print("=" * 80)
+    print(f"{'시나리오':<28}{'항목':>7}{'소요(s)':>10}{'건/초':>10}{'fetch p50':>12}{'fetch p95':>12}")
+    for name, result in results.items():
+        fetch = result['stages'].get('fetch', {})
+        p50 = f"{fetch['p50_s'] * 1000:.1f}ms" if fetch else "-"
+        p95 = f"{fetch['p95_s'] * 1000:.1f}ms" if fetch else "-"
+        print(f"{name:<28}{result['items']:>7}{result['elapsed_s']:>10.2f}{result['items_per_sec']:>10.1f}{p50:>12}{p95:>12}")
+        for stage_name, stats in result['stages'].items():
+            print(f"    - {stage_name:<10} {stats['count']:6d}회  p50 {stats['p50_s'] * 1000:8.2f}ms  "
+                  f"p95 {stats['p95_s'] * 1000:8.2f}ms  p99 {stats['p99_s'] * 1000:8.2f}ms")
+        if result.get('retried') or result.get('dead'):
+            print(f"    ↳ 재시도 성공 {result['retried']}건, 끝까지 실패 {result['dead']}건")
+        if 'change_vs_baseline' in result:
+            print(f"    ↳ 기준 대비 처리량 변화: {result['change_vs_baseline']:+.1%}")
+    print("=" * 80)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="의약품안전나라 스크립트 오프라인 벤치마크")
+    parser.add_argument("--items", type=int, default=50, help="모의 서버 목록 항목 수")
+    parser.add_argument("--latency-ms", type=float, default=0, help="모의 서버 응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="모의 서버 추가 무작위 지연 상한 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="모의 서버 503 응답 비율 (0~1)")
+    parser.add_argument("--download-limit", type=int, default=20, help="downloader 시나리오에서 처리할 상세 페이지 수")
+    parser.add_argument("--batch-workers", type=int, default=4, help="downloader_batch 시나리오의 동시 처리 수")
+    parser.add_argument("--repeat", type=int, default=20, help="finale_extract 시나리오 반복 횟수")
+    parser.add_argument("--report-rows", default="10000,100000", help="report 시나리오의 레코드 수 (쉼표 구분)")
+    parser.add_argument("--scenarios", default="url_beta,url_beta_cached,downloader,downloader_batch,boards,finale_extract",
+                        help="실행할 시나리오 (쉼표 구분)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 판정할 처리량 감소 비율")
+    parser.add_argument("--verbose", action="store_true", help="스크립트 진행 출력 표시")
+    parser.add_argument("--metrics-port", type=int,
+                        help="측정 중 계측값 HTTP 엔드포인트 포트 (0 이면 빈 포트, 외부 부하 테스트/Prometheus 가 스크랩)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    quiet = not args.verbose
+    results = {}
+    metrics_server = start_metrics_server(args.metrics_port)
+
+    with MockNedrugServer(items=args.items, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          error_rate=args.error_rate) as server:
+        print(f"🧪 모의 서버: {server.base_url} (항목 {args.items}개, 지연 {args.latency_ms}ms, 오류율 {args.error_rate:.0%})")
+        if "url_beta" in scenarios:
+            print("▶ url_beta 측정 중...")
+            results["url_beta"] = bench_url_beta(server, quiet)
+        if "url_beta_cached" in scenarios:
+            print("▶ url_beta_cached 측정 중...")
+            results["url_beta_cached"] = bench_url_beta_cached(server, quiet)
+        if "downloader" in scenarios:
+            print("▶ downloader 측정 중...")
+            results["downloader"] = bench_downloader(server, args.download_limit, quiet)
+        if "downloader_batch" in scenarios:
+            print("▶ downloader_batch 측정 중...")
+            results["downloader_batch"] = bench_downloader_batch(server, args.download_limit, args.batch_workers, quiet)
+        if "boards" in scenarios:
+            print("▶ boards 측정 중...")
+            results["boards"] = bench_boards(server, args.batch_workers, quiet)
+    if "finale_extract" in scenarios:
+        print("▶ finale_extract 측정 중...")
+        for engine_name, result in bench_finale_extract(args.repeat, quiet).items():
+            results[f"finale_extract[{engine_name}]"] = result
+    if "report" in scenarios:
+        print("▶ report 측정 중...")
+        row_counts = [int(value) for value in args.report_rows.split(",") if value.strip()]
+        for name, result in bench_report(row_counts, quiet).items():
+            results[f"report[{name}]"] = result
+
+    if metrics_server:
+        # 마지막 시나리오의 계측값을 한 번 스크랩해 엔드포인트가 응답하는지 확인
+        with urllib.request.urlopen(metrics_server.url, timeout=5) as response:
+            samples = [line for line in response.read().decode("utf-8").splitlines() if line and not line.startswith("#")]
+        print(f"📈 메트릭 스크랩: {len(samples)}개 값 ({metrics_server.url})")
+        metrics_server.stop()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+        regressions = compare_results(results, baseline, args.threshold)
+
+    print_results(results)
+
+    if args.output:
+        payload = {
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'config': vars(args),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+    if regressions:
+        print("❌ 성능 회귀 감지:")
+        for name, before, after, change in regressions:
+            print(f"   - {name}: {before:.1f} → {after:.1f} 건/초 ({change:+.1%})")
+        return 1
+    if results.get("finale_extract[pipeline]", {}).get("prefilter_mismatches"):
+        print("❌ 키워드 사전 검색을 켜면 날짜 추출 결과가 달라집니다 (finale_extract[pipeline])")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,63 @@
 
 사용법:
     python mfds_downloader.py "https://nedrug.mfds.go.kr/CCBAR01F012/getList/getItem?infoNo=20240297&infoClassCode=4"
+
+    # 여러 건 일괄 다운로드 (한 줄에 infoNo 또는 상세 URL, '-' 이면 표준입력)
+    python mfds_downloader.py --batch infono_list.txt --workers 4
+    cat infono_list.txt | python mfds_downloader.py --batch -
+
+    # 일괄 모드에서 재시도해도 실패한 건(저장 폴더/failed_tasks.jsonl)만 다시 받기
+    python mfds_downloader.py --retry-failed --output-dir downloads
 """
 
 import requests
 import os
 import sys
 import re
-from urllib.parse import urljoin, unquote
+import csv
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 import time
+import hashlib
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from nedrug_http_cache import HttpCache
+from nedrug_profile import profiler
+from nedrug_log import ProgressBar, get_logger, setup_logging
+from nedrug_paths import sanitize_filename
+from nedrug_retry import DEAD_LETTER_FILENAME, DeadLetterStore, RetryQueue
+from nedrug_attachments import (
+    MAX_ATTACHMENT_BYTES, AttachmentIndex, AttachmentValidators, check_attachment, edms_download_url,
+    parse_content_disposition_filename, probe_attachment,
+)
+
+log = get_logger("downloader")
+
+DEFAULT_BATCH_WORKERS = 4
+MANIFEST_FILENAME = "manifest.csv"
+MANIFEST_FIELDS = ['info_no', 'doc_id', 'filename', 'size', 'sha256', 'elapsed', 'status', 'path']
+
+# fetch_attachment() 결과 중 다운로드 성공으로 보는 상태
+#   downloaded: 새로 받음 / cached: 이전 실행에서 받은 파일 (변경 없음)
+#   duplicate: 같은 docId 또는 같은 내용의 파일이 이미 있음
+SUCCESS_STATUSES = ('downloaded', 'cached', 'duplicate')
+
+
+def read_batch_input(path):
+    """일괄 모드 입력 (infoNo 또는 상세 URL) 읽기. '-' 이면 표준입력, 빈 줄과 '#' 주석은 무시"""
+    stream = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8-sig')
+    try:
+        values = []
+        for line in stream:
+            line = re.sub(r'(^|\s)#.*', '', line)
+            values.extend(value for value in re.split(r'[\s,]+', line) if value)
+        return values
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
 
 class MFDSFileDownloader:
     def __init__(self):
@@ -31,40 +78,87 @@ class MFDSFileDownloader:
             'Sec-Fetch-User': '?1'
         })
         self.base_url = 'https://nedrug.mfds.go.kr'
+        self.download_delay = 1  # 첨부파일 요청 간 대기 (초)
+        self.attachment_indexes = {}  # 다운로드 폴더별 중복 제거 인덱스
+        self.attachment_validators = {}  # 다운로드 폴더별 검증값 기록
+        self._lock = threading.Lock()
+        self._in_flight = {}  # 일괄 모드에서 다른 스레드가 받고 있는 docId -> Future
+        self.http_cache = HttpCache()  # 상세 페이지 디스크 캐시
+        self.retry_queue = None  # 일괄 모드 재시도 큐 (없으면 download_batch 가 저장 폴더 기준으로 만듦)
+
+    def attachment_index(self, download_dir):
+        """다운로드 폴더의 중복 제거 인덱스 (file_id / 내용 해시)"""
+        key = os.path.abspath(download_dir)
+        with self._lock:
+            if key not in self.attachment_indexes:
+                self.attachment_indexes[key] = AttachmentIndex(download_dir)
+            return self.attachment_indexes[key]
+
+    def validators(self, download_dir):
+        """다운로드 폴더의 검증값 기록 (ETag/Last-Modified/크기)"""
+        key = os.path.abspath(download_dir)
+        with self._lock:
+            if key not in self.attachment_validators:
+                self.attachment_validators[key] = AttachmentValidators(download_dir)
+            return self.attachment_validators[key]
+
+    def close(self):
+        """다운로드 폴더별 중복 제거 인덱스와 검증값 기록의 변경 기록을 각 파일로 합침"""
+        with self._lock:
+            stores = list(self.attachment_indexes.values()) + list(self.attachment_validators.values())
+        for store in stores:
+            store.close()
+
+    def detail_url(self, value):
+        """infoNo(숫자) 또는 상세 페이지 URL -> 상세 페이지 URL"""
+        value = value.strip()
+        if value.isdigit():
+            return f"{self.base_url}/CCBAR01F012/getList/getItem?infoNo={value}&infoClassCode=4"
+        return urljoin(self.base_url + '/', value)
+
+    def use_connection_pool(self, size):
+        """동시에 size 개 요청을 보낼 수 있도록 세션의 연결 풀 크기 조정 (keep-alive 연결 재사용)"""
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def get_page_content(self, url):
         """웹페이지 내용을 가져옵니다."""
         try:
-            print("페이지 요청 중...")
-            response = self.session.get(url)
-            response.raise_for_status()
+            log.debug("페이지 요청 중...")
+            with profiler.stage("fetch"):
+                response = self.http_cache.get(self.session, url)
+                response.raise_for_status()
+            if not response.from_cache:
+                profiler.add_bytes(len(response.content))
             response.encoding = 'utf-8'
-            print(f"페이지 크기: {len(response.text)} 문자")
+            log.debug("페이지 크기: %s 문자", len(response.text))
             return response.text
         except requests.RequestException as e:
-            print(f"페이지를 가져오는 중 오류 발생: {e}")
+            log.error("페이지를 가져오는 중 오류 발생: %s", e)
             return None
     
+    @profiler.timed("parse")
     def extract_file_info(self, html_content):
         """HTML에서 첨부파일 정보를 추출합니다."""
-        print("HTML 파싱 중...")
+        log.debug("HTML 파싱 중...")
         soup = BeautifulSoup(html_content, 'html.parser')
         files = []
         
         # 실제 HTML 구조에 맞춰 수정: downEdmsFile 함수 찾기
         downedms_matches = re.findall(r"downEdmsFile\('([^']+)'\)", html_content)
-        print(f"HTML에서 발견된 downEdmsFile 호출: {len(downedms_matches)}개")
+        log.debug("HTML에서 발견된 downEdmsFile 호출: %s개", len(downedms_matches))
         for match in downedms_matches:
-            print(f"  - docId: {match}")
+            log.debug("  - docId: %s", match)
         
         # 첨부파일 테이블 찾기 (실제 HTML 구조 기반)
         # id="fileTableTr" 테이블 찾기
         file_table = soup.find('table', {'id': 'fileTableTr'})
         
         if file_table:
-            print("✓ 첨부파일 테이블 발견 (id='fileTableTr')")
+            log.debug("✓ 첨부파일 테이블 발견 (id='fileTableTr')")
             rows = file_table.find('tbody').find_all('tr')
-            print(f"테이블 행 수: {len(rows)}")
+            log.debug("테이블 행 수: %s", len(rows))
             
             for i, row in enumerate(rows):
                 cells = row.find_all('td')
@@ -78,8 +172,8 @@ class MFDSFileDownloader:
                     download_btn = download_cell.find('button')
                     if download_btn:
                         onclick = download_btn.get('onclick', '')
-                        print(f"행 {i+1}: {filename}")
-                        print(f"  onclick: {onclick}")
+                        log.debug("행 %s: %s", i+1, filename)
+                        log.debug("  onclick: %s", onclick)
                         
                         # downEdmsFile('docId') 패턴에서 docId 추출
                         doc_id_match = re.search(r"downEdmsFile\('([^']+)'\)", onclick)
@@ -90,14 +184,14 @@ class MFDSFileDownloader:
                                 'doc_id': doc_id,
                                 'seq_num': seq_num
                             })
-                            print(f"  ✓ 추출 성공 - docId: {doc_id}")
+                            log.debug("  ✓ 추출 성공 - docId: %s", doc_id)
                         else:
-                            print(f"  ✗ docId 추출 실패")
+                            log.warning("  ✗ docId 추출 실패")
         else:
-            print("✗ 첨부파일 테이블을 찾을 수 없음")
+            log.info("✗ 첨부파일 테이블을 찾을 수 없음")
             
             # 대안: 전체 HTML에서 downEdmsFile 패턴 찾기
-            print("대안 방법: 전체 HTML에서 downEdmsFile 패턴 검색...")
+            log.debug("대안 방법: 전체 HTML에서 downEdmsFile 패턴 검색...")
             buttons = soup.find_all('button')
             
             for i, button in enumerate(buttons):
@@ -123,72 +217,171 @@ class MFDSFileDownloader:
                             'doc_id': doc_id,
                             'seq_num': str(i+1)
                         })
-                        print(f"  ✓ 버튼에서 추출: {filename} - {doc_id}")
+                        log.debug("  ✓ 버튼에서 추출: %s - %s", filename, doc_id)
         
-        print(f"최종 추출된 파일 수: {len(files)}")
+        log.info("최종 추출된 파일 수: %s", len(files))
         return files
     
-    def download_file(self, doc_id, filename, download_dir='downloads'):
+    def download_file(self, doc_id, filename, download_dir='downloads', pdf_only=False, max_bytes=MAX_ATTACHMENT_BYTES):
         """파일을 다운로드합니다."""
+        return self.fetch_attachment(doc_id, filename, download_dir, pdf_only, max_bytes)['status'] in SUCCESS_STATUSES
+
+    def fetch_attachment(self, doc_id, filename, download_dir='downloads', pdf_only=False, max_bytes=MAX_ATTACHMENT_BYTES):
+        """
+        첨부파일 한 건을 다운로드하고 결과를 dict 로 반환합니다.
+
+        반환값: {'doc_id', 'filename', 'path', 'size', 'sha256', 'elapsed', 'status', 'reason'}
+            status: downloaded / cached / duplicate / skipped / failed
+        같은 docId 를 다른 스레드가 받고 있으면 그 결과를 기다렸다가 duplicate 로 반환합니다.
+        """
+        with self._lock:
+            pending = self._in_flight.get(doc_id)
+            if pending is None:
+                future = self._in_flight[doc_id] = Future()
+        if pending is not None:
+            result = dict(pending.result(), filename=filename, elapsed=0.0)
+            if result['status'] in SUCCESS_STATUSES:
+                profiler.count("attachment_dedup_file_id")
+                result['status'] = 'duplicate'
+            return result
+
+        start = time.perf_counter()
+        result = {'doc_id': doc_id, 'filename': filename, 'path': '', 'size': 0, 'sha256': '',
+                  'elapsed': 0.0, 'status': 'failed', 'reason': ''}
+        try:
+            self._fetch_attachment(result, download_dir, pdf_only, max_bytes)
+        finally:
+            result['elapsed'] = round(time.perf_counter() - start, 3)
+            with self._lock:
+                self._in_flight.pop(doc_id, None)
+            future.set_result(result)
+        return result
+
+    def _fetch_attachment(self, result, download_dir, pdf_only, max_bytes):
+        """fetch_attachment() 의 실제 처리. result 를 채웁니다."""
+        doc_id, filename = result['doc_id'], result['filename']
+        file_path = ''
+        index = None
         try:
             # 다운로드 디렉토리 생성
-            Path(download_dir).mkdir(exist_ok=True)
+            Path(download_dir).mkdir(parents=True, exist_ok=True)
+            index = self.attachment_index(download_dir)
             
-            print(f"파일 다운로드 시작: {doc_id}")
-            # 실제 파일 다운로드 (파일 존재 확인 단계 생략)
-            download_url = f"{self.base_url}/cmn/edms/down/{doc_id}"
+            # 같은 file_id 를 이미 받았다면 요청 없이 재사용
+            existing_path = index.lookup(doc_id)
+            if existing_path:
+                profiler.count("attachment_dedup_file_id")
+                log.info("이미 다운로드된 첨부파일 (docId 동일): %s", existing_path)
+                self._fill_result(result, 'duplicate', existing_path, index.content_hash(doc_id))
+                return
             
+            # 본문을 받기 전에 메타데이터(형식/크기/검증값)부터 확인
+            with profiler.stage("probe"):
+                meta = probe_attachment(self.session, doc_id, base_url=self.base_url)
+            if meta:
+                log.debug("메타데이터 확인 (%s): %s, %s bytes", meta['method'], meta['content_type'] or '형식 미상',
+                          meta['size'] if meta['size'] is not None else '?')
+            should_download, reason = check_attachment(meta, filename, pdf_only=pdf_only, max_bytes=max_bytes)
+            if not should_download:
+                if reason == 'not_pdf':
+                    log.info("PDF 파일 아님, 다운로드 생략: %s", filename)
+                elif reason == 'too_large':
+                    log.info("파일이 너무 큼 (%s bytes), 다운로드 생략: %s", meta['size'], filename)
+                result.update(status='skipped', reason=reason)
+                return
+            
+            if meta:
+                probed_path = os.path.join(download_dir, self._safe_filename(meta['filename'] or filename, doc_id, meta['content_type']))
+                cached_path = self.validators(download_dir).find(doc_id, meta, probed_path)
+                if cached_path:
+                    canonical_path = index.register(doc_id, cached_path)
+                    log.info("이미 다운로드된 파일 (변경 없음): %s", cached_path)
+                    self._fill_result(result, 'cached', canonical_path, index.content_hash(doc_id))
+                    return
+            
+            log.debug("파일 다운로드 시작: %s", doc_id)
+            # 실제 파일 다운로드
+            download_url = edms_download_url(doc_id, self.base_url)
+            
+            download_start = time.perf_counter()
             response = self.session.get(download_url, stream=True)
             response.raise_for_status()
             
             # Content-Disposition 헤더에서 실제 파일명 추출 시도
             content_disposition = response.headers.get('Content-Disposition', '')
-            print(f"Content-Disposition: {content_disposition}")
+            log.debug("Content-Disposition: %s", content_disposition)
             
             actual_filename = filename
-            if 'filename=' in content_disposition:
-                try:
-                    filename_match = re.search(r'filename[*]?=["\']?([^"\';\r\n]*)', content_disposition)
-                    if filename_match:
-                        actual_filename = unquote(filename_match.group(1))
-                        print(f"헤더에서 추출한 파일명: {actual_filename}")
-                except:
-                    pass
+            header_filename = parse_content_disposition_filename(content_disposition)
+            if header_filename:
+                actual_filename = header_filename
+                log.debug("헤더에서 추출한 파일명: %s", actual_filename)
             
             # 파일명 정리 (안전한 파일명으로 변경)
-            safe_filename = re.sub(r'[<>:"/\\|?*]', '_', actual_filename)
-            if not safe_filename.strip():
-                safe_filename = f"download_{doc_id}"
-                content_type = response.headers.get('Content-Type', '').lower()
-                if 'pdf' in content_type:
-                    safe_filename += '.pdf'
-                elif 'zip' in content_type:
-                    safe_filename += '.zip'
-                elif 'excel' in content_type or 'spreadsheet' in content_type:
-                    safe_filename += '.xlsx'
+            content_type = response.headers.get('Content-Type', '').lower()
+            safe_filename = self._safe_filename(actual_filename, doc_id, content_type)
             
-            file_path = os.path.join(download_dir, safe_filename)
+            # 새 파일로 생성 (이름만 같은 다른 첨부파일이 있으면 docId 를 붙인 이름 사용)
+            file_path, f = index.create_file(doc_id, os.path.join(download_dir, safe_filename))
             
-            # 파일 저장
-            print(f"파일 저장 중: {file_path}")
-            with open(file_path, 'wb') as f:
+            # 파일 저장 (저장하면서 내용 해시 계산)
+            log.debug("파일 저장 중: %s", file_path)
+            digest = hashlib.sha256()
+            with f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
+                    digest.update(chunk)
             
             file_size = os.path.getsize(file_path)
-            print(f"다운로드 완료: {file_path} ({file_size} bytes)")
-            return True
+            profiler.record("download", time.perf_counter() - download_start)
+            profiler.add_bytes(file_size)
+            
+            # 내용이 같은 파일이 이미 있으면 방금 받은 파일은 지우고 기존 파일을 사용
+            canonical_path = index.register(doc_id, file_path, digest.hexdigest())
+            if canonical_path != file_path:
+                profiler.count("attachment_dedup_content")
+                log.info("내용이 같은 파일이 이미 있음: %s", canonical_path)
+                self._fill_result(result, 'duplicate', canonical_path, digest.hexdigest())
+                return
+            
+            profiler.add_items()
+            log.info("다운로드 완료: %s (%s bytes)", file_path, file_size)
+            self.validators(download_dir).remember(doc_id, meta, file_path)
+            self._fill_result(result, 'downloaded', file_path, digest.hexdigest())
             
         except requests.RequestException as e:
-            print(f"파일 다운로드 중 네트워크 오류 ({filename}): {e}")
-            return False
+            log.error("파일 다운로드 중 네트워크 오류 (%s): %s", filename, e)
+            result.update(status='failed', reason=str(e))
         except Exception as e:
-            print(f"파일 저장 중 오류 발생 ({filename}): {e}")
-            return False
+            log.error("파일 저장 중 오류 발생 (%s): %s", filename, e)
+            result.update(status='failed', reason=str(e))
+        if result['status'] == 'failed' and index is not None and file_path:
+            index.discard(file_path)  # 받다가 실패한 부분 파일 삭제
+
+    @staticmethod
+    def _fill_result(result, status, path, sha256):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        result.update(status=status, path=path, size=size, sha256=sha256)
+    
+    @staticmethod
+    def _safe_filename(actual_filename, doc_id, content_type=''):
+        """파일명 정리 (안전한 파일명으로 변경, nedrug_paths.sanitize_filename)"""
+        if not (actual_filename or '').strip():
+            actual_filename = f"download_{doc_id}"
+            if 'pdf' in content_type:
+                actual_filename += '.pdf'
+            elif 'zip' in content_type:
+                actual_filename += '.zip'
+            elif 'excel' in content_type or 'spreadsheet' in content_type:
+                actual_filename += '.xlsx'
+        return sanitize_filename(actual_filename, fallback=f"download_{doc_id}")
     
     def download_attachments_from_url(self, url, download_dir='downloads'):
         """주어진 URL에서 모든 첨부파일을 다운로드합니다."""
-        print(f"페이지 분석 중: {url}")
+        log.info("페이지 분석 중: %s", url)
         
         # 페이지 내용 가져오기
         html_content = self.get_page_content(url)
@@ -199,57 +392,180 @@ class MFDSFileDownloader:
         files = self.extract_file_info(html_content)
         
         if not files:
-            print("첨부파일을 찾을 수 없습니다.")
-            print("\n디버깅을 위해 주요 부분을 확인해보세요:")
+            log.warning("첨부파일을 찾을 수 없습니다.")
+            log.info("\n디버깅을 위해 주요 부분을 확인해보세요:")
             
             # downEdmsFile 패턴 검색
             downedms_pattern = re.findall(r"downEdmsFile\([^)]+\)", html_content)
             if downedms_pattern:
-                print("=== 발견된 downEdmsFile 패턴 ===")
+                log.info("=== 발견된 downEdmsFile 패턴 ===")
                 for pattern in downedms_pattern[:5]:  # 처음 5개만 출력
-                    print(f"  {pattern}")
+                    log.info("  %s", pattern)
             
             # 첨부파일 관련 테이블 확인
             soup = BeautifulSoup(html_content, 'html.parser')
             tables_with_file = soup.find_all('table', string=re.compile('첨부파일|다운로드'))
             if tables_with_file:
-                print("=== 첨부파일 관련 테이블 발견 ===")
+                log.info("=== 첨부파일 관련 테이블 발견 ===")
                 for table in tables_with_file[:2]:  # 처음 2개만
-                    print(f"  테이블 id: {table.get('id', '없음')}")
-                    print(f"  테이블 class: {table.get('class', '없음')}")
+                    log.info("  테이블 id: %s", table.get('id', '없음'))
+                    log.info("  테이블 class: %s", table.get('class', '없음'))
             
             return False
         
-        print(f"발견된 첨부파일: {len(files)}개")
+        log.info("발견된 첨부파일: %s개", len(files))
         for i, file_info in enumerate(files, 1):
-            print(f"  {i}. {file_info['filename']} (docId: {file_info['doc_id']})")
+            log.info("  %s. %s (docId: %s)", i, file_info['filename'], file_info['doc_id'])
         
         # 각 파일 다운로드
         success_count = 0
-        for i, file_info in enumerate(files, 1):
-            print(f"\n[{i}/{len(files)}] 다운로드 중: {file_info['filename']}")
-            
-            if self.download_file(file_info['doc_id'], file_info['filename'], download_dir):
-                success_count += 1
-            
-            # 서버 부하 방지를 위한 대기
-            time.sleep(1)
+        with ProgressBar(total=len(files), desc="📥 다운로드") as progress:
+            for i, file_info in enumerate(files, 1):
+                log.debug("\n[%s/%s] 다운로드 중: %s", i, len(files), file_info['filename'])
+                
+                downloaded = self.download_file(file_info['doc_id'], file_info['filename'], download_dir)
+                if downloaded:
+                    success_count += 1
+                progress.update(ok=downloaded)
+                
+                # 서버 부하 방지를 위한 대기
+                time.sleep(self.download_delay)
         
-        print(f"\n다운로드 완료: {success_count}/{len(files)} 파일")
+        log.info("\n다운로드 완료: %s/%s 파일", success_count, len(files))
         return success_count > 0
 
-def main():
+    def _download_item(self, value, download_dir):
+        """일괄 모드 한 건: 상세 페이지 -> 첨부파일 목록 -> 다운로드. 반환값: 매니페스트 행 리스트"""
+        url = self.detail_url(value)
+        info_no = value if value.isdigit() else (re.search(r'infoNo=(\d+)', url) or [None, url])[1]
+        html_content = self.get_page_content(url)
+        if not html_content:
+            self.http_cache.invalidate(url)  # 빈 페이지는 캐시에 남기지 않음 (재시도는 네트워크에서 새로 받음)
+            return [{'info_no': info_no, 'status': 'failed'}]
+        files = self.extract_file_info(html_content)
+        if not files:
+            return [{'info_no': info_no, 'status': 'no_attachments'}]
+        rows = []
+        for i, file_info in enumerate(files):
+            if i:
+                time.sleep(self.download_delay)  # 서버 부하 방지를 위한 대기 (작업 스레드별)
+            result = self.fetch_attachment(file_info['doc_id'], file_info['filename'], download_dir)
+            rows.append(dict(result, info_no=info_no))
+        return rows
+
+    @staticmethod
+    def _failure_reason(rows):
+        return "; ".join(row.get('reason') or row.get('filename') or 'failed' for row in rows if row['status'] == 'failed')
+
+    def download_batch(self, values, download_dir='downloads', workers=DEFAULT_BATCH_WORKERS, manifest_path=None):
+        """
+        여러 상세 페이지(infoNo 또는 URL)의 첨부파일을 한 번에 다운로드합니다.
+
+        하나의 세션(연결 풀)을 workers 개 스레드가 함께 쓰고, 같은 docId 는 한 번만 받습니다.
+        결과는 매니페스트 CSV (info_no, doc_id, filename, size, sha256, elapsed, status, path) 로 저장됩니다.
+        실패한 건은 모두 끝난 뒤 백오프하며 다시 시도하고, 끝까지 실패한 건은 저장 폴더의 failed_tasks.jsonl 에 남습니다.
+        반환값: 매니페스트 행 리스트 (입력 순서)
+        """
+        values = list(dict.fromkeys(value.strip() for value in values if value.strip()))
+        workers = max(1, min(workers, len(values) or 1))
+        self.use_connection_pool(workers * 2)
+        Path(download_dir).mkdir(parents=True, exist_ok=True)
+        if self.retry_queue is None:
+            self.retry_queue = RetryQueue(dead_letters=DeadLetterStore(os.path.join(download_dir, DEAD_LETTER_FILENAME)))
+        log.info("일괄 다운로드: %s건 (동시 %s개)", len(values), workers)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                ProgressBar(total=len(values), desc="📥 일괄 다운로드") as progress:
+            futures = {executor.submit(self._download_item, value, download_dir): value for value in values}
+            for future in as_completed(futures):
+                value = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    log.error("처리 중 오류 발생 (%s): %s", value, e)
+                    rows = [{'info_no': value, 'status': 'failed'}]
+                results[value] = rows
+                progress.update(ok=any(row['status'] in SUCCESS_STATUSES for row in rows))
+                if any(row['status'] == 'failed' for row in rows):
+                    self.retry_queue.failed("download", value, {'value': value}, self._failure_reason(rows))
+
+        # 실패한 건은 백오프 후 다시 시도 (이미 받은 첨부파일은 인덱스에서 duplicate/cached 로 건너뜀)
+        def retry_item(task):
+            rows = self._download_item(task.payload['value'], download_dir)
+            results[task.payload['value']] = rows
+            task.error = self._failure_reason(rows)
+            return not any(row['status'] == 'failed' for row in rows)
+
+        self.retry_queue.run(retry_item)
+        self.attachment_index(download_dir).close()  # 변경 기록을 인덱스/검증값 파일로 합침
+        self.validators(download_dir).close()
+
+        manifest = [row for value in values for row in results.get(value, [])]
+        manifest_path = manifest_path or os.path.join(download_dir, MANIFEST_FILENAME)
+        with open(manifest_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(manifest)
+
+        counts = {}
+        for row in manifest:
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+        log.info("일괄 다운로드 완료: %s", ", ".join(f"{status} {count}" for status, count in sorted(counts.items())))
+        log.info("매니페스트 저장: %s", manifest_path)
+        if self.retry_queue.dead:
+            log.warning("재시도해도 실패한 %s건: %s (--retry-failed 로 다시 처리)", len(self.retry_queue.dead),
+                        self.retry_queue.dead_letters.path if self.retry_queue.dead_letters else "-")
+        return manifest
+
+    def retry_failed(self, download_dir='downloads', workers=DEFAULT_BATCH_WORKERS, manifest_path=None):
+        """저장 폴더의 failed_tasks.jsonl 에 남은 건만 다시 일괄 다운로드. 반환값: 매니페스트 행 리스트"""
+        store = DeadLetterStore(os.path.join(download_dir, DEAD_LETTER_FILENAME))
+        tasks = store.pending(("download",))
+        if not tasks:
+            log.info("다시 처리할 실패 작업이 없습니다: %s", store.path)
+            return []
+        log.info("실패 작업 %s건 다시 처리: %s", len(tasks), store.path)
+        for task in tasks:
+            store.resolve(task.kind, task.key)  # 이번에도 실패하면 새로 기록됨
+        self.retry_queue = RetryQueue(dead_letters=store)
+        manifest = self.download_batch([task.payload['value'] for task in tasks], download_dir, workers,
+                                       manifest_path or os.path.join(download_dir, "manifest_retry.csv"))
+        log.info("남은 실패 작업: %s건", store.compact())
+        return manifest
+
+def main(argv=None):
     """메인 함수"""
-    if len(sys.argv) != 2:
+    parser = argparse.ArgumentParser(description="의약품안전나라 첨부파일 다운로드")
+    parser.add_argument("url", nargs="?", help="상세 페이지 URL")
+    parser.add_argument("--batch", metavar="FILE", help="infoNo 또는 상세 URL 목록 파일 ('-' 이면 표준입력)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="일괄 모드 동시 처리 수")
+    parser.add_argument("--output-dir", default="downloads", help="저장 폴더")
+    parser.add_argument("--manifest", help=f"매니페스트 CSV 경로 (기본: 저장 폴더/{MANIFEST_FILENAME})")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help=f"일괄 모드에서 재시도해도 실패한 건(저장 폴더/{DEAD_LETTER_FILENAME})만 다시 받기")
+    args = parser.parse_args(argv)
+    if not args.url and not args.batch and not args.retry_failed:
         print("사용법: python mfds_downloader.py <URL>")
         print("예시: python mfds_downloader.py 'https://nedrug.mfds.go.kr/CCBAR01F012/getList/getItem?infoNo=20240297&infoClassCode=4'")
+        print("일괄: python mfds_downloader.py --batch infono_list.txt [--workers 4]")
         sys.exit(1)
     
-    url = sys.argv[1]
+    setup_logging()
     downloader = MFDSFileDownloader()
     
     try:
-        success = downloader.download_attachments_from_url(url)
+        if args.retry_failed:
+            manifest = downloader.retry_failed(args.output_dir, workers=args.workers, manifest_path=args.manifest)
+            success = all(row['status'] != 'failed' for row in manifest)
+        elif args.batch:
+            manifest = downloader.download_batch(read_batch_input(args.batch), args.output_dir,
+                                                 workers=args.workers, manifest_path=args.manifest)
+            success = any(row['status'] in SUCCESS_STATUSES for row in manifest)
+        else:
+            success = downloader.download_attachments_from_url(args.url, args.output_dir)
+        profiler.print_summary()
+        profiler.write_report(os.path.join(args.output_dir, 'run_profile_downloader'))
         if success:
             print("\n모든 작업이 완료되었습니다!")
         else:
@@ -263,6 +579,8 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        downloader.close()
 
 # JavaScript downEdmsFile 함수를 위한 추가 함수 (참고용)
 def create_js_downloader():
@@ -0,0 +1,109 @@
+"""
+다중 키워드 검색 (Aho-Corasick 오토마톤)
+
+키워드가 몇 개든 텍스트를 한 번만 훑어 모든 출현 위치를 찾습니다 (텍스트 길이 + 일치 수에 비례).
+성분명 사전(nedrug_ingredients)이 수천 개의 성분명/동의어를 찾을 때 사용합니다.
+(PDF 날짜 항목의 키워드 몇 개는 nedrug_extract 가 정규식 하나로 찾는 편이 더 빠름)
+
+    automaton = KeywordAutomaton([("acetaminophen", "Acetaminophen"), ("아세트아미노펜", "Acetaminophen")])
+    for start, end, value in automaton.finditer(text):
+        ...
+
+상태는 dict/list 로만 이루어져 있어 pickle 로 저장해 두었다가 다시 읽을 수 있습니다.
+"""
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick 오토마톤
+
+    add() 로 (키워드, 값)을 넣은 뒤 처음 검색할 때 실패 링크를 만듭니다 (build).
+    같은 키워드를 다시 add 하면 값을 덮어씁니다.
+    """
+
+    def __init__(self, keywords=()):
+        self._goto = [{}]      # 상태별 다음 문자 -> 상태
+        self._fail = [0]       # 상태별 실패 링크
+        self._out = [[]]       # 상태별 끝나는 키워드 [(길이, 값)] (build 후 실패 링크 쪽 출력 포함)
+        self._terminal = {}    # 키워드가 끝나는 상태 -> 값
+        self._built = True
+        for keyword in keywords:
+            if isinstance(keyword, str):
+                self.add(keyword)
+            else:
+                self.add(*keyword)
+
+    def __len__(self):
+        return len(self._terminal)
+
+    def add(self, keyword, value=None):
+        """keyword 추가 (value 가 없으면 keyword 자체를 값으로 사용)"""
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._terminal[state] = (len(keyword), keyword if value is None else value)
+        self._built = False
+
+    def build(self):
+        """실패 링크와 출력 목록 계산 (너비 우선)"""
+        self._out = [[] for _ in self._goto]
+        for state, output in self._terminal.items():
+            self._out[state].append(output)
+        queue = []
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                # 긴 키워드부터 나오도록 자기 출력 뒤에 실패 링크 쪽 출력을 붙임
+                self._out[next_state] = self._out[next_state] + self._out[fail]
+        self._built = True
+        return self
+
+    def finditer(self, text):
+        """text 안의 모든 키워드 출현 (start, end, value) - end 순, 같은 end 는 긴 키워드부터 (겹침 포함)"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                end = index + 1
+                for length, value in out[state]:
+                    yield end - length, end, value
+
+    def findall(self, text, accept=None):
+        """
+        겹치지 않는 일치 목록 [(start, end, value)] - 왼쪽부터, 같은 위치에서는 가장 긴 키워드
+
+        accept(text, start, end) 가 주어지면 False 를 반환한 일치는 건너뜁니다 (단어 경계 확인 등).
+        """
+        matches = sorted(self.finditer(text), key=lambda match: (match[0], match[0] - match[1]))
+        result = []
+        last_end = 0
+        for start, end, value in matches:
+            if start < last_end:
+                continue
+            if accept is not None and not accept(text, start, end):
+                continue
+            result.append((start, end, value))
+            last_end = end
+        return result
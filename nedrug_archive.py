@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+상세 내용 압축 보관소 (detail_context.txt 대체)
+
+detail_context.txt 는 실행할 때마다 전체를 다시 쓰고 해가 갈수록 커집니다.
+보관소는 상세 내용을 JSONL 레코드로 압축 세그먼트에 이어 쓰고, 작은 오프셋 인덱스로 바로 찾습니다.
+    - 레코드는 CHUNK_RECORDS 개씩 묶어 청크 단위로 압축 (청크 하나만 풀면 임의 접근 가능)
+    - 청크들은 세그먼트 파일(segment_00001.jsonl.zst 등)에 이어 붙임. 세그먼트가 SEGMENT_BYTES 를 넘으면 다음 파일
+      (청크마다 독립된 zstd 프레임/gzip 멤버라서 세그먼트 파일 전체를 zstdcat/zcat 으로도 읽을 수 있음)
+    - index.tsv: 레코드마다 infoNo, 순번, 세그먼트, 청크 오프셋/길이, 청크 안의 줄 번호, 내용 해시 (추가만 함)
+    - 같은 infoNo 가 다시 들어오면 내용이 바뀐 경우에만 새로 기록하고, 인덱스에서는 마지막 기록이 유효
+    - 압축: zstandard 가 설치되어 있으면 zstd, 없으면 gzip (환경변수 NEDRUG_ARCHIVE_CODEC 로 지정 가능)
+
+사용법:
+    python nedrug_archive.py export detail_context.txt     # 기존 텍스트 형식으로 내보내기
+    python nedrug_archive.py get 20240297                  # infoNo 로 조회
+    python nedrug_archive.py get --sequence 1234           # 순번으로 조회
+    python nedrug_archive.py stats
+
+보관소 위치: 스크립트 폴더의 detail_archive (환경변수 NEDRUG_ARCHIVE_DIR 로 변경)
+"""
+
+import argparse
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+ARCHIVE_DIRNAME = "detail_archive"
+INDEX_FILENAME = "index.tsv"
+CHUNK_RECORDS = 64
+SEGMENT_BYTES = 32 * 1024 * 1024
+CHUNK_CACHE_SIZE = 8  # 최근에 푼 청크 보관 수 (순번 순서로 내보낼 때 같은 청크를 다시 풀지 않도록)
+
+INDEX_FIELDS = ("info_no", "sequence", "segment", "offset", "length", "line", "content_hash")
+
+# 보관하는 레코드 필드 (nedrug_url_beta 의 상세 레코드와 같은 키)
+RECORD_FIELDS = ("url", "title", "original_title", "sequence", "detail_content")
+
+_CODEC_EXTENSIONS = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+
+
+def default_archive_dir():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.environ.get("NEDRUG_ARCHIVE_DIR") or os.path.join(base_dir, ARCHIVE_DIRNAME)
+
+
+def default_codec():
+    """zstandard 가 있으면 zstd, 없으면 gzip"""
+    codec = os.environ.get("NEDRUG_ARCHIVE_CODEC", "").lower()
+    if codec in _CODEC_EXTENSIONS:
+        return codec
+    return "zstd" if importlib.util.find_spec("zstandard") else "gzip"
+
+
+def compress(data, codec):
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data, codec):
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def segment_codec(segment):
+    """세그먼트 파일 이름의 확장자로 압축 방식 판별"""
+    return "zstd" if segment.endswith(_CODEC_EXTENSIONS["zstd"]) else "gzip"
+
+
+def content_hash(record):
+    text = "\x1f".join(str(record.get(field) or "") for field in RECORD_FIELDS if field != "sequence")
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def sequence_sort_key(record):
+    """detail_context.txt 와 같은 정렬 기준 (숫자 순번, 숫자가 아니면 0)"""
+    sequence = str(record.get("sequence") or "")
+    return int(sequence) if sequence.isdigit() else 0
+
+
+def write_detail_text(f, data_list):
+    """detail_context.txt 형식으로 쓰기 (순번으로 정렬)"""
+    f.write("의약품안전나라 변경명령 상세정보\n")
+    f.write(f"수집 일시: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    f.write("=" * 80 + "\n\n")
+
+    for i, data in enumerate(sorted(data_list, key=sequence_sort_key), 1):
+        title = data.get('original_title') or data.get('title', '제목 없음')
+
+        f.write(f"{data.get('sequence', i)}. {title}\n")
+        f.write(f"URL: {data['url']}\n")
+        f.write("-" * 80 + "\n")
+
+        if data['detail_content']:
+            f.write(f"{data['detail_content']}\n")
+        else:
+            f.write("내용을 찾을 수 없습니다.\n")
+
+        f.write("\n" + "=" * 80 + "\n\n")
+
+
+class DetailArchive:
+    """
+    상세 내용 압축 보관소
+
+    append() 로 넣은 레코드는 CHUNK_RECORDS 개가 모이거나 flush()/close() 할 때 기록됩니다.
+    한 프로세스 안에서는 여러 스레드가 함께 써도 됩니다.
+    """
+
+    def __init__(self, directory=None, codec=None, chunk_records=CHUNK_RECORDS, segment_bytes=SEGMENT_BYTES):
+        self.directory = directory or default_archive_dir()
+        self.codec = codec or default_codec()
+        self.chunk_records = chunk_records
+        self.segment_bytes = segment_bytes
+        self.index_path = os.path.join(self.directory, INDEX_FILENAME)
+        self.entries = {}       # info_no -> 인덱스 항목 (마지막 기록)
+        self.by_sequence = {}   # 순번 -> info_no
+        self.appended = 0
+        self.unchanged = 0
+        self._pending = []      # 아직 기록하지 않은 (info_no, 레코드, 내용 해시)
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries) + sum(1 for info_no, _, _ in self._pending if info_no not in self.entries)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    values = line.rstrip("\n").split("\t")
+                    if len(values) != len(INDEX_FIELDS):
+                        continue  # 기록 도중 중단된 줄
+                    self._add_entry(dict(zip(INDEX_FIELDS, values)))
+        except FileNotFoundError:
+            pass
+
+    def _add_entry(self, entry):
+        entry["offset"] = int(entry["offset"])
+        entry["length"] = int(entry["length"])
+        entry["line"] = int(entry["line"])
+        previous = self.entries.get(entry["info_no"])
+        if previous is not None and self.by_sequence.get(previous["sequence"]) == entry["info_no"]:
+            del self.by_sequence[previous["sequence"]]
+        self.entries[entry["info_no"]] = entry
+        if entry["sequence"]:
+            self.by_sequence[entry["sequence"]] = entry["info_no"]
+
+    def append(self, info_no, record):
+        """
+        레코드 추가. 같은 infoNo 의 마지막 기록과 내용이 같으면 기록하지 않음
+        반환값: 새로 기록(예정)이면 True
+        """
+        info_no = str(info_no)
+        data = {field: record.get(field) or "" for field in RECORD_FIELDS}
+        data["info_no"] = info_no
+        data["sequence"] = str(data["sequence"])
+        digest = content_hash(data)
+        with self._lock:
+            previous = self.entries.get(info_no)
+            if previous is not None and previous["content_hash"] == digest and previous["sequence"] == data["sequence"]:
+                self.unchanged += 1
+                return False
+            self._pending.append((info_no, data, digest))
+            self.appended += 1
+            if len(self._pending) >= self.chunk_records:
+                self._write_chunk()
+        return True
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._write_chunk()
+
+    def close(self):
+        self.flush()
+
+    def _current_segment(self):
+        """기록할 세그먼트 파일 이름 (마지막 세그먼트가 가득 찼거나 압축 방식이 다르면 다음 번호)"""
+        extension = _CODEC_EXTENSIONS[self.codec]
+        segments = self.segments()
+        if segments:
+            last = segments[-1]
+            size = os.path.getsize(os.path.join(self.directory, last))
+            if last.endswith(extension) and size < self.segment_bytes:
+                return last
+            number = int(last.split("_")[1].split(".")[0]) + 1
+        else:
+            number = 1
+        return f"segment_{number:05d}{extension}"
+
+    def _write_chunk(self):
+        """대기 중인 레코드를 청크 하나로 압축해 세그먼트 끝에 붙이고 인덱스에 추가 (self._lock 안에서 호출)"""
+        pending, self._pending = self._pending, []
+        lines = [json.dumps(data, ensure_ascii=False) for _, data, _ in pending]
+        chunk = compress(("\n".join(lines) + "\n").encode("utf-8"), self.codec)
+        segment = self._current_segment()
+        with open(os.path.join(self.directory, segment), "ab") as f:
+            offset = f.tell()
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index_lines = []
+        for line_no, (info_no, data, digest) in enumerate(pending):
+            entry = {"info_no": info_no, "sequence": data["sequence"], "segment": segment, "offset": offset,
+                     "length": len(chunk), "line": line_no, "content_hash": digest}
+            index_lines.append("\t".join(str(entry[field]).replace("\t", " ") for field in INDEX_FIELDS) + "\n")
+            self._add_entry(entry)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.writelines(index_lines)
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("segment_"))
+
+    def _read_chunk(self, segment, offset, length):
+        key = (segment, offset)
+        lines = self._chunks.get(key)
+        if lines is None:
+            with open(os.path.join(self.directory, segment), "rb") as f:
+                f.seek(offset)
+                data = decompress(f.read(length), segment_codec(segment))
+            lines = data.decode("utf-8").splitlines()
+            self._chunks[key] = lines
+            if len(self._chunks) > CHUNK_CACHE_SIZE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(key)
+        return lines
+
+    def get(self, info_no=None, sequence=None):
+        """infoNo 또는 순번으로 레코드(dict) 조회. 없으면 None"""
+        self.flush()
+        with self._lock:
+            if info_no is None:
+                info_no = self.by_sequence.get(str(sequence))
+            entry = self.entries.get(str(info_no)) if info_no is not None else None
+            if entry is None:
+                return None
+            lines = self._read_chunk(entry["segment"], entry["offset"], entry["length"])
+        return json.loads(lines[entry["line"]])
+
+    def iter_records(self, info_nos=None):
+        """유효한(마지막) 레코드를 순번 순서로. info_nos 를 주면 그 항목만"""
+        self.flush()
+        entries = list(self.entries.values()) if info_nos is None else [
+            self.entries[str(info_no)] for info_no in info_nos if str(info_no) in self.entries
+        ]
+        entries.sort(key=sequence_sort_key)
+        for entry in entries:
+            with self._lock:
+                lines = self._read_chunk(entry["segment"], entry["offset"], entry["length"])
+            yield json.loads(lines[entry["line"]])
+
+    def export_text(self, path, info_nos=None):
+        """detail_context.txt 형식으로 내보내기. 반환값: 내보낸 건수"""
+        records = list(self.iter_records(info_nos))
+        with open(path, "w", encoding="utf-8") as f:
+            write_detail_text(f, records)
+        return len(records)
+
+    def stats(self):
+        self.flush()
+        disk_bytes = sum(os.path.getsize(os.path.join(self.directory, name)) for name in self.segments())
+        return {
+            "records": len(self.entries),
+            "segments": len(self.segments()),
+            "disk_bytes": disk_bytes,
+            "index_bytes": os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0,
+            "codec": self.codec,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="상세 내용 압축 보관소")
+    parser.add_argument("--dir", help="보관소 폴더 (기본: NEDRUG_ARCHIVE_DIR 또는 스크립트 폴더의 detail_archive)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="detail_context.txt 형식으로 내보내기")
+    export_parser.add_argument("path", nargs="?", default="detail_context.txt")
+
+    get_parser = sub.add_parser("get", help="infoNo 또는 순번으로 조회")
+    get_parser.add_argument("info_no", nargs="?")
+    get_parser.add_argument("--sequence")
+
+    sub.add_parser("stats", help="보관소 상태")
+    args = parser.parse_args(argv)
+
+    archive = DetailArchive(args.dir)
+    if args.command == "export":
+        started = time.perf_counter()
+        count = archive.export_text(args.path)
+        print(f"💾 {count}건을 {args.path} 파일로 내보냈습니다. ({time.perf_counter() - started:.2f}초)")
+    elif args.command == "get":
+        record = archive.get(args.info_no, args.sequence)
+        if record is None:
+            print("❌ 해당 항목이 없습니다.")
+            return 1
+        print(f"{record['sequence']}. {record['original_title'] or record['title']}")
+        print(f"URL: {record['url']}")
+        print("-" * 80)
+        print(record['detail_content'] or "내용을 찾을 수 없습니다.")
+    else:
+        stats = archive.stats()
+        print(f"📦 레코드 {stats['records']}건, 세그먼트 {stats['segments']}개 ({stats['codec']})")
+        print(f"   압축 데이터 {stats['disk_bytes'] / 1024:.1f}KB, 인덱스 {stats['index_bytes'] / 1024:.1f}KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
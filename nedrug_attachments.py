@@ -0,0 +1,516 @@
+"""
+의약품안전나라 EDMS 첨부파일 공통 유틸리티
+
+첨부파일 본문을 받기 전에 HEAD(또는 Range: bytes=0-0 GET) 요청으로
+Content-Type, 크기, ETag/Last-Modified 를 먼저 확인합니다.
+PDF가 아니거나, 너무 크거나, 이미 받아둔 파일은 본문 전송 없이 건너뜁니다.
+AttachmentIndex 는 file_id 와 내용 해시로 같은 첨부파일을 한 번만 받고 한 번만 파싱하도록 합니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from urllib.parse import unquote
+
+from nedrug_paths import create_exclusive
+
+EDMS_BASE_URL = "https://nedrug.mfds.go.kr"
+
+# 이 크기를 넘는 첨부파일은 다운로드하지 않음 (기본 50MB)
+MAX_ATTACHMENT_BYTES = 50 * 1024 * 1024
+
+# 검증값(ETag/Last-Modified/크기) 기록 파일과 그 변경 기록 (AttachmentValidators)
+VALIDATORS_FILENAME = ".edms_validators.json"
+VALIDATORS_JOURNAL_FILENAME = ".edms_validators.journal.jsonl"
+
+# 다운로드 폴더마다 하나씩 두는 중복 제거 인덱스 파일 (file_id / 내용 해시 -> 파일)
+INDEX_FILENAME = ".edms_index.json"
+
+# 인덱스 변경 기록 (JSON Lines, 한 줄에 한 건씩 추가). save()/close() 나 다음 실행의 로딩 때 인덱스 파일로 합쳐짐
+INDEX_JOURNAL_FILENAME = ".edms_index.journal.jsonl"
+
+
+def edms_download_url(file_id, base_url=EDMS_BASE_URL):
+    """EDMS 첨부파일 다운로드 URL 생성"""
+    return f"{base_url}/cmn/edms/down/{file_id}"
+
+
+def parse_content_disposition_filename(content_disposition):
+    """Content-Disposition 헤더에서 파일명 추출 (없으면 빈 문자열)"""
+    if not content_disposition or 'filename' not in content_disposition:
+        return ""
+    try:
+        filename_match = re.search(r'filename[*]?=["\']?([^"\';\r\n]*)', content_disposition)
+        if filename_match:
+            return unquote(filename_match.group(1))
+    except Exception:
+        pass
+    return ""
+
+
+def _parse_size(headers):
+    """Content-Range(bytes 0-0/12345) 또는 Content-Length 에서 전체 크기 추출"""
+    content_range = headers.get('Content-Range', '')
+    range_match = re.search(r'/(\d+)\s*$', content_range)
+    if range_match:
+        return int(range_match.group(1))
+    content_length = headers.get('Content-Length', '')
+    if content_length.isdigit() and not content_range:
+        return int(content_length)
+    return None
+
+
+def probe_attachment(session, file_id, headers=None, timeout=15, base_url=EDMS_BASE_URL):
+    """
+    첨부파일 메타데이터만 조회합니다. 본문은 받지 않습니다.
+
+    HEAD 요청을 먼저 시도하고, 서버가 HEAD를 지원하지 않거나 필요한 헤더를 주지 않으면
+    Range: bytes=0-0 GET 요청(stream=True)으로 헤더만 읽고 연결을 닫습니다.
+    session 에는 requests.Session 또는 requests 모듈을 넘길 수 있습니다.
+
+    반환값: {'url', 'content_type', 'size', 'etag', 'last_modified', 'filename', 'method'}
+            조회에 실패하면 None
+    """
+    url = edms_download_url(file_id, base_url)
+    request_headers = dict(headers or {})
+
+    response_headers = None
+    method = ""
+    try:
+        response = session.head(url, headers=request_headers, timeout=timeout, allow_redirects=True)
+        if response.status_code < 400 and response.headers.get('Content-Type'):
+            response_headers = response.headers
+            method = "HEAD"
+    except Exception:
+        response_headers = None
+
+    if response_headers is None:
+        try:
+            request_headers['Range'] = 'bytes=0-0'
+            response = session.get(url, headers=request_headers, timeout=timeout, stream=True)
+            try:
+                if response.status_code >= 400:
+                    return None
+                response_headers = response.headers
+                method = "RANGE"
+            finally:
+                # 본문은 읽지 않고 연결만 반환
+                response.close()
+        except Exception:
+            return None
+
+    return {
+        'url': url,
+        'content_type': response_headers.get('Content-Type', '').lower(),
+        'size': _parse_size(response_headers),
+        'etag': response_headers.get('ETag', ''),
+        'last_modified': response_headers.get('Last-Modified', ''),
+        'filename': parse_content_disposition_filename(response_headers.get('Content-Disposition', '')),
+        'method': method,
+    }
+
+
+def is_pdf_attachment(meta, filename=""):
+    """메타데이터(Content-Type 또는 파일명)로 PDF 여부 판정"""
+    content_type = meta.get('content_type', '')
+    if 'pdf' in content_type:
+        return True
+    # EDMS는 종종 application/octet-stream 으로 내려주므로 파일명으로 보완
+    names = [meta.get('filename', ''), filename]
+    if not content_type or 'octet-stream' in content_type or 'download' in content_type:
+        return any(name.lower().endswith('.pdf') for name in names if name)
+    return False
+
+
+class _Journal:
+    """
+    JSON Lines 변경 기록 (한 줄에 한 건씩 추가)
+
+    기록 파일(스냅샷)을 매번 다시 쓰지 않도록 변경만 추가하고, 스냅샷으로 합친 뒤 remove() 합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0  # 스냅샷에 합치지 않은 줄 수
+        self._file = None
+
+    def replay(self):
+        """기록된 변경 (쓰다 끊긴 마지막 줄은 건너뜀)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.count += 1
+                    yield entry
+        except OSError:
+            return
+
+    def append(self, entry):
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.count += 1
+        except OSError:
+            pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """스냅샷에 합친 기록 삭제"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.count = 0
+
+
+def _write_json(path, data):
+    """임시 파일에 쓴 뒤 교체 (쓰다 끊겨도 이전 파일이 남음)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, path)
+
+
+class AttachmentValidators:
+    """
+    받아둔 첨부파일의 검증값(ETag/Last-Modified/크기) 기록 - 다음 실행에서 본문을 받기 전에 캐시 판정
+
+    directory/.edms_validators.json 에 file_id -> {'path': directory 기준 상대 경로, 'size', 'etag', 'last_modified'}
+    로 저장합니다. 실행마다 새 결과 폴더에 받는 nedrug_finale_with_url 은 실행 간에 유지되는 스크립트 폴더를 씁니다.
+    AttachmentIndex 처럼 기록할 때마다 파일 전체를 다시 쓰지 않고 변경 기록(.edms_validators.journal.jsonl)에
+    한 줄씩 추가하며, close() 때 (또는 중단됐다면 다음 실행에서 불러올 때) 기록 파일 하나로 합칩니다.
+    여러 스레드에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, VALIDATORS_FILENAME)
+        self._journal = _Journal(os.path.join(directory, VALIDATORS_JOURNAL_FILENAME))
+        self._lock = threading.Lock()
+        self._entries = {}  # file_id -> 검증값
+        self._owners = {}   # 상대 경로 -> file_id (_entries 의 역방향)
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for file_id, entry in json.load(f).items():
+                    self._apply(file_id, entry)
+        except (OSError, ValueError):
+            pass
+        for entry in self._journal.replay():
+            self._apply(entry.pop('file_id'), entry)
+        if self._journal.count:
+            self.save()  # 지난 실행이 close() 없이 끝났으면 여기서 합침
+
+    def _apply(self, file_id, entry):
+        previous = self._entries.get(file_id)
+        if previous and self._owners.get(previous['path']) == file_id:
+            del self._owners[previous['path']]
+        self._entries[file_id] = entry
+        self._owners[entry['path']] = file_id
+
+    def save(self):
+        """기록 파일을 다시 쓰고 변경 기록을 비움"""
+        with self._lock:
+            try:
+                _write_json(self.path, self._entries)
+                self._journal.remove()
+            except OSError:
+                pass
+
+    def close(self):
+        """변경 기록이 남아 있으면 기록 파일로 합침"""
+        if self._journal.count:
+            self.save()
+        with self._lock:
+            self._journal.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _relative(self, local_path):
+        try:
+            return os.path.relpath(os.path.abspath(local_path), os.path.abspath(self.directory))
+        except ValueError:
+            return os.path.abspath(local_path)  # 다른 드라이브 (Windows)
+
+    def remember(self, file_id, meta, local_path):
+        """다운로드가 끝난 파일의 검증값을 기록 (다음 실행에서 캐시 판정에 사용)"""
+        if not meta:
+            return
+        entry = {
+            'path': self._relative(local_path),
+            'size': meta.get('size'),
+            'etag': meta.get('etag', ''),
+            'last_modified': meta.get('last_modified', ''),
+        }
+        with self._lock:
+            self._apply(file_id, entry)
+            self._journal.append(dict(entry, file_id=file_id))
+
+    def find(self, file_id, meta, local_path=None):
+        """
+        이미 받아둔 동일 첨부파일이 있으면 그 경로를 반환합니다.
+
+        기록된 ETag/Last-Modified 가 서버 값과 같고 파일 크기도 일치해야 캐시로 인정합니다.
+        기록이 없으면 local_path 의 크기가 서버가 알려준 크기와 같을 때만 인정합니다.
+        """
+        size = meta.get('size') if meta else None
+        with self._lock:
+            cached = self._entries.get(file_id)
+            owner = self._owners.get(self._relative(local_path)) if local_path else None
+        if cached:
+            cached_path = os.path.join(self.directory, cached.get('path', ''))
+            if os.path.isfile(cached_path):
+                same_etag = not meta.get('etag') or cached.get('etag') == meta.get('etag')
+                same_modified = not meta.get('last_modified') or cached.get('last_modified') == meta.get('last_modified')
+                same_size = size is None or os.path.getsize(cached_path) == size
+                if same_etag and same_modified and same_size:
+                    return cached_path
+        if local_path and size is not None and os.path.isfile(local_path) and os.path.getsize(local_path) == size:
+            # 같은 경로가 다른 첨부파일의 기록으로 남아 있다면 이름만 같은 다른 파일
+            if owner in (None, file_id):
+                return local_path
+        return ""
+
+
+def check_attachment(meta, filename="", pdf_only=True, max_bytes=MAX_ATTACHMENT_BYTES):
+    """
+    프로브 결과로 다운로드 여부 판정
+
+    반환값: (다운로드 여부, 사유) - 사유는 'ok', 'not_pdf', 'too_large', 'no_meta' 중 하나
+    메타데이터를 얻지 못한 경우에는 기존 동작대로 다운로드를 허용합니다.
+    """
+    if not meta:
+        return True, 'no_meta'
+    if pdf_only and not is_pdf_attachment(meta, filename):
+        return False, 'not_pdf'
+    size = meta.get('size')
+    if max_bytes and size is not None and size > max_bytes:
+        return False, 'too_large'
+    return True, 'ok'
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AttachmentIndex:
+    """
+    첨부파일 중복 제거 인덱스 (다운로드 폴더별)
+
+    EDMS file_id 로 먼저 찾고, 처음 보는 file_id 라도 내용(sha256)이 같은 파일이 이미 있으면
+    그 파일을 그대로 사용합니다. 같은 첨부파일을 참조하는 항목들은 모두 같은 경로와
+    같은 파싱 결과(parsed)를 공유하므로, 파일마다 다운로드와 텍스트 추출은 한 번만 일어납니다.
+
+    인덱스는 download_dir/.edms_index.json 에 저장되어 다음 실행에서도 사용됩니다.
+    파일을 등록할 때마다 인덱스 전체를 다시 쓰지 않고 변경 기록(.edms_index.journal.jsonl)에 한 줄씩 추가하며,
+    save()/close() 때 (또는 중단됐다면 다음 실행에서 불러올 때) 인덱스 파일 하나로 합칩니다.
+    여러 스레드에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, download_dir):
+        self.download_dir = download_dir
+        self.path = os.path.join(download_dir, INDEX_FILENAME)
+        self._journal = _Journal(os.path.join(download_dir, INDEX_JOURNAL_FILENAME))
+        self._lock = threading.RLock()
+        self._file_ids = {}   # file_id -> sha256
+        self._contents = {}   # sha256 -> {'path': 파일명, 'size': 바이트}
+        self._paths = {}      # 파일명 -> sha256 (_contents 의 역방향)
+        self._parsed = {}     # sha256 -> 파싱 결과 dict (메모리에만 보관)
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._file_ids = dict(data.get('files', {}))
+            for content_hash, entry in data.get('contents', {}).items():
+                self._set_content(content_hash, entry)
+        except (OSError, ValueError):
+            pass
+        for entry in self._journal.replay():
+            self._apply(entry)
+        if self._journal.count:
+            self.save()  # 지난 실행이 save() 없이 끝났으면 여기서 합침
+
+    def _set_content(self, content_hash, entry):
+        previous = self._contents.get(content_hash)
+        if previous and self._paths.get(previous['path']) == content_hash:
+            del self._paths[previous['path']]
+        self._contents[content_hash] = entry
+        self._paths[entry['path']] = content_hash
+
+    def _apply(self, entry):
+        if 'path' in entry:
+            self._set_content(entry['hash'], {'path': entry['path'], 'size': entry['size']})
+        self._file_ids[entry['file_id']] = entry['hash']
+
+    def _append(self, entry):
+        """변경 하나를 메모리에 반영하고 변경 기록에 한 줄 추가 (잠금 안에서 호출)"""
+        self._apply(entry)
+        self._journal.append(entry)
+
+    def save(self):
+        """인덱스 파일을 다시 쓰고 변경 기록을 비움"""
+        with self._lock:
+            try:
+                _write_json(self.path, {'files': self._file_ids, 'contents': self._contents})
+                self._journal.remove()
+            except OSError:
+                pass
+
+    def close(self):
+        """변경 기록이 남아 있으면 인덱스 파일로 합침"""
+        with self._lock:
+            if self._journal.count:
+                self.save()
+            self._journal.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._contents)
+
+    def _content_path(self, content_hash):
+        entry = self._contents.get(content_hash)
+        if not entry:
+            return ""
+        path = os.path.join(self.download_dir, entry['path'])
+        return path if os.path.isfile(path) else ""
+
+    def _hash_of_path(self, local_path):
+        return self._paths.get(os.path.basename(local_path))
+
+    def filenames(self):
+        """등록된 (중복 제거된) 파일명 목록"""
+        with self._lock:
+            return sorted(entry['path'] for entry in self._contents.values())
+
+    def content_hash(self, file_id):
+        """file_id 의 내용 해시 (sha256, 모르면 빈 문자열)"""
+        with self._lock:
+            return self._file_ids.get(file_id, "")
+
+    def lookup(self, file_id):
+        """이미 받아둔 file_id 의 파일 경로 (없으면 빈 문자열)"""
+        with self._lock:
+            content_hash = self._file_ids.get(file_id)
+            return self._content_path(content_hash) if content_hash else ""
+
+    def create_file(self, file_id, local_path):
+        """
+        local_path 이름으로 새 파일을 만들어 (경로, 쓰기용 파일 객체) 를 반환합니다.
+
+        같은 이름의 파일이 이미 있으면 file_id 를 붙인 이름을 사용합니다 (nedrug_paths.create_exclusive).
+        파일 생성이 원자적이므로 잠금 없이 여러 스레드가 동시에 호출해도 서로 덮어쓰지 않습니다.
+        """
+        return create_exclusive(os.path.dirname(local_path) or self.download_dir, os.path.basename(local_path), file_id)
+
+    def discard(self, local_path):
+        """create_file() 로 만들었지만 등록하지 않을 파일 삭제 (다운로드 실패 등)"""
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+
+    def register(self, file_id, local_path, content_hash=None):
+        """
+        저장을 마친 파일을 등록하고 대표 경로를 반환합니다.
+
+        같은 내용의 파일이 이미 다른 경로에 있으면 방금 저장한 파일은 지우고 기존 경로를 반환합니다.
+        """
+        content_hash = content_hash or _sha256_file(local_path)
+        with self._lock:
+            existing = self._content_path(content_hash)
+            if existing and os.path.abspath(existing) != os.path.abspath(local_path):
+                try:
+                    os.remove(local_path)
+                except OSError:
+                    pass
+                canonical = existing
+                self._append({'file_id': file_id, 'hash': content_hash})
+            else:
+                self._append({'file_id': file_id, 'hash': content_hash,
+                              'path': os.path.basename(local_path), 'size': os.path.getsize(local_path)})
+                canonical = local_path
+        return canonical
+
+    def adopt(self, file_id, source_path, local_path):
+        """
+        다른 폴더(지난 실행 등)에 받아둔 파일을 local_path 이름으로 복사해 등록하고 대표 경로를 반환합니다.
+
+        source_path 가 이미 이 폴더에 있으면 복사하지 않고 등록만 합니다.
+        """
+        if os.path.dirname(os.path.abspath(source_path)) == os.path.abspath(self.download_dir):
+            return self.register(file_id, source_path)
+        local_path, f = self.create_file(file_id, local_path)
+        try:
+            with f, open(source_path, 'rb') as source:
+                shutil.copyfileobj(source, f)
+        except OSError:
+            self.discard(local_path)
+            raise
+        return self.register(file_id, local_path)
+
+    def store(self, file_id, content, local_path):
+        """
+        내려받은 내용을 저장하고 (대표 경로, 새로 저장했는지) 를 반환합니다.
+
+        같은 내용이 이미 있으면 파일을 쓰지 않고 기존 경로를 돌려줍니다.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            existing = self._content_path(content_hash)
+            if existing and self._file_ids.get(file_id) != content_hash:
+                self._append({'file_id': file_id, 'hash': content_hash})
+        if existing:
+            return existing, False
+
+        # 파일 쓰기는 잠금 밖에서 (같은 내용을 동시에 저장했다면 register 가 하나만 남김)
+        local_path, f = self.create_file(file_id, local_path)
+        with f:
+            f.write(content)
+        canonical = self.register(file_id, local_path, content_hash)
+        return canonical, canonical == local_path
+
+    def parsed(self, local_path):
+        """
+        local_path 파일의 파싱 결과를 담는 dict (같은 내용의 파일끼리 공유)
+
+        예: parsed.setdefault('text', extract(path))
+        인덱스에 없는 파일이면 경로별로 따로 보관합니다.
+        """
+        with self._lock:
+            key = self._hash_of_path(local_path) or os.path.abspath(local_path)
+            return self._parsed.setdefault(key, {})
@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+의약품안전나라 게시판 정의와 여러 게시판 동시 수집
+
+게시판마다 목록 URL, 목록 열 배치, 상세 페이지 항목, 첨부파일 선택자를 BoardDefinition 으로 등록해 두고,
+BoardCrawler 하나가 여러 게시판을 한 번의 실행에서 수집합니다.
+    - 모든 게시판이 requests 세션(연결 풀), HTTP 캐시, 요청 속도 제한(RateLimiter)을 함께 씀
+    - 목록 페이지는 게시판별로 순서대로, 상세 페이지는 작업 스레드에서 동시에 처리
+    - 결과는 게시판별 상세 내용 보관소(nedrug_archive)에 추가
+    - 실패한 목록/상세 페이지는 RetryQueue 로 백오프 후 다시 시도하고, 끝까지 실패하면 실패 보관소
+      (nedrug_url_beta/mfds_downloader 와 같은 failed_tasks.jsonl)에 남아 --retry-failed 로 다시 처리
+
+게시판은 BOARDS 에 등록되어 있고, 환경변수 NEDRUG_BOARDS_FILE 의 JSON 파일로 추가하거나 바꿀 수 있습니다.
+게시판을 지정하지 않으면 확인된(verified) 게시판만 수집합니다. 경로/열 배치를 아직 사이트에서 확인하지 않은
+게시판(safety_letter, recall)은 이름으로 지정하거나, 확인한 뒤 설정 파일에서 "verified": true 로 켭니다.
+    [{"name": "recall", "list_path": "/pbp/CCBAC03F010/getList", "columns": {"sequence": 0, "title": 2}, "verified": true}]
+
+사용법:
+    python nedrug_boards.py --list                                  # 등록된 게시판
+    python nedrug_boards.py                                         # 확인된 게시판 전체 수집
+    python nedrug_boards.py change_order safety_letter --workers 6 --rate 4 --max-pages 3
+    python nedrug_boards.py --retry-failed                          # 실패 보관소의 게시판 작업만 다시 처리
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from nedrug_archive import DetailArchive, default_archive_dir
+from nedrug_http_cache import LIST_TTL, HttpCache, detail_ttl
+from nedrug_log import ProgressBar, get_logger, setup_logging
+from nedrug_metrics import start_metrics_server
+from nedrug_profile import profiler
+from nedrug_retry import DEAD_LETTER_FILENAME, DeadLetterStore, RetryQueue
+
+log = get_logger("boards")
+
+SITE_URL = "https://nedrug.mfds.go.kr"
+DEFAULT_BOARD = "change_order"
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0     # 초당 요청 수 (모든 게시판 합계, 캐시에서 읽은 응답은 제외)
+MAX_LIST_PAGES = 200   # 무한루프 방지
+MAX_LIST_FAILURES = 3  # 목록 페이지가 연속으로 이만큼 실패하면 그 게시판 목록 순회 중단 (실패 페이지는 재시도 큐로)
+RETRY_KINDS = ("board_list", "board_detail")
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def _soup(html_content):
+    """HTML 문자열 또는 이미 파싱한 BeautifulSoup"""
+    return html_content if isinstance(html_content, BeautifulSoup) else BeautifulSoup(html_content, 'html.parser')
+
+
+class BoardDefinition:
+    """
+    게시판 하나의 목록/상세 페이지 구조
+
+    columns        목록 행의 필드 -> td 위치 (음수면 뒤에서부터). sequence, title 은 필수이고 title 칸의 <a> 가 상세 링크
+    id_param       상세 URL 에서 항목 번호를 담은 쿼리 파라미터 (없으면 URL 전체를 키로 사용)
+    detail_fields  상세 페이지 필드 -> 기본정보 표의 머리글 후보
+    attachment_selector / attachment_pattern  첨부파일 버튼과 onclick 에서 파일 ID 를 찾는 정규식
+    target_statuses 수집할 상태 값 (없으면 전체)
+    verified       경로/열 배치를 사이트에서 확인했는지 (False 면 게시판을 지정하지 않은 수집에서 제외)
+    """
+
+    def __init__(self, name, label, list_path, columns, id_param=None, detail_fields=None,
+                 attachment_selector="button[onclick]", attachment_pattern=r"downEdmsFile\('([^']+)'\)",
+                 target_statuses=None, page_size=10, site_url=SITE_URL, verified=True):
+        self.name = name
+        self.label = label
+        self.list_path = list_path
+        self.columns = dict(columns)
+        self.id_param = id_param
+        self.detail_fields = {field: tuple(labels) for field, labels in (detail_fields or {
+            "title": ("제목",),
+            "detail_content": ("내용",),
+        }).items()}
+        self.attachment_selector = attachment_selector
+        self.attachment_pattern = re.compile(attachment_pattern)
+        self.target_statuses = tuple(target_statuses) if target_statuses else None
+        self.page_size = page_size
+        self.site_url = site_url
+        self.verified = verified
+        self.min_cells = max(index + 1 if index >= 0 else -index for index in self.columns.values())
+
+    def __repr__(self):
+        return f"BoardDefinition({self.name!r}, {self.list_path!r})"
+
+    @property
+    def list_url(self):
+        return self.site_url + self.list_path
+
+    @classmethod
+    def from_dict(cls, data, base=None):
+        """JSON 설정에서 생성. base 가 있으면 그 정의에 data 의 값만 덮어씀"""
+        values = base.to_dict() if base is not None else {}
+        values.update(data)
+        return cls(**values)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "label": self.label,
+            "list_path": self.list_path,
+            "columns": self.columns,
+            "id_param": self.id_param,
+            "detail_fields": {field: list(labels) for field, labels in self.detail_fields.items()},
+            "attachment_selector": self.attachment_selector,
+            "attachment_pattern": self.attachment_pattern.pattern,
+            "target_statuses": list(self.target_statuses) if self.target_statuses else None,
+            "page_size": self.page_size,
+            "site_url": self.site_url,
+            "verified": self.verified,
+        }
+
+    def item_key(self, url, title=""):
+        """항목을 구분하는 키 (상세 URL 의 id_param 값, 없으면 URL 또는 제목)"""
+        if self.id_param:
+            match = re.search(rf"[?&]{re.escape(self.id_param)}=([^&#]+)", url or "")
+            if match:
+                return match.group(1)
+        return url or title
+
+    def is_target(self, row):
+        return self.target_statuses is None or row.get("status") in self.target_statuses
+
+    def parse_list(self, html_content, base_url=None):
+        """목록 페이지 HTML -> 행 dict 목록 (key, url 과 columns 의 필드)"""
+        soup = _soup(html_content)
+        table = soup.find('table')
+        if not table:
+            return []
+        tbody = table.find('tbody') or table
+        title_index = self.columns["title"]
+        rows = []
+        for tr in tbody.find_all('tr'):
+            cells = tr.find_all('td')
+            if len(cells) < self.min_cells:
+                continue
+            link = cells[title_index].find('a')
+            if not link or not link.get('href'):
+                continue
+            row = {field: cells[index].get_text(strip=True) for field, index in self.columns.items()}
+            row['title'] = link.get_text(strip=True)
+            row['url'] = urljoin(base_url or self.list_url, link['href'])
+            row['key'] = self.item_key(row['url'], row['title'])
+            rows.append(row)
+        return rows
+
+    def parse_detail(self, html_content):
+        """상세 페이지 HTML -> detail_fields 의 필드 dict (내용 칸은 textbox/textarea 안의 텍스트 우선)"""
+        soup = _soup(html_content)
+        labels = {label: field for field, candidates in self.detail_fields.items() for label in candidates}
+        result = {field: "" for field in self.detail_fields}
+        for row in soup.find_all('tr'):
+            cells = row.find_all(['td', 'th'])
+            if len(cells) < 2:
+                continue
+            field = labels.get(cells[0].get_text(strip=True))
+            if field and not result[field]:
+                inner = cells[1].find(['textbox', 'textarea'])
+                result[field] = (inner or cells[1]).get_text(strip=True)
+        return result
+
+    def parse_attachments(self, html_content):
+        """상세 페이지 HTML -> [(파일 ID, 파일명)]"""
+        soup = _soup(html_content)
+        attachments = []
+        for button in soup.select(self.attachment_selector):
+            match = self.attachment_pattern.search(button.get('onclick', ''))
+            if not match:
+                continue
+            filename = button.get('title', '')
+            row = button.find_parent('tr')
+            if not filename and row:
+                cells = row.find_all('td')
+                filename = cells[1].get_text(strip=True) if len(cells) >= 2 else ""
+            attachments.append((match.group(1), filename or f"첨부파일_{len(attachments) + 1}"))
+        return attachments
+
+
+BOARDS = {}
+
+
+def register_board(board):
+    BOARDS[board.name] = board
+    return board
+
+
+def get_board(name=DEFAULT_BOARD):
+    try:
+        return BOARDS[name]
+    except KeyError:
+        raise KeyError(f"등록되지 않은 게시판: {name} (사용 가능: {', '.join(BOARDS)})") from None
+
+
+def default_boards():
+    """게시판을 지정하지 않았을 때 수집할 게시판 (확인된 게시판만)"""
+    return [board for board in BOARDS.values() if board.verified]
+
+
+def load_board_file(path):
+    """JSON 파일(게시판 정의 목록)을 읽어 등록. 이미 있는 이름이면 적힌 값만 덮어씀"""
+    with open(path, 'r', encoding='utf-8') as f:
+        definitions = json.load(f)
+    for data in definitions:
+        register_board(BoardDefinition.from_dict(data, BOARDS.get(data["name"])))
+    return [data["name"] for data in definitions]
+
+
+# 허가사항 변경명령 (nedrug_url_beta / nedrug_finale_with_url / nedrug_daemon 이 처리하는 게시판)
+register_board(BoardDefinition(
+    name="change_order",
+    label="허가사항 변경명령",
+    list_path="/CCBAR01F012/getList",
+    columns={"sequence": 0, "title": 1, "change_reflect_date": 4, "status": 5},
+    id_param="infoNo",
+    target_statuses=("변경명령(안) 의견조회", "사전예고", "변경명령"),
+))
+
+# 아래 두 게시판의 경로/열 배치는 아직 사이트에서 확인하지 않은 값이라 기본 수집에서 빠집니다 (verified=False).
+# 확인한 뒤 NEDRUG_BOARDS_FILE 로 경로/열을 고치고 "verified": true 로 켭니다.
+register_board(BoardDefinition(
+    name="safety_letter",
+    label="안전성 서한",
+    list_path="/pbp/CCBAC01F010/getList",
+    columns={"sequence": 0, "title": 1, "registered": -1},
+    verified=False,
+))
+
+register_board(BoardDefinition(
+    name="recall",
+    label="회수·폐기",
+    list_path="/pbp/CCBAC03F010/getList",
+    columns={"sequence": 0, "title": 1, "registered": -1},
+    verified=False,
+))
+
+if os.environ.get("NEDRUG_BOARDS_FILE"):
+    load_board_file(os.environ["NEDRUG_BOARDS_FILE"])
+
+
+class RateLimiter:
+    """
+    여러 스레드가 함께 쓰는 요청 속도 제한 (토큰 버킷)
+
+    rate: 초당 요청 수 (0 이면 제한 없음), burst: 한 번에 몰아서 보낼 수 있는 요청 수
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            with profiler.stage("rate_wait"):
+                time.sleep(delay)
+
+
+class _RateLimitedSession:
+    """HttpCache 가 네트워크로 요청할 때만 속도 제한을 거치도록 감싼 세션"""
+
+    def __init__(self, session, limiter):
+        self.session = session
+        self.limiter = limiter
+
+    def get(self, url, **kwargs):
+        self.limiter.wait()
+        return self.session.get(url, **kwargs)
+
+
+class BoardCrawler:
+    """
+    여러 게시판을 한 번에 수집
+
+    crawl() 결과: {게시판 이름: [레코드 dict]}
+        레코드: key, sequence, original_title(목록 제목), title, url, detail_content,
+                attachments([(파일 ID, 파일명)]), 그리고 목록 열(status 등)
+    failed: 재시도해도 실패했거나 예외로 끝난 작업 [(게시판 이름, URL, 사유)]
+    """
+
+    def __init__(self, boards=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, session=None, http_cache=None,
+                 timeout=15, retry_queue=None):
+        self.boards = [get_board(board) if isinstance(board, str) else board for board in (boards or default_boards())]
+        for board in self.boards:
+            if not board.verified:
+                log.warning("⚠️  [%s] 경로/열 배치를 확인하지 않은 게시판입니다 (%s)", board.label, board.list_url)
+        self.workers = workers
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        adapter = HTTPAdapter(pool_connections=workers + len(self.boards), pool_maxsize=workers + len(self.boards))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.limiter = RateLimiter(rate)
+        self.http_cache = http_cache or HttpCache()
+        self.timeout = timeout
+        self.retry_queue = retry_queue if retry_queue is not None else RetryQueue(dead_letters=DeadLetterStore())
+        self.failed = []  # (게시판 이름, URL, 사유)
+        self._boards_by_name = {board.name: board for board in self.boards}
+        self._seen = {}  # 게시판 이름 -> 목록에서 이미 본 항목 키 (재시도한 목록 페이지의 중복 제외)
+        self._lock = threading.Lock()
+
+    def fetch(self, url, params=None, ttl=None):
+        """HTML 가져오기 (캐시 → 속도 제한 → 네트워크). 실패하면 None"""
+        try:
+            with profiler.stage("fetch"):
+                response = self.http_cache.get(_RateLimitedSession(self.session, self.limiter), url,
+                                               params=params, ttl=ttl, timeout=self.timeout)
+                response.raise_for_status()
+        except requests.RequestException as e:
+            log.warning("❌ 요청 실패 (%s): %s", url, e)
+            return None
+        if not response.from_cache:
+            profiler.add_bytes(len(response.content))
+        response.encoding = 'utf-8'
+        return response.text
+
+    def _fail(self, board, url, reason):
+        with self._lock:
+            self.failed.append((board.name, url, reason))
+
+    def _list_params(self, board, page):
+        return {'page': page, 'limit': board.page_size}
+
+    def _fetch_list_page(self, board, page):
+        return self.fetch(board.list_url, params=self._list_params(board, page), ttl=LIST_TTL)
+
+    def _new_rows(self, board, html_content):
+        """목록 페이지에서 아직 보지 않은 행 (본 것으로 기록)"""
+        with profiler.stage("parse"):
+            page_rows = board.parse_list(html_content, board.list_url)
+        with self._lock:
+            seen = self._seen.setdefault(board.name, set())
+            page_rows = [row for row in page_rows if row['key'] not in seen]
+            seen.update(row['key'] for row in page_rows)
+        return page_rows
+
+    def crawl_list(self, board, max_pages=None, start_page=1):
+        """
+        게시판 목록의 대상 행 (빈 페이지가 나오거나 이미 본 행만 나오면 중단)
+
+        실패한 페이지는 재시도 큐에 넣고 다음 페이지로 넘어갑니다. MAX_LIST_FAILURES 번 연속 실패하면 중단하고,
+        마지막 페이지는 '이 페이지부터 나머지 목록' 작업으로 큐에 넣어 재시도에 성공하면 그 뒤를 이어서 순회합니다.
+        """
+        rows, failures = [], 0
+        last_page = min(max_pages or MAX_LIST_PAGES, MAX_LIST_PAGES)
+        for page in range(start_page, last_page + 1):
+            html_content = self._fetch_list_page(board, page)
+            if html_content is None:
+                failures += 1
+                if failures >= MAX_LIST_FAILURES:
+                    log.warning("❌ [%s] 목록 페이지 %d번 연속 실패로 순회 중단", board.label, failures)
+                    self.retry_queue.failed("board_list", f"{board.name}:{page}-",
+                                            {'board': board.name, 'page': page, 'last_page': last_page},
+                                            "목록 페이지 로딩 실패 (이후 페이지 미순회)")
+                    break
+                self.retry_queue.failed("board_list", f"{board.name}:{page}", {'board': board.name, 'page': page},
+                                        "목록 페이지 로딩 실패")
+                continue
+            failures = 0
+            page_rows = self._new_rows(board, html_content)
+            if not page_rows:
+                break  # 마지막 페이지 이후 (사이트는 범위를 넘으면 마지막 페이지를 다시 보여줌)
+            rows.extend(row for row in page_rows if board.is_target(row))
+        log.info("📄 [%s] 목록 %d건", board.label, len(rows))
+        return rows
+
+    def crawl_detail(self, board, row):
+        """상세 페이지 하나 -> 레코드 dict (페이지를 받지 못하면 재시도 큐에 넣고 None)"""
+        record = self._detail(board, row)
+        if record is None:
+            self.retry_queue.failed("board_detail", row['url'], {'board': board.name, 'row': row},
+                                    "상세 페이지 로딩 실패")
+        return record
+
+    def _detail(self, board, row):
+        html_content = self.fetch(row['url'], ttl=detail_ttl(row.get('status')))
+        if html_content is None:
+            return None
+        with profiler.stage("parse"):
+            soup = _soup(html_content)
+            record = dict(row, **board.parse_detail(soup))
+            record['attachments'] = board.parse_attachments(soup)
+        record['original_title'] = row['title']
+        record['title'] = record.get('title') or row['title']
+        profiler.add_items()
+        profiler.count(f"board_{board.name}_items")
+        return record
+
+    def crawl(self, max_pages=None):
+        """
+        모든 게시판 수집. 반환값: {게시판 이름: [레코드]}
+
+        목록/상세 작업 하나가 예외로 끝나도 전체 수집은 계속하고, 그 작업은 failed 에 남깁니다.
+        """
+        results = {board.name: [] for board in self.boards}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="detail") as details, \
+                ThreadPoolExecutor(max_workers=len(self.boards), thread_name_prefix="list") as lists:
+            list_futures = {lists.submit(self.crawl_list, board, max_pages): board for board in self.boards}
+            detail_futures = {}
+            with ProgressBar(total=0, desc="📋 상세") as progress:
+                def detail_done(future):
+                    progress.update(ok=future.exception() is None and future.result() is not None)
+
+                for future in list_futures:
+                    board = list_futures[future]
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        log.warning("❌ [%s] 목록 수집 중 오류 발생: %s", board.label, e)
+                        self._fail(board, board.list_url, f"list: {e}")
+                        continue
+                    progress.total += len(rows)
+                    for row in rows:
+                        detail_future = details.submit(self.crawl_detail, board, row)
+                        detail_future.add_done_callback(detail_done)
+                        detail_futures[detail_future] = (board, row)
+                wait(detail_futures)
+        for future, (board, row) in detail_futures.items():
+            error = future.exception()
+            if error is not None:
+                log.warning("❌ [%s] 상세 처리 중 오류 발생 (%s): %s", board.label, row['url'], error)
+                profiler.count(f"board_{board.name}_errors")
+                self._fail(board, row['url'], f"detail: {error}")
+            elif future.result() is not None:
+                results[board.name].append(future.result())
+        self._run_retries(results)
+        return results
+
+    def _retry(self, task, results):
+        """
+        재시도 큐의 작업 하나 다시 처리 (성공하면 results 에 추가). 반환값: 성공 여부
+
+        캐시 항목(404 등)을 먼저 지워 재시도마다 네트워크에서 새로 받습니다.
+        """
+        board = self._boards_by_name.get(task.payload['board'])
+        if board is None:
+            return False
+        if task.kind == "board_list":
+            page = task.payload['page']
+            self.http_cache.invalidate(board.list_url, self._list_params(board, page))
+            html_content = self._fetch_list_page(board, page)
+            if html_content is None:
+                return False
+            rows = [row for row in self._new_rows(board, html_content) if board.is_target(row)]
+            if rows and task.payload.get('last_page', page) > page:
+                rows.extend(self.crawl_list(board, task.payload['last_page'], page + 1))  # 중단했던 목록 이어서 순회
+            for row in rows:
+                record = self.crawl_detail(board, row)  # 실패하면 상세 작업으로 다시 큐에
+                if record is not None:
+                    results[board.name].append(record)
+            return True
+        self.http_cache.invalidate(task.payload['row']['url'])
+        record = self._detail(board, task.payload['row'])
+        if record is None:
+            return False
+        results[board.name].append(record)
+        return True
+
+    def _run_retries(self, results):
+        """재시도 큐가 빌 때까지 처리하고, 끝까지 실패한 작업은 failed 에 남김"""
+        dead_before = len(self.retry_queue.dead)
+        retried = self.retry_queue.run(lambda task: self._retry(task, results))
+        if retried:
+            log.info("🔁 재시도 성공 %d건", len(retried))
+        for task in self.retry_queue.dead[dead_before:]:
+            board = self._boards_by_name[task.payload['board']]
+            if task.kind == "board_list":
+                self._fail(board, f"{board.list_url}?page={task.payload['page']}", "list")
+            else:
+                self._fail(board, task.key, "detail")
+
+    def retry_failed(self):
+        """
+        실패 보관소(failed_tasks.jsonl)에 남은 이 게시판들의 목록/상세 작업만 다시 처리
+
+        이미 보관소에 있는 항목은 다시 받지 않습니다. 이번에도 실패한 작업은 실패 보관소에 다시 남습니다.
+        반환값: {게시판 이름: [레코드 dict]}
+        """
+        store = self.retry_queue.dead_letters
+        tasks = [task for task in store.pending(RETRY_KINDS) if task.payload.get('board') in self._boards_by_name]
+        results = {board.name: [] for board in self.boards}
+        if not tasks:
+            print(f"✅ 다시 처리할 게시판 실패 작업이 없습니다. ({store.path})")
+            return results
+        print(f"🔁 게시판 실패 작업 {len(tasks)}건 다시 처리 ({store.path})")
+        for board in self.boards:
+            with DetailArchive(archive_dir(board)) as archive:
+                self._seen[board.name] = set(archive.entries)
+        for task in tasks:
+            if task.kind == "board_detail":  # 목록 페이지 재시도에서 같은 항목을 다시 받지 않도록
+                self._seen[task.payload['board']].add(task.payload['row']['key'])
+        for task in tasks:
+            store.resolve(task.kind, task.key)  # 이번에도 실패하면 새로 기록됨
+            if not self._retry(task, results):
+                self.retry_queue.failed(task.kind, task.key, task.payload, task.error)
+        self._run_retries(results)
+        remaining = store.compact()
+        print(f"🔁 재처리 결과: 수집 {sum(len(records) for records in results.values())}건, "
+              f"실패 보관소에 남은 작업 {remaining}건")
+        return results
+
+
+def archive_dir(board):
+    """게시판별 상세 내용 보관소 폴더 (변경명령은 nedrug_url_beta 와 같은 보관소)"""
+    base_dir = default_archive_dir()
+    return base_dir if board.name == DEFAULT_BOARD else f"{base_dir}_{board.name}"
+
+
+def save_results(results):
+    """게시판별 보관소에 추가. 반환값: {게시판 이름: (추가/변경 수, 변경 없음 수)}"""
+    summary = {}
+    for name, records in results.items():
+        with DetailArchive(archive_dir(get_board(name))) as archive:
+            for record in records:
+                archive.append(record['key'], record)
+        summary[name] = (archive.appended, archive.unchanged)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="의약품안전나라 여러 게시판 동시 수집")
+    parser.add_argument("boards", nargs="*", help="수집할 게시판 이름 (기본: 전체)")
+    parser.add_argument("--list", action="store_true", help="등록된 게시판 목록")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="상세 페이지 동시 처리 수")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="초당 요청 수 (0 이면 제한 없음)")
+    parser.add_argument("--max-pages", type=int, help="게시판별 최대 목록 페이지 수")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help=f"지난 실행에서 재시도해도 실패한 게시판 작업({DEAD_LETTER_FILENAME})만 다시 처리")
+    parser.add_argument("--metrics-port", type=int,
+                        help="진행률/계측값 HTTP 엔드포인트 포트 (Prometheus 형식, 기본: NEDRUG_METRICS_PORT)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for board in BOARDS.values():
+            note = "" if board.verified else "  (미확인 - 기본 수집 제외)"
+            print(f"{board.name:15s} {board.label}  {board.list_url}{note}")
+        return 0
+
+    setup_logging()
+    try:
+        crawler = BoardCrawler(args.boards or None, workers=args.workers, rate=args.rate)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 2
+    print(f"🔍 게시판 {len(crawler.boards)}개 수집: {', '.join(board.label for board in crawler.boards)}")
+    metrics_server = start_metrics_server(args.metrics_port)
+    try:
+        results = crawler.retry_failed() if args.retry_failed else crawler.crawl(args.max_pages)
+    finally:
+        if metrics_server:
+            metrics_server.stop()
+    for name, (appended, unchanged) in save_results(results).items():
+        print(f"📦 [{get_board(name).label}] {len(results[name])}건 수집, 보관소 {appended}건 추가/변경, {unchanged}건 변경 없음")
+    if crawler.failed:
+        print(f"⚠️ 실패 {len(crawler.failed)}건")
+        for name, url, reason in crawler.failed:
+            log.warning("   - [%s] %s %s", name, reason, url)
+    profiler.print_summary()
+    profiler.write_report("run_profile_boards")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+의약품안전나라 상주(daemon) 모드
+
+cron 으로 nedrug_finale_with_url.py 를 매번 새로 실행하면 파이썬 기동, 크롬 실행, TLS 연결,
+빈 메모리 상태를 매번 다시 준비해야 합니다. 상주 모드는 한 번 띄워 두고 다음을 계속 유지합니다.
+    - requests 세션 (keep-alive 연결 풀)로 목록 1페이지만 주기적으로 확인 (ETag/Last-Modified 조건부 요청)
+    - 목록 스냅샷, 첨부파일 중복 제거 인덱스, OCR 프로세스 풀
+    - 크롬 드라이버 (처음 필요할 때 한 번 띄워서 재사용, 오류가 나면 다음 처리 때 다시 띄움)
+
+목록에 신규/변경 항목이 보일 때만 상세 페이지/PDF/보고서 단계를 실행합니다.
+결과는 실행 폴더(nedrug_년월일_시분)에 처리 시각별 엑셀과 변경내역.csv 로 쌓입니다.
+
+사용법:
+    python nedrug_daemon.py                  # 60초마다 확인
+    python nedrug_daemon.py --interval 20
+    python nedrug_daemon.py --once           # 한 번만 확인하고 종료
+    python nedrug_daemon.py --metrics-port 9108   # http://127.0.0.1:9108/metrics 로 계측값 노출
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from nedrug_attachments import AttachmentIndex
+from nedrug_boards import DEFAULT_BOARD, get_board
+from nedrug_log import get_logger, setup_logging
+from nedrug_metrics import start_metrics_server
+from nedrug_ocr import OCR_CACHE_DIRNAME, OcrPool
+from nedrug_prefetch import PrefetchPool
+from nedrug_profile import profiler
+from nedrug_run_context import RunContext
+from nedrug_snapshot import SNAPSHOT_FILENAME, SnapshotStore, item_key
+from nedrug_state import MemoryState
+
+log = get_logger("daemon")
+
+BOARD = get_board(DEFAULT_BOARD)
+LIST_URL = BOARD.list_url
+TARGET_STATUSES = BOARD.target_statuses
+DEFAULT_INTERVAL = 60 # 초
+
+
+def parse_list_rows(html_content, base_url=LIST_URL):
+    """목록 페이지 HTML 에서 행 정보 추출 (번호, 제목, 상세 URL, 변경반영일, 상태 - 열 위치는 게시판 정의)"""
+    return BOARD.parse_list(html_content, base_url)
+
+
+class ListPoller:
+    """
+    목록 1페이지를 확인해 스냅샷과 다른(신규/변경) 행을 찾음
+
+    같은 세션을 계속 쓰므로 연결이 재사용되고, 서버가 ETag/Last-Modified 를 주면
+    조건부 요청으로 변경이 없을 때 본문 없이 304 를 받습니다.
+    """
+
+    def __init__(self, snapshot, list_url=LIST_URL, session=None, timeout=15):
+        self.snapshot = snapshot
+        self.list_url = list_url
+        self.session = session or requests.Session()
+        self.session.headers.setdefault(
+            'User-Agent',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        self.timeout = timeout
+        self._validators = {}
+        self._pending = []
+
+    def poll(self):
+        """신규/변경된 대상 행 목록 (스냅샷에 반영되기 전까지는 다음 확인에서도 다시 반환)"""
+        headers = {}
+        if self._validators.get('etag'):
+            headers['If-None-Match'] = self._validators['etag']
+        if self._validators.get('last_modified'):
+            headers['If-Modified-Since'] = self._validators['last_modified']
+
+        with profiler.stage("poll"):
+            response = self.session.get(self.list_url, params={'page': 1, 'limit': 10},
+                                        headers=headers, timeout=self.timeout)
+        profiler.count("polls")
+        if response.status_code == 304:
+            profiler.count("polls_not_modified")
+            return self._still_pending()
+        response.raise_for_status()
+        profiler.add_bytes(len(response.content))
+        response.encoding = 'utf-8'
+        self._validators = {
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+        }
+
+        changed = []
+        for row in parse_list_rows(response.text, self.list_url):
+            if row['status'] not in TARGET_STATUSES:
+                continue
+            change = self.snapshot.compare(row['key'], row['title'], row['status'], row['change_reflect_date'])
+            if change['kind'] != 'unchanged':
+                row['change'] = change
+                changed.append(row)
+        self._pending = changed
+        return changed
+
+    def _still_pending(self):
+        """304 응답일 때: 지난번에 찾았지만 아직 처리되지 않은 행"""
+        self._pending = [
+            row for row in self._pending
+            if self.snapshot.compare(row['key'], row['title'], row['status'], row['change_reflect_date'])['kind'] != 'unchanged'
+        ]
+        return list(self._pending)
+
+
+class FinaleProcessor:
+    """
+    신규/변경 행에 대해 nedrug_finale_with_url 의 상세/PDF/보고서 단계를 실행
+
+    크롬 드라이버, 첨부파일 인덱스, OCR 풀, 첨부파일 선행 다운로드 풀은 처리 사이에도 유지됩니다.
+    """
+
+    def __init__(self, ctx, snapshot, list_url=None):
+        import nedrug_finale_with_url as finale
+
+        self.finale = finale
+        self.ctx = ctx
+        self.snapshot = snapshot
+        self.list_url = list_url or finale.BASE_URL
+        self.attachment_index = AttachmentIndex(ctx.download_dir)
+        self.ocr = OcrPool(cache_dir=os.path.join(ctx.script_run_dir, OCR_CACHE_DIRNAME))
+        self.prefetch = PrefetchPool(finale.fetch_pdf_attachment)
+        self._driver = None
+
+    def _get_driver(self):
+        if self._driver is None:
+            from selenium import webdriver
+
+            log.info("🌐 크롬 드라이버 시작 (이후 재사용)")
+            with profiler.stage("browser_start"):
+                self._driver = webdriver.Chrome(options=self.ctx.chrome_options())
+        return self._driver
+
+    def _reset_driver(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+    def process(self, changed_rows):
+        """목록 1페이지에서 changed_rows 에 해당하는 행만 처리하고 보고서 저장. 반환값: 레코드 리스트"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        wanted = {row['key'] for row in changed_rows}
+        state = MemoryState() # 확인 주기마다 새로 (다음 주기에 다시 바뀐 항목은 다시 처리)
+        try:
+            driver = self._get_driver()
+            with profiler.stage("fetch"):
+                driver.get(self.list_url)
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+                )
+            rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
+            for idx, row in enumerate(rows, start=1):
+                cells = row.find_elements(By.TAG_NAME, "td")
+                if len(cells) < BOARD.min_cells:
+                    continue
+                title_cell = cells[BOARD.columns['title']]
+                href = title_cell.find_element(By.TAG_NAME, "a").get_attribute("href")
+                if item_key(href, title_cell.text.strip()) not in wanted:
+                    continue
+                self.finale.process_single_item(driver, row, idx, self.attachment_index, state, self.ctx,
+                                                self.ocr, self.snapshot, self.prefetch)
+        except Exception as e:
+            log.error("❌ 상세/PDF 처리 중 오류 발생 (다음 확인 때 크롬을 다시 띄웁니다): %s", e)
+            self._reset_driver()
+
+        records = self.finale.finalize_records(state, self.ctx, self.ocr, self.snapshot)
+        if records:
+            filename = f"신규_변경_{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+            self.finale.write_excel_report(records, self.ctx, self.attachment_index, filename=filename)
+        return records
+
+    def close(self):
+        self._reset_driver()
+        self.prefetch.close()
+        self.ocr.close()
+        self.attachment_index.close()
+        self.ctx.close()
+
+
+class NedrugDaemon:
+    """주기적으로 목록을 확인하고, 신규/변경 항목이 있을 때만 processor 를 실행"""
+
+    def __init__(self, poller, processor, interval=DEFAULT_INTERVAL):
+        self.poller = poller
+        self.processor = processor
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run_once(self):
+        """한 번 확인. 반환값: 처리한 행 수"""
+        try:
+            changed = self.poller.poll()
+        except requests.RequestException as e:
+            log.warning("⚠️  목록 확인 실패: %s", e)
+            profiler.count("polls_failed")
+            return 0
+        if not changed:
+            log.debug("변경 없음 (%s)", datetime.now().strftime("%H:%M:%S"))
+            return 0
+
+        new_count = sum(1 for row in changed if row['change']['kind'] == 'new')
+        log.info("🆕 신규 %d건, 변경 %d건 감지", new_count, len(changed) - new_count)
+        for row in changed:
+            log.info("   - [%s] %s (%s)", row['key'], row['title'], row['status'])
+        started = time.perf_counter()
+        self.processor.process(changed)
+        log.info("✅ 처리 완료 (%.1f초)", time.perf_counter() - started)
+        return len(changed)
+
+    def run_forever(self):
+        log.info("🔁 상주 모드 시작: %s초마다 목록 확인 (%s)", self.interval, self.poller.list_url)
+        while not self.stop_event.is_set():
+            cycle_start = time.monotonic()
+            self.run_once()
+            # 처리 시간을 뺀 만큼만 대기 (처리가 길면 바로 다음 확인)
+            self.stop_event.wait(max(0.0, self.interval - (time.monotonic() - cycle_start)))
+        log.info("🛑 상주 모드 종료")
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="의약품안전나라 상주 모드 (신규/변경 항목 자동 처리)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="목록 확인 주기 (초)")
+    parser.add_argument("--once", action="store_true", help="한 번만 확인하고 종료")
+    parser.add_argument("--list-url", default=LIST_URL, help="목록 URL (테스트 서버 등)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="진행률/계측값 HTTP 엔드포인트 포트 (Prometheus 형식, 기본: NEDRUG_METRICS_PORT)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    metrics_server = start_metrics_server(args.metrics_port)
+    ctx = RunContext().prepare()
+    snapshot = SnapshotStore(os.path.join(ctx.script_run_dir, SNAPSHOT_FILENAME))
+    print(f"📸 목록 스냅샷: {len(snapshot)}건")
+
+    daemon = NedrugDaemon(ListPoller(snapshot, args.list_url),
+                          FinaleProcessor(ctx, snapshot, args.list_url),
+                          interval=args.interval)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        if args.once:
+            daemon.run_once()
+        else:
+            daemon.run_forever()
+    finally:
+        daemon.processor.close()
+        if metrics_server:
+            metrics_server.stop()
+        profiler.print_summary()
+        profiler.write_report(os.path.join(ctx.excel_save_dir, "run_profile_daemon"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
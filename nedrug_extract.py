@@ -0,0 +1,490 @@
+"""
+nedrug_finale_with_url 의 PDF/텍스트 추출 함수 모음
+
+selenium, pandas 등 무거운 의존성 없이 import 할 수 있도록 분리한 모듈입니다.
+PyMuPDF(fitz)와 PyPDF2 는 실제로 PDF 텍스트를 추출할 때 처음 로드됩니다.
+
+PDF 를 받는 함수는 파일 경로 대신 PdfSource 도 받습니다. PdfSource 는 방금 다운로드한 bytes 나
+저장된 파일의 mmap 을 fitz.open(stream=...) / PyPDF2 PdfReader 에 복사 없이 넘겨주므로,
+같은 PDF 를 여러 번 파싱해도 디스크에서 다시 읽지 않습니다.
+
+    from nedrug_extract import extract_submit_deadline_from_pdf
+
+    with PdfSource.open(pdf_path, downloaded_bytes) as pdf:
+        text = _extract_text_from_pdf_with_fitz(pdf)
+        exec_date = extract_exec_date_from_pdf(pdf)
+"""
+
+import contextlib
+import functools
+import io
+import logging
+import mmap
+import os
+import re
+
+from nedrug_ingredients import canonical_ingredient, default_dictionary
+from nedrug_log import get_logger
+from nedrug_paths import sanitize_filename
+from nedrug_profile import profiler
+
+log = get_logger("extract")
+
+# --- PDF 내용 공유 (다운로드 bytes / mmap) ---
+
+class PdfSource:
+    """
+    파서들이 함께 쓰는 PDF 내용
+
+    data 가 있으면 (다운로드한 bytes) 그대로 쓰고, 없으면 파일을 읽기 전용 mmap 으로 엽니다.
+    close() 전까지 fitz/PyPDF2 가 같은 버퍼를 읽습니다.
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self._data = data
+        self._file = None
+        self._mmap = None
+
+    @classmethod
+    def open(cls, path, data=None):
+        source = cls(path, data)
+        if data is None:
+            source._file = open(path, 'rb')
+            try:
+                source._mmap = mmap.mmap(source._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: # 빈 파일은 mmap 할 수 없음
+                source._data = b""
+            profiler.count("pdf_mmap" if source._mmap is not None else "pdf_read")
+        return source
+
+    def view(self):
+        """fitz.open(stream=...) / hashlib 용 memoryview (복사 없음)"""
+        return memoryview(self._mmap if self._mmap is not None else self._data)
+
+    def stream(self):
+        """PyPDF2 PdfReader 용 파일 객체 (mmap 자체 또는 bytes 를 공유하는 BytesIO)"""
+        if self._mmap is not None:
+            self._mmap.seek(0)
+            return self._mmap
+        return io.BytesIO(self._data)
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass # 아직 버퍼를 참조하는 문서 객체가 있으면 가비지 컬렉션 때 해제됨
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@contextlib.contextmanager
+def _pdf_source(pdf):
+    """경로면 mmap 으로 열었다가 닫고, 이미 PdfSource 면 그대로 사용"""
+    if isinstance(pdf, PdfSource):
+        yield pdf
+    else:
+        with PdfSource.open(pdf) as source:
+            yield source
+
+
+def _pdf_name(pdf):
+    return os.path.basename(pdf.path if isinstance(pdf, PdfSource) else pdf)
+
+
+def _open_fitz(pdf):
+    import fitz  # PyMuPDF - 실제로 PDF를 열 때만 로드
+    if isinstance(pdf, PdfSource):
+        return fitz.open(stream=pdf.view(), filetype="pdf")
+    return fitz.open(pdf)
+
+
+def _open_pypdf2(pdf):
+    from PyPDF2 import PdfReader  # 실제로 PDF를 열 때만 로드
+    return PdfReader(pdf.stream() if isinstance(pdf, PdfSource) else pdf)
+
+
+# --- 유틸리티 함수 정의 (중복 제거 및 가독성 향상) ---
+
+@profiler.timed("pdf_text")
+def _extract_text_from_pdf_with_fitz(pdf_path):
+    """PyMuPDF(fitz)를 사용하여 PDF에서 텍스트 추출 (pdf_path: 경로 또는 PdfSource)"""
+    try:
+        with _open_fitz(pdf_path) as doc:
+            full_text = "\n".join(page.get_text() for page in doc)
+        return full_text if full_text.strip() else ""
+    except Exception as e:
+        log.warning("        ⚠️  PyMuPDF로 PDF 텍스트 추출 실패: %s", e)
+        return ""
+
+@profiler.timed("pdf_text")
+def _extract_text_from_pdf_with_pypdf2(pdf_path):
+    """PyPDF2를 사용하여 PDF에서 텍스트 추출 (pdf_path: 경로 또는 PdfSource)"""
+    try:
+        reader = _open_pypdf2(pdf_path)
+        full_text = "\n".join(page.extract_text() for page in reader.pages)
+        return full_text if full_text.strip() else ""
+    except Exception as e: # PDF Read Error(PyPDF2.errors.PdfReadError) 및 기타 예외 처리
+        log.warning("        ⚠️  PyPDF2로 PDF 텍스트 추출 실패: %s", e)
+        return ""
+
+@profiler.timed("pdf_text")
+def extract_pdf_page_texts(pdf_path):
+    """PDF 페이지별 텍스트 리스트 (검색 색인용). PyMuPDF 실패 시 PyPDF2 사용"""
+    try:
+        with _open_fitz(pdf_path) as doc:
+            return [page.get_text() for page in doc]
+    except Exception as e:
+        log.debug("        ⚠️  PyMuPDF 페이지별 텍스트 추출 실패, PyPDF2 시도: %s", e)
+    try:
+        return [page.extract_text() or "" for page in _open_pypdf2(pdf_path).pages]
+    except Exception as e:
+        log.warning("        ⚠️  페이지별 텍스트 추출 실패: %s", e)
+        return []
+
+# --- 키워드 사전 검색 ---
+# 날짜 패턴마다 긴 본문 전체를 다시 훑지 않도록, 모든 항목의 키워드를 본문에서 한 번만 찾고
+# 정규식은 키워드 근처에서 시작하는 일치만 시도합니다. (NEDRUG_KEYWORD_PREFILTER=0 이면 본문 전체 검색)
+# 모든 날짜 패턴에는 그 항목의 키워드 중 하나가 들어 있고, 패턴에서 키워드 앞부분은 공백을 빼면
+# KEYWORD_WINDOW_BEFORE 글자를 넘지 않습니다 ('2024년 1월 2일부터 시행 예정' 등). 그래서 일치는 반드시
+# 어떤 키워드의 '앞 KEYWORD_WINDOW_BEFORE 글자(공백 제외) ~ 키워드 끝' 사이에서 시작하고,
+# 그 구간들을 본문 순서대로 시도하면 본문 전체를 검색한 결과(가장 앞의 일치)와 같습니다.
+# 일치가 끝나는 위치는 제한하지 않으므로 키워드에서 멀리 떨어진 날짜도 그대로 찾습니다.
+# 키워드가 몇 개뿐이라 nedrug_aho 오토마톤(파이썬 루프) 대신 긴 키워드부터 나열한 정규식 하나로 훑습니다 (C 구현이라 수십 배 빠름).
+# 정규식은 겹치는 일치를 돌려주지 않지만, 서로 겹치는 키워드('의견제출기한'/'기한', '허가반영'/'반영')는 같은 항목 키워드라
+# 긴 키워드의 시작~끝 구간이 짧은 키워드를 포함합니다.
+
+EXEC_KEYWORDS = ("시행",)
+SUBMIT_DEADLINE_KEYWORDS = ("의견제출기한", "기한", "의견수렴기간", "까지")
+PLAN_DATE_KEYWORDS = ("예정",)
+REFLECT_DATE_KEYWORDS = ("허가반영", "반영")
+
+KEYWORD_WINDOW_BEFORE = 40   # 일치가 키워드보다 앞에서 시작할 수 있는 거리 (공백 제외 글자 수)
+
+_KEYWORD_RE = re.compile("|".join(
+    re.escape(keyword) for keyword in sorted(
+        EXEC_KEYWORDS + SUBMIT_DEADLINE_KEYWORDS + PLAN_DATE_KEYWORDS + REFLECT_DATE_KEYWORDS, key=len, reverse=True)
+))
+
+
+def _prefilter_enabled():
+    return os.environ.get("NEDRUG_KEYWORD_PREFILTER", "1").lower() not in ("0", "false", "off", "no")
+
+
+@functools.lru_cache(maxsize=8)
+def keyword_hits(text):
+    """
+    text 안의 키워드 위치 {키워드: [(start, end), ...]} - 모든 키워드를 한 번에 찾음
+
+    같은 본문으로 여러 extract_* 함수를 부르므로 최근 본문 몇 개의 결과를 보관합니다.
+    """
+    hits = {}
+    for match in _KEYWORD_RE.finditer(text):
+        hits.setdefault(match.group(), []).append(match.span())
+    profiler.count("keyword_scans")
+    return hits
+
+
+def _region_start(text, keyword_start, before=KEYWORD_WINDOW_BEFORE):
+    """keyword_start 에서 공백이 아닌 글자 before 개만큼 앞으로 간 위치"""
+    pos = keyword_start
+    while pos > 0 and before > 0:
+        pos -= 1
+        if not text[pos].isspace():
+            before -= 1
+    return pos
+
+
+def keyword_regions(text, keywords, before=KEYWORD_WINDOW_BEFORE):
+    """
+    keywords 를 포함하는 일치가 시작할 수 있는 구간 [(start, end), ...] (본문 순서, 겹치는 구간은 합침)
+
+    키워드가 없으면 빈 목록 (그 항목의 패턴은 본문 어디에서도 일치하지 않음)
+    """
+    hits = keyword_hits(text)
+    regions = []
+    for start, end in sorted(span for keyword in keywords for span in hits.get(keyword, ())):
+        start = _region_start(text, start, before)
+        if regions and start <= regions[-1][1]:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+    return regions
+
+
+@functools.lru_cache(maxsize=512)
+def _anchored(pattern, width):
+    """pattern 을 시작 위치에서 width 글자 안쪽(앞쪽 위치부터)에서 시작하도록 감싼 정규식. 그룹 1 이 원래 일치"""
+    return re.compile(f"(?s:.){{0,{width}}}?({pattern})", re.IGNORECASE)
+
+
+def _search_near_keywords(pattern, text, keywords):
+    """
+    본문에서 pattern 의 첫 일치 (re.search(pattern, text, re.IGNORECASE) 와 같은 결과)
+
+    keywords 가 주어지면 키워드 근처 구간(keyword_regions)에서 시작하는 일치만 시도합니다.
+    """
+    if not keywords or not _prefilter_enabled():
+        return re.search(pattern, text, re.IGNORECASE)
+    tried = 0  # 이 위치 앞에서 시작하는 일치는 없음
+    for start, end in keyword_regions(text, keywords):
+        if end <= tried:
+            continue
+        start = max(start, tried)
+        width = 64
+        while width < end - start:
+            width *= 2  # 컴파일한 정규식을 다시 쓰도록 폭은 2의 거듭제곱 (넓어도 더 뒤의 일치를 먼저 찾지는 않음)
+        match = _anchored(pattern, width).match(text, start)
+        if match:
+            return re.compile(pattern, re.IGNORECASE).match(text, match.start(1))
+        tried = start + width + 1
+    return None
+
+
+# str.splitlines() 가 줄바꿈으로 보는 문자
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _lines_with_keyword(text, keyword):
+    """keyword 가 들어 있는 줄 목록 (text.splitlines() 중 keyword 가 있는 줄과 같음, 본문 전체를 나누지 않음)"""
+    lines = []
+    last_end = -1
+    for start, end in keyword_hits(text).get(keyword, ()):
+        if start < last_end:
+            continue  # 같은 줄의 두 번째 키워드
+        line_start = max(text.rfind(char, 0, start) for char in _LINE_BREAKS) + 1
+        line_end = min((pos for pos in (text.find(char, end) for char in _LINE_BREAKS) if pos != -1), default=len(text))
+        lines.append(text[line_start:line_end])
+        last_end = line_end
+    return lines
+
+
+def _extract_date_with_patterns(text, patterns, source_name="", keywords=None):
+    """
+    주어진 텍스트에서 패턴 리스트를 사용하여 날짜 추출
+
+    keywords 가 주어지면 그 키워드 근처에서 시작하는 일치만 찾습니다 (keyword_regions, 결과는 본문 전체 검색과 같음).
+    """
+    if not text:
+        return "", "", ""
+    for i, pattern in enumerate(patterns, 1):
+        match = _search_near_keywords(pattern, text, keywords)
+        if match:
+            groups = match.groups()
+            if len(groups) >= 3:
+                y, m, d = groups[:3]
+                try:
+                    formatted_date = f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+                    return formatted_date, match.group(), f"(패턴 {i})"
+                except ValueError:
+                    # print(f"        ⚠️  {source_name} 패턴 {i} 일치했으나 날짜 변환 실패: {groups}")
+                    continue
+    return "", "", ""
+
+
+# --- PDF 텍스트에서 항목 추출 ---
+
+@profiler.timed("regex")
+def extract_ingredient_name_from_pdf(full_text):
+    """PDF에서 원료/성분명(영문) 추출 함수 (HTML 추출 실패시 백업용)"""
+    try:
+        patterns = [
+            r"알림\(([A-Za-z\s]+)\s*성분\s*제제\)",
+            r"예고\s*알림\(([A-Za-z\s]+)\s*성분\s*제제\)",
+            r"의견조회\(([A-Za-z\s]+)\s*성분\s*제제\)",
+            r"제목[^)]*\(([A-Za-z\s]+)\s*성분\s*제제\)",
+            r"'([A-Za-z][A-Za-z\s]*[A-Za-z])'\s*성분",
+        ]
+        for i, pattern in enumerate(patterns, 1):
+            match = re.search(pattern, full_text, re.IGNORECASE)
+            if match:
+                ingredient = match.group(1).strip()
+                ingredient = re.sub(r'\s+', ' ', ingredient)
+                if len(ingredient) > 2 and any(c.isalpha() for c in ingredient):
+                    log.debug("    ✅ PDF에서 원료/성분명 추출 성공 (패턴 %d): %s", i, ingredient)
+                    return canonical_ingredient(ingredient)
+
+        # 제목 형식이 아니면 성분명 사전에 있는 이름을 본문에서 찾음 (영문/국문 동의어, 텍스트 한 번 훑기)
+        ingredient = default_dictionary().first(full_text)
+        if ingredient:
+            log.debug("    ✅ PDF에서 원료/성분명 추출 성공 (성분명 사전): %s", ingredient)
+            return ingredient
+
+        # 마지막으로 대문자로 시작하는 영문 단어 (오인식이 많아 사전에도 없을 때만)
+        match = re.search(r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", full_text, re.IGNORECASE)
+        if match:
+            ingredient = re.sub(r'\s+', ' ', match.group(1).strip())
+            if len(ingredient) > 2:
+                log.debug("    ✅ PDF에서 원료/성분명 추출 (영문 단어): %s", ingredient)
+                return ingredient
+        return ""
+    except Exception as e:
+        log.warning("    ⚠️  PDF에서 원료/성분명 추출 실패: %s", e)
+        return ""
+
+# '시행' 날짜 패턴 (PDF 텍스트 레이어와 OCR 텍스트 공용)
+EXEC_DATE_PATTERNS = [
+    r"시행\s*\((\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)",
+    r"시행\s+[^)]*\s*\((\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)",
+    r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)\s*시행",
+    r"시행일\s*[:：]?\s*(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일",
+    r"시행\s*[:：]?\s*(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일",
+    r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일\s*시행",
+    r"시행\s*[:：]?\s*(\d{4})[.\-]\s*(\d{1,2})[.\-]\s*(\d{1,2})",
+    r"(\d{4})[.\-]\s*(\d{1,2})[.\-]\s*(\d{1,2})\s*시행",
+    r"시행\s*[^0-9]*(\d{4})\.(\d{1,2})\.(\d{1,2})\.",
+    r"시행일자\s*(\d{4})-(\d{1,2})-(\d{1,2})",
+    r"시행[^:]*:\s*(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일",
+    r"(\d{4})\s*.\s*(\d{1,2})\s*.\s*(\d{1,2})\s*.\s*\(시행\)",
+    r"\((\d{4})\s*.\s*(\d{1,2})\s*.\s*(\d{1,2})\s*.\)\s*시행",
+]
+
+def extract_exec_date_from_pdf(pdf_path):
+    """
+    PDF에서 '시행' 날짜를 추출하는 함수.
+    PyMuPDF (fitz)와 PyPDF2를 모두 사용하여 추출 성공률을 높입니다.
+    경로를 넘기면 파일을 한 번만 mmap 해서 두 파서가 함께 사용합니다.
+    """
+    with _pdf_source(pdf_path) as pdf:
+        return _extract_exec_date(pdf)
+
+
+def _extract_exec_date(pdf_path):
+    exec_date = ""
+    full_text_fitz = ""
+
+    log.debug("        🔎 extract_exec_date_from_pdf 호출: %s", _pdf_name(pdf_path))
+    
+    # 1. PyMuPDF (fitz)를 이용한 텍스트 추출 시도
+    full_text_fitz = _extract_text_from_pdf_with_fitz(pdf_path)
+    if full_text_fitz:
+        log.debug("        ✅ PyMuPDF 텍스트 추출 성공. 길이: %d", len(full_text_fitz))
+    else:
+        log.debug("        ⚠️  PyMuPDF 텍스트가 비어있음 - PyPDF2 시도")
+
+    # 2. PyMuPDF로 추출된 텍스트에서 날짜 패턴 검색
+    if full_text_fitz:
+        search_text = full_text_fitz
+        log.debug("        🔍 PyMuPDF 텍스트 전체 검색 시작 (길이: %d)", len(search_text))
+
+        with profiler.stage("regex"):
+            exec_date, matched_text, pattern_info = _extract_date_with_patterns(search_text, EXEC_DATE_PATTERNS, "PyMuPDF 텍스트", EXEC_KEYWORDS)
+        if exec_date:
+            log.debug("        ✅ PyMuPDF 텍스트에서 시행날짜 추출 성공 %s: %s (매치: '%s')", pattern_info, exec_date, matched_text)
+            return exec_date
+        elif log.isEnabledFor(logging.DEBUG):
+            # 디버그용 텍스트 덤프와 '시행' 주변 검색은 DEBUG 레벨에서만 수행
+            log.debug("        ❌ PyMuPDF 텍스트에서 시행날짜 패턴을 찾지 못함. 텍스트 샘플 (마지막 500자):\n%s...", search_text[-500:])
+            for match_obj in re.finditer(r"시행.{0,100}(?:\d{4}[년.\-]\d{1,2}[월.\-]\d{1,2}[일.]?)", search_text, re.IGNORECASE):
+                log.debug("            👉 '시행' 주변에서 날짜와 함께 발견된 텍스트: %s", match_obj.group())
+
+    # 3. PyMuPDF에서 텍스트 추출에 실패했거나, 패턴을 찾지 못했다면 PyPDF2 시도
+    if not exec_date:
+        log.debug("        🔍 PyPDF2로 시행날짜 추출 시도...")
+        text_pypdf2 = _extract_text_from_pdf_with_pypdf2(pdf_path)
+        if text_pypdf2:
+            log.debug("        ✅ PyPDF2 텍스트 추출 성공. 길이: %d", len(text_pypdf2))
+            # PyPDF2 전용 패턴 (괄호 안의 날짜가 잘 잡힘)
+            date_pattern_pypdf2_specific = r"\((20\d{2})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)"
+            
+            # '시행'이 있는 줄에서 PyMuPDF의 모든 패턴 + PyPDF2 전용 패턴 시도
+            all_pypdf2_patterns = EXEC_DATE_PATTERNS + [date_pattern_pypdf2_specific]
+            
+            # PyPDF2는 줄 단위로 처리하는 것이 효율적이므로, 줄별 검색 유지 ('시행' 위치로 해당 줄만 찾음)
+            with profiler.stage("regex"):
+                for line in _lines_with_keyword(text_pypdf2, "시행"):
+                    log.debug("            🔎 PyPDF2 '시행' 발견 줄: '%s'", line.strip())
+                    exec_date, matched_text, pattern_info = _extract_date_with_patterns(line, all_pypdf2_patterns, "PyPDF2 줄 텍스트")
+                    if exec_date:
+                        log.debug("            ✅ PyPDF2로 시행날짜 추출 성공 %s: %s (매치: '%s')", pattern_info, exec_date, matched_text)
+                        return exec_date
+                    else:
+                        log.debug("            ❌ PyPDF2: '시행'이 있는 줄에서 날짜 패턴을 찾지 못함 (줄: '%s')", line.strip())
+            log.debug("        ❌ PyPDF2에서도 시행 날짜를 찾지 못했습니다. (모든 페이지 검색 완료)")
+        else:
+            log.debug("        ⚠️  PyPDF2 텍스트도 비어있음.")
+
+    return exec_date
+
+
+@profiler.timed("regex")
+def extract_exec_date_from_text(full_text):
+    """이미 추출된 텍스트(예: OCR 결과)에서 '시행' 날짜 추출"""
+    exec_date, matched_text, pattern_info = _extract_date_with_patterns(full_text, EXEC_DATE_PATTERNS, "텍스트", EXEC_KEYWORDS)
+    if exec_date:
+        log.debug("        ✅ 텍스트에서 시행날짜 추출 성공 %s: %s (매치: '%s')", pattern_info, exec_date, matched_text)
+    return exec_date
+
+
+@profiler.timed("regex")
+def extract_submit_deadline_from_pdf(full_text):
+    """PDF 텍스트에서 의견제출기한 추출"""
+    patterns = [
+        r"의견제출기한\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
+        r"기한\s*:\s*(\d{4})[.\- ]*(\d{1,2})[.\- ]*(\d{1,2})",
+        r"의견수렴기간\s*:\s*(\d{4})[.\- ]*(\d{1,2})[.\- ]*(\d{1,2})\s*~",
+        r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일까지",
+        r"(\d{4})\.(\d{1,2})\.(\d{1,2})\s*까지"
+    ]
+    for i, pattern in enumerate(patterns, 1):
+        match = _search_near_keywords(pattern, full_text, SUBMIT_DEADLINE_KEYWORDS)
+        if match:
+            y, m, d = match.groups()[:3]
+            formatted_date = f"{y}-{int(m):02d}-{int(d):02d}"
+            return formatted_date
+    return ""
+
+@profiler.timed("regex")
+def extract_plan_date_from_pdf(full_text):
+    """PDF 텍스트에서 허가사항 변경명령 예정일 추출"""
+    patterns = [
+        r"허가사항\s*변경\s*명령\s*예정일\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
+        r"변경\s*명령\s*예정일\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
+        r"예정일\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
+        r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일\s*부터\s*시행\s*예정",
+        r"(\d{4})\.(\d{1,2})\.(\d{1,2})\s*시행\s*예정"
+    ]
+    for i, pattern in enumerate(patterns, 1):
+        match = _search_near_keywords(pattern, full_text, PLAN_DATE_KEYWORDS)
+        if match:
+            y, m, d = match.groups()[:3]
+            formatted_date = f"{y}-{int(m):02d}-{int(d):02d}"
+            return formatted_date
+    return ""
+
+@profiler.timed("regex")
+def extract_reflect_date_from_pdf(full_text):
+    """PDF 텍스트에서 허가반영일자 추출"""
+    patterns = [
+        r"허가반영일자\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
+        r"반영일자\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
+        r"변경\s*반영일자\s*:\s*(\d{4})\s*(\d{1,2})\s*(\d{1,2})",
+        r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일\s*변경\s*반영",
+        r"(\d{4})\.(\d{1,2})\.(\d{1,2})\s*일\s*변경\s*반영"
+    ]
+    for i, pattern in enumerate(patterns, 1):
+        match = _search_near_keywords(pattern, full_text, REFLECT_DATE_KEYWORDS)
+        if match:
+            y, m, d = match.groups()[:3]
+            formatted_date = f"{y}-{int(m):02d}-{int(d):02d}"
+            return formatted_date
+    return ""
+
+# --- 파일명 ---
+
+def create_safe_filename(original_filename):
+    """
+    원본 파일명을 안전한 파일명으로 변환
+    특수문자, 공백, 괄호 등을 모두 언더스코어로 변경
+    (NFC 정규화, UTF-8 바이트 길이 제한 포함 - nedrug_paths.sanitize_filename)
+    """
+    return sanitize_filename(original_filename, strict=True)
@@ -1,52 +1,60 @@
+"""
+의약품안전나라 변경명령/의견조회/사전예고 목록을 크롤링하여 PDF 공문과 함께 엑셀로 정리하는 스크립트
+
+selenium, pandas, PyMuPDF, PyPDF2, xlsxwriter 는 해당 단계가 실행될 때 처음 로드됩니다.
+PDF/텍스트 추출 함수는 nedrug_extract 모듈에 있으며, 기존 코드와의 호환을 위해 여기서도 다시 내보냅니다.
+결과 폴더 생성과 크롬 옵션은 실행 컨텍스트(nedrug_run_context.RunContext)가 담당합니다.
+"""
+
 import os
 import time
 import re
+import argparse
+import sqlite3
 import requests
-import fitz  # PyMuPDF (for PDF text extraction)
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from PyPDF2 import PdfReader, errors
-from datetime import datetime
-import xlsxwriter # xlsxwriter 추가
 from urllib.parse import quote # URL 인코딩을 위해 추가
+from nedrug_boards import DEFAULT_BOARD, get_board
+from nedrug_profile import profiler
+from nedrug_log import ProgressBar, get_logger, setup_logging
+from nedrug_attachments import AttachmentIndex, check_attachment, probe_attachment
+from nedrug_run_context import RunContext
+from nedrug_ingredients import canonical_ingredient
+from nedrug_metrics import register_gauge, start_metrics_server
+from nedrug_ocr import OCR_CACHE_DIRNAME, OcrPool
+from nedrug_plan import TEXTAREA_FIELDS, ExtractionPlan, list_date
+from nedrug_prefetch import PrefetchPool
+from nedrug_records import FinaleRecord, default_text_store
+from nedrug_report import (
+    INGREDIENT_SHEET,
+    PDF_NOT_DOWNLOADED_PREFIX,
+    STAGE_SHEETS,
+    pdf_placeholder,
+    report_pdfs_enabled,
+    report_rows,
+    write_workbook,
+)
+from nedrug_search import SearchIndex
+from nedrug_snapshot import CHANGE_LOG_FILENAME, FIELD_LABELS, SNAPSHOT_FILENAME, SnapshotStore, item_key
+from nedrug_state import open_state
+from nedrug_extract import (
+    PdfSource,
+    _extract_text_from_pdf_with_fitz,
+    _extract_text_from_pdf_with_pypdf2,
+    create_safe_filename,
+    extract_exec_date_from_pdf,
+    extract_exec_date_from_text,
+    extract_ingredient_name_from_pdf,
+    extract_plan_date_from_pdf,
+    extract_reflect_date_from_pdf,
+    extract_submit_deadline_from_pdf,
+)
 
 # --- 설정 ---
-BASE_URL = "https://nedrug.mfds.go.kr/CCBAR01F012/getList"
-
-# 현재 Python 스크립트 파일이 위치한 디렉토리를 기본 저장 디렉토리로 설정
-SCRIPT_RUN_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# 결과 디렉토리 이름을 'nedrug_년도_월일_시간_분' 형식으로 구성
-now = datetime.now()
-RESULT_FOLDER_NAME = now.strftime("nedrug_%Y%m%d_%H%M")
-
-# 최종 결과물 (엑셀)이 저장될 디렉토리
-EXCEL_SAVE_DIR = os.path.join(SCRIPT_RUN_DIR, RESULT_FOLDER_NAME)
-
-# PDF 파일이 저장될 디렉토리
-DOWNLOAD_DIR = os.path.join(EXCEL_SAVE_DIR, "nedrug_pdfs")
-
-# 필요한 디렉토리 생성
-os.makedirs(EXCEL_SAVE_DIR, exist_ok=True)
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-
-print(f"📁 저장 경로 설정:")
-print(f"   스크립트 실행 폴더: {SCRIPT_RUN_DIR}")
-print(f"   결과 저장 폴더: {EXCEL_SAVE_DIR}")
-print(f"   PDF 저장 폴더: {DOWNLOAD_DIR}")
-
-# --- 크롬 설정 ---
-options = Options()
-options.add_argument("--headless")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--disable-gpu")
-options.add_argument("--window-size=1920,1080")
+BOARD = get_board(DEFAULT_BOARD)
+BASE_URL = BOARD.list_url
+COLUMNS = BOARD.columns  # 목록 열 위치 (순번, 제목, 변경반영일, 상태)
+STAGE_NAMES = {"변경명령(안) 의견조회": "의견조회", "사전예고": "사전예고", "변경명령": "변경명령"} # 목록 상태 -> 보고서 단계
+PDF_TEXT_FIELDS = ("ingredient", "submit_deadline", "plan_date", "reflect_date") # PDF 텍스트에서 찾는 항목 (시행날짜는 별도)
 
 # --- User-Agent 및 재시도 설정 ---
 HEADERS = {
@@ -54,51 +62,20 @@ HEADERS = {
 }
 MAX_RETRIES = 3
 RETRY_DELAY = 2 # 초
+MAX_PDF_BYTES = 50 * 1024 * 1024 # 이보다 큰 첨부파일은 다운로드하지 않음
+DOWNLOAD_CHUNK_BYTES = 64 * 1024 # 선행 다운로드 취소 여부를 확인하는 단위
 
-# --- 유틸리티 함수 정의 (중복 제거 및 가독성 향상) ---
-
-def _extract_text_from_pdf_with_fitz(pdf_path):
-    """PyMuPDF(fitz)를 사용하여 PDF에서 텍스트 추출"""
-    try:
-        doc = fitz.open(pdf_path)
-        full_text = "\n".join(page.get_text() for page in doc)
-        doc.close()
-        return full_text if full_text.strip() else ""
-    except Exception as e:
-        print(f"        ⚠️  PyMuPDF로 PDF 텍스트 추출 실패: {e}")
-        return ""
-
-def _extract_text_from_pdf_with_pypdf2(pdf_path):
-    """PyPDF2를 사용하여 PDF에서 텍스트 추출"""
-    try:
-        reader = PdfReader(pdf_path)
-        full_text = "\n".join(page.extract_text() for page in reader.pages)
-        return full_text if full_text.strip() else ""
-    except (errors.PdfReadError, Exception) as e: # PDF Read Error 및 기타 예외 처리
-        print(f"        ⚠️  PyPDF2로 PDF 텍스트 추출 실패: {e}")
-        return ""
-
-def _extract_date_with_patterns(text, patterns, source_name=""):
-    """주어진 텍스트에서 패턴 리스트를 사용하여 날짜 추출"""
-    for i, pattern in enumerate(patterns, 1):
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            groups = match.groups()
-            if len(groups) >= 3:
-                y, m, d = groups[:3]
-                try:
-                    formatted_date = f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
-                    return formatted_date, match.group(), f"(패턴 {i})"
-                except ValueError:
-                    # print(f"        ⚠️  {source_name} 패턴 {i} 일치했으나 날짜 변환 실패: {groups}")
-                    continue
-    return "", "", ""
+log = get_logger("finale")
 
 
 # --- 기존 함수들 (일부 수정) ---
 
 def get_total_pages(driver):
     """총 페이지 수를 확인하는 함수"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     try:
         last_page_btn = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, "button[title*='마지막']"))
@@ -134,36 +111,48 @@ def get_total_pages(driver):
 
 def navigate_to_page(driver, page_num):
     """특정 페이지로 이동하는 함수"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     try:
         page_url = f"{BASE_URL}?page={page_num}&limit=10"
-        driver.get(page_url)
-       
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
-        )
+        with profiler.stage("fetch"):
+            driver.get(page_url)
+           
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+            )
         time.sleep(1)
         return True
     except TimeoutException:
-        print(f"⚠️  페이지 {page_num} 로딩 실패")
+        log.warning("⚠️  페이지 %s 로딩 실패", page_num)
         return False
 
+@profiler.timed("parse")
 def extract_ingredient_name_from_html(driver):
     """HTML 페이지에서 성분정보 테이블의 원료/성분명(영문) 추출"""
+    from selenium.webdriver.common.by import By
+
     try:
         ingredient_table = driver.find_elements(By.XPATH, "//p[contains(@class, 'cont_title3') and contains(text(), '성분정보')]/following-sibling::div//table")
         if not ingredient_table:
             return ""
         try:
             english_name_cell = ingredient_table[0].find_element(By.XPATH, ".//tbody/tr[1]/td[3]")
-            ingredient_name = english_name_cell.text.strip()
-            return ingredient_name if ingredient_name else ""
+            # 표기가 제각각인 성분명을 사전의 대표 이름으로 통일 (사전에 없으면 그대로)
+            return canonical_ingredient(english_name_cell.text.strip())
         except Exception:
             return ""
     except Exception:
         return ""
 
+@profiler.timed("parse")
 def extract_submit_deadline_from_html(driver):
     """HTML 페이지에서 의견제출기한 추출"""
+    from selenium.webdriver.common.by import By
+
     try:
         deadline_cell = driver.find_elements(By.XPATH, "//th[contains(text(), '의견제출기한')]/following-sibling::td")
         if deadline_cell:
@@ -174,8 +163,11 @@ def extract_submit_deadline_from_html(driver):
     except Exception:
         return ""
 
+@profiler.timed("parse")
 def extract_plan_date_from_html(driver):
     """HTML 페이지에서 허가사항 변경명령 예정일 추출"""
+    from selenium.webdriver.common.by import By
+
     try:
         content_textarea = driver.find_elements(By.XPATH, "//th[contains(text(), '내용')]/following-sibling::td//textarea")
         if content_textarea:
@@ -197,8 +189,11 @@ def extract_plan_date_from_html(driver):
     except Exception:
         return ""
 
+@profiler.timed("parse")
 def extract_reflect_date_from_html(driver):
     """HTML 페이지에서 허가반영일자 추출"""
+    from selenium.webdriver.common.by import By
+
     try:
         reflect_cell = driver.find_elements(By.XPATH, "//th[contains(text(), '허가반영일자')]/following-sibling::td")
         if reflect_cell:
@@ -209,211 +204,343 @@ def extract_reflect_date_from_html(driver):
     except Exception:
         return ""
 
-def extract_ingredient_name_from_pdf(full_text):
-    """PDF에서 원료/성분명(영문) 추출 함수 (HTML 추출 실패시 백업용)"""
+@profiler.timed("parse")
+def extract_content_text_from_html(driver):
+    """HTML 페이지에서 '내용' 본문(textarea) 텍스트 추출"""
+    from selenium.webdriver.common.by import By
+
     try:
-        patterns = [
-            r"알림\(([A-Za-z\s]+)\s*성분\s*제제\)",
-            r"예고\s*알림\(([A-Za-z\s]+)\s*성분\s*제제\)",
-            r"의견조회\(([A-Za-z\s]+)\s*성분\s*제제\)",
-            r"제목[^)]*\(([A-Za-z\s]+)\s*성분\s*제제\)",
-            r"'([A-Za-z][A-Za-z\s]*[A-Za-z])'\s*성분",
-            r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-        ]
-        for i, pattern in enumerate(patterns, 1):
-            match = re.search(pattern, full_text, re.IGNORECASE)
-            if match:
-                ingredient = match.group(1).strip()
-                ingredient = re.sub(r'\s+', ' ', ingredient)
-                if len(ingredient) > 2 and any(c.isalpha() for c in ingredient):
-                    print(f"    ✅ PDF에서 원료/성분명 추출 성공 (패턴 {i}): {ingredient}")
-                    return ingredient
-        return ""
-    except Exception as e:
-        print(f"    ⚠️  PDF에서 원료/성분명 추출 실패: {e}")
+        content_textarea = driver.find_elements(By.XPATH, "//th[contains(text(), '내용')]/following-sibling::td//textarea")
+        return content_textarea[0].text.strip() if content_textarea else ""
+    except Exception:
         return ""
 
-def extract_exec_date_from_pdf(pdf_path):
+def apply_text_to_record(record, full_text):
+    """
+    나중에 얻은 PDF 텍스트(예: OCR 결과)로 레코드의 빈 항목만 채움
+
+    단계별로 채우는 항목은 process_single_item 과 같습니다.
     """
-    PDF에서 '시행' 날짜를 추출하는 함수.
-    PyMuPDF (fitz)와 PyPDF2를 모두 사용하여 추출 성공률을 높입니다.
+    stage = record.get("B_단계")
+    if stage in ("의견조회", "변경명령") and not record.get("C_시행날짜"):
+        record["C_시행날짜"] = extract_exec_date_from_text(full_text)
+    if stage == "의견조회" and not record.get("D_제출날짜"):
+        record["D_제출날짜"] = extract_submit_deadline_from_pdf(full_text)
+    if stage == "사전예고" and not record.get("E_예정일"):
+        record["E_예정일"] = extract_plan_date_from_pdf(full_text)
+    if stage == "변경명령" and not record.get("F_반영일자"):
+        record["F_반영일자"] = extract_reflect_date_from_pdf(full_text)
+    if not record.get("G_원료성분명"):
+        record["G_원료성분명"] = extract_ingredient_name_from_pdf(full_text)
+    return record
+
+@profiler.timed("index")
+def update_search_index(records, ocr_pages=None, db_path=None):
     """
-    exec_date = ""
-    full_text_fitz = ""
+    수집 레코드(제목/단계/원료성분명)와 관련 PDF 의 페이지별 텍스트를 전문 검색 인덱스에 반영
 
-    print(f"        🔎 extract_exec_date_from_pdf 호출: {os.path.basename(pdf_path)}")
-    
-    # 1. PyMuPDF (fitz)를 이용한 텍스트 추출 시도
-    full_text_fitz = _extract_text_from_pdf_with_fitz(pdf_path)
-    if full_text_fitz:
-        print(f"        ✅ PyMuPDF 텍스트 추출 성공. 길이: {len(full_text_fitz)}")
-    else:
-        print(f"        ⚠️  PyMuPDF 텍스트가 비어있음 - PyPDF2 시도")
-
-    # 2. PyMuPDF로 추출된 텍스트에서 날짜 패턴 검색
-    if full_text_fitz:
-        search_text = full_text_fitz
-        print(f"        🔍 PyMuPDF 텍스트 전체 검색 시작 (길이: {len(search_text)})")
-
-        exec_patterns = [
-            r"시행\s*\((\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)",
-            r"시행\s+[^)]*\s*\((\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)",
-            r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)\s*시행",
-            r"시행일\s*[:：]?\s*(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일",
-            r"시행\s*[:：]?\s*(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일",
-            r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일\s*시행",
-            r"시행\s*[:：]?\s*(\d{4})[.\-]\s*(\d{1,2})[.\-]\s*(\d{1,2})",
-            r"(\d{4})[.\-]\s*(\d{1,2})[.\-]\s*(\d{1,2})\s*시행",
-            r"시행\s*[^0-9]*(\d{4})\.(\d{1,2})\.(\d{1,2})\.",
-            r"시행일자\s*(\d{4})-(\d{1,2})-(\d{1,2})",
-            r"시행[^:]*:\s*(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일",
-            r"(\d{4})\s*.\s*(\d{1,2})\s*.\s*(\d{1,2})\s*.\s*\(시행\)",
-            r"\((\d{4})\s*.\s*(\d{1,2})\s*.\s*(\d{1,2})\s*.\)\s*시행",
-        ]
-        
-        exec_date, matched_text, pattern_info = _extract_date_with_patterns(search_text, exec_patterns, "PyMuPDF 텍스트")
-        if exec_date:
-            print(f"        ✅ PyMuPDF 텍스트에서 시행날짜 추출 성공 {pattern_info}: {exec_date} (매치: '{matched_text}')")
-            return exec_date
+    ocr_pages: {PDF 경로: OCR 페이지별 텍스트} - 텍스트 레이어가 없는 PDF 는 OCR 결과를 색인
+    """
+    ocr_pages = ocr_pages or {}
+    try:
+        with SearchIndex(db_path) as index:
+            with index.batch():
+                for record in records:
+                    url, title = record.get("H_관련 URL", ""), record.get("A_제목", "")
+                    info_no = item_key(url, title)
+                    stage, ingredient = record.get("B_단계", ""), record.get("G_원료성분명", "")
+                    index.add_item(info_no, url, title, stage, ingredient)
+                    pdf_path = record.get("I_관련 PDF")
+                    if pdf_path and os.path.isfile(pdf_path):
+                        index.add_pdf(info_no, url, title, stage, ingredient, pdf_path, ocr_pages.get(pdf_path))
+            print(f"🔎 검색 인덱스 갱신: {index.added}건 추가/변경, {index.unchanged}건 변경 없음 ({index.path})")
+    except (sqlite3.Error, OSError) as e:
+        print(f"❌ 검색 인덱스 갱신 중 오류 발생: {e}")
+
+def pdf_attachments_on_page(driver):
+    """상세 페이지의 downEdmsFile 버튼에서 PDF 첨부파일 (file_id, 파일명) 목록 추출 (기다리지 않음)"""
+    from selenium.webdriver.common.by import By
+
+    attachments = []
+    for btn in driver.find_elements(By.CSS_SELECTOR, "button[onclick^='downEdmsFile']"):
+        try:
+            onclick = btn.get_attribute("onclick")
+            if not onclick:
+                continue
+
+            file_id_match = re.search(r"downEdmsFile\('([^']+)',\s*'([^']+)'\)", onclick)
+            if not file_id_match:
+                file_id_match = re.search(r"downEdmsFile\('([^']+)'\)", onclick)
+                if file_id_match:
+                    file_id = file_id_match.group(1)
+                    filename = btn.get_attribute("title")
+                    if not filename:
+                        filename = f"file_{file_id}.pdf"
+                else:
+                    continue
+            else:
+                file_id = file_id_match.group(1)
+                filename = file_id_match.group(2)
+
+            filename = filename.strip()
+            file_extension = os.path.splitext(filename)[1].lower()
+
+            if file_extension != '.pdf':
+                log.debug("    ⏭️  PDF 파일 아님 (%s), 다운로드 스킵: %s", file_extension, filename)
+                continue
+            attachments.append((file_id, filename))
+        except Exception as btn_proc_error:
+            log.warning("    ⚠️  첨부파일 버튼 확인 중 오류 발생: %s", btn_proc_error)
+    return attachments
+
+def _cancelled(cancelled):
+    return cancelled is not None and cancelled.is_set()
+
+def _download_body(download_url, cancelled=None):
+    """첨부파일 본문을 DOWNLOAD_CHUNK_BYTES 단위로 받음. 도중에 cancelled 가 설정되면 연결을 닫고 None"""
+    with requests.get(download_url, headers=HEADERS, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        chunks = []
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+            if _cancelled(cancelled):
+                return None
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+def fetch_pdf_attachment(file_id, filename, attachment_index, ctx, cancelled=None):
+    """
+    PDF 첨부파일 한 건을 받아 저장 (이미 받은 파일/내용이 같은 파일은 재사용)
+
+    반환값: (저장 경로, 이번에 받은 bytes) - 재사용한 경우 bytes 는 None, 건너뛰거나 실패하면 ("", None)
+    선행 다운로드(PrefetchPool) 스레드에서도 호출되므로 selenium 드라이버는 사용하지 않습니다.
+    cancelled(threading.Event)가 설정되면 받던 내용을 버리고 ("", None) 을 반환합니다.
+    """
+    # ★★★ 핵심 수정: 안전한 파일명 생성 ★★★
+    original_filename = filename
+    safe_filename = create_safe_filename(original_filename)
+
+    log.debug("    📝 파일명 변환: %s → %s", original_filename, safe_filename)
+
+    dedup_path = attachment_index.lookup(file_id)
+    if dedup_path:
+        profiler.count("attachment_dedup_file_id")
+        log.debug("    ♻️  이미 받은 첨부파일 재사용 (file_id %s): %s", file_id, os.path.basename(dedup_path))
+        return dedup_path, None
+
+    download_url = f"https://nedrug.mfds.go.kr/cmn/edms/down/{file_id}"
+    local_file_path = os.path.join(ctx.download_dir, safe_filename)
+
+    # 본문을 받기 전에 HEAD로 형식/크기/검증값 확인
+    with profiler.stage("probe"):
+        meta = probe_attachment(requests, file_id, headers=HEADERS)
+    should_download, skip_reason = check_attachment(meta, filename, pdf_only=True, max_bytes=MAX_PDF_BYTES)
+    if not should_download:
+        profiler.count(f"attachment_skipped_{skip_reason}")
+        if skip_reason == 'not_pdf':
+            log.debug("    ⏭️  서버 응답상 PDF 아님 (%s), 다운로드 스킵: %s", meta['content_type'], filename)
         else:
-            print(f"        ❌ PyMuPDF 텍스트에서 시행날짜 패턴을 찾지 못함. 텍스트 샘플 (마지막 500자):\n{search_text[-500:]}...")
-            for match_obj in re.finditer(r"시행.{0,100}(?:\d{4}[년.\-]\d{1,2}[월.\-]\d{1,2}[일.]?)", search_text, re.IGNORECASE):
-                print(f"            👉 '시행' 주변에서 날짜와 함께 발견된 텍스트: {match_obj.group()}")
-
-    # 3. PyMuPDF에서 텍스트 추출에 실패했거나, 패턴을 찾지 못했다면 PyPDF2 시도
-    if not exec_date:
-        print(f"        🔍 PyPDF2로 시행날짜 추출 시도...")
-        text_pypdf2 = _extract_text_from_pdf_with_pypdf2(pdf_path)
-        if text_pypdf2:
-            print(f"        ✅ PyPDF2 텍스트 추출 성공. 길이: {len(text_pypdf2)}")
-            # PyPDF2 전용 패턴 (괄호 안의 날짜가 잘 잡힘)
-            date_pattern_pypdf2_specific = r"\((20\d{2})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\)"
-            
-            # '시행'이 있는 줄에서 PyMuPDF의 모든 패턴 + PyPDF2 전용 패턴 시도
-            all_pypdf2_patterns = exec_patterns + [date_pattern_pypdf2_specific]
-            
-            # PyPDF2는 줄 단위로 처리하는 것이 효율적이므로, 줄별 검색 유지
-            for line in text_pypdf2.splitlines():
-                if "시행" in line:
-                    print(f"            🔎 PyPDF2 '시행' 발견 줄: '{line.strip()}'")
-                    exec_date, matched_text, pattern_info = _extract_date_with_patterns(line, all_pypdf2_patterns, "PyPDF2 줄 텍스트")
-                    if exec_date:
-                        print(f"            ✅ PyPDF2로 시행날짜 추출 성공 {pattern_info}: {exec_date} (매치: '{matched_text}')")
-                        return exec_date
-                    else:
-                        print(f"            ❌ PyPDF2: '시행'이 있는 줄에서 날짜 패턴을 찾지 못함 (줄: '{line.strip()}')")
-            print(f"        ❌ PyPDF2에서도 시행 날짜를 찾지 못했습니다. (모든 페이지 검색 완료)")
+            log.debug("    ⏭️  파일 크기 초과 (%s bytes), 다운로드 스킵: %s", meta['size'], filename)
+        return "", None
+
+    # 지난 실행 폴더에 받아둔 같은 파일이면 이번 폴더로 복사 (검증값 기록은 실행 간에 유지되는 스크립트 폴더)
+    cached_path = ctx.validators.find(file_id, meta, local_file_path) if meta else ""
+    if cached_path:
+        try:
+            saved_path = attachment_index.adopt(file_id, cached_path, local_file_path)
+        except OSError as copy_err:
+            log.debug("    ⚠️  받아둔 파일 복사 실패, 다시 다운로드: %s", copy_err)
         else:
-            print(f"        ⚠️  PyPDF2 텍스트도 비어있음.")
-
-    return exec_date
-
-
-def extract_submit_deadline_from_pdf(full_text):
-    """PDF 텍스트에서 의견제출기한 추출"""
-    patterns = [
-        r"의견제출기한\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
-        r"기한\s*:\s*(\d{4})[.\- ]*(\d{1,2})[.\- ]*(\d{1,2})",
-        r"의견수렴기간\s*:\s*(\d{4})[.\- ]*(\d{1,2})[.\- ]*(\d{1,2})\s*~",
-        r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일까지",
-        r"(\d{4})\.(\d{1,2})\.(\d{1,2})\s*까지"
-    ]
-    for i, pattern in enumerate(patterns, 1):
-        match = re.search(pattern, full_text, re.IGNORECASE)
-        if match:
-            y, m, d = match.groups()[:3]
-            formatted_date = f"{y}-{int(m):02d}-{int(d):02d}"
-            return formatted_date
-    return ""
+            profiler.count("attachment_skipped_cached")
+            log.debug("    ⏭️  이미 받아둔 파일과 동일 (변경 없음): %s", os.path.basename(cached_path))
+            if os.path.abspath(saved_path) != os.path.abspath(cached_path):
+                ctx.validators.remember(file_id, meta, saved_path)  # 최근 실행 폴더의 사본을 기록
+            return saved_path, None
+
+    file_content = None
+    for attempt in range(MAX_RETRIES):
+        if _cancelled(cancelled):
+            break
+        try:
+            log.debug("    ⏳ %s 다운로드 시도 %s/%s...", safe_filename, attempt + 1, MAX_RETRIES)
+            with profiler.stage("download"):
+                file_content = _download_body(download_url, cancelled)
+            if file_content is None:
+                break
+            profiler.add_bytes(len(file_content))
+            log.debug("      ✅ 다운로드 성공. 크기: %s bytes.", len(file_content))
+            break
+        except requests.exceptions.RequestException as req_err:
+            log.warning("      ⚠️  다운로드 요청 실패 (재시도 %s): %s", attempt + 1, req_err)
+            time.sleep(RETRY_DELAY)
+        except Exception as general_err:
+            log.warning("      ⚠️  다운로드 중 일반 오류 (재시도 %s): %s", attempt + 1, general_err)
+            time.sleep(RETRY_DELAY)
+
+    if _cancelled(cancelled):
+        profiler.count("prefetch_aborted")
+        log.debug("    ⏹️  선행 다운로드 취소: %s", safe_filename)
+        return "", None
+    if file_content is None:
+        log.warning("   ❌ %s 모든 재시도 실패. 다운로드 건너뜀.", safe_filename)
+        return "", None
 
-def extract_plan_date_from_pdf(full_text):
-    """PDF 텍스트에서 허가사항 변경명령 예정일 추출"""
-    patterns = [
-        r"허가사항\s*변경\s*명령\s*예정일\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
-        r"변경\s*명령\s*예정일\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
-        r"예정일\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
-        r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일\s*부터\s*시행\s*예정",
-        r"(\d{4})\.(\d{1,2})\.(\d{1,2})\s*시행\s*예정"
-    ]
-    for i, pattern in enumerate(patterns, 1):
-        match = re.search(pattern, full_text, re.IGNORECASE)
-        if match:
-            y, m, d = match.groups()[:3]
-            formatted_date = f"{y}-{int(m):02d}-{int(d):02d}"
-            return formatted_date
-    return ""
+    try:
+        # 내용이 같은 파일이 이미 있으면 저장하지 않고 기존 파일을 사용
+        saved_path, is_new = attachment_index.store(file_id, file_content, local_file_path)
+        if is_new:
+            log.debug("   💾 파일 저장 완료: %s", os.path.basename(saved_path))
+            ctx.validators.remember(file_id, meta, saved_path)
+        else:
+            profiler.count("attachment_dedup_content")
+            log.debug("   ♻️  내용이 같은 파일이 이미 있음: %s", os.path.basename(saved_path))
+        return saved_path, file_content
+
+    except Exception as save_err:
+        log.warning("   ❌ %s 저장 중 오류 발생: %s", safe_filename, save_err)
+        return "", None
 
-def extract_reflect_date_from_pdf(full_text):
-    """PDF 텍스트에서 허가반영일자 추출"""
-    patterns = [
-        r"허가반영일자\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
-        r"반영일자\s*[:：]?\s*(\d{4})[.\-년\s]*(\d{1,2})[.\-월\s]*(\d{1,2})[일\s]*",
-        r"변경\s*반영일자\s*:\s*(\d{4})\s*(\d{1,2})\s*(\d{1,2})",
-        r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일\s*변경\s*반영",
-        r"(\d{4})\.(\d{1,2})\.(\d{1,2})\s*일\s*변경\s*반영"
-    ]
-    for i, pattern in enumerate(patterns, 1):
-        match = re.search(pattern, full_text, re.IGNORECASE)
-        if match:
-            y, m, d = match.groups()[:3]
-            formatted_date = f"{y}-{int(m):02d}-{int(d):02d}"
-            return formatted_date
+
+def apply_cached_pdf_text(plan, attachments, attachment_index):
+    """
+    이번 실행에서 이미 받아 텍스트를 추출해 둔 첨부파일이 있으면 그 결과로 plan 의 빈 항목을 채움 (다운로드 없음)
+
+    반환값: 사용한 PDF 경로 (없으면 빈 문자열)
+    """
+    for file_id, _ in attachments:
+        saved_path = attachment_index.lookup(file_id)
+        if not saved_path:
+            continue
+        parsed = attachment_index.parsed(saved_path)
+        if not parsed.get('text'):
+            continue
+        plan.offer("cache", exec_date=parsed.get('exec_date', ''))
+        plan.apply_text("cache", default_text_store().get(parsed['text']))
+        return saved_path
     return ""
 
-# 안전한 파일명 생성 함수 추가 (기존 코드 상단에 추가)
+def report_only_pdf(attachments, attachment_index, ctx, prefetch=None, prefetched=None):
+    """
+    필드 추출에는 PDF 가 필요 없던 항목의 보고서 PDF파일 칸 값 (텍스트 추출은 하지 않음)
 
-def create_safe_filename(original_filename):
+    NEDRUG_REPORT_PDFS 가 켜져 있으면(기본) 첫 첨부파일을 받아(선행 다운로드가 있으면 그 결과) 저장 경로를,
+    꺼져 있으면 첨부파일 이름 자리표시를 반환합니다. prefetched 는 쓰거나 취소합니다.
+    반환값: (PDF파일 칸 값, 이번에 첨부파일을 네트워크에서 받았는지)
     """
-    원본 파일명을 안전한 파일명으로 변환
-    특수문자, 공백, 괄호 등을 모두 언더스코어로 변경
+    file_id, filename = attachments[0]
+    if not report_pdfs_enabled():
+        if prefetch is not None:
+            prefetch.cancel(prefetched)
+        profiler.count("pdf_report_skipped")
+        return pdf_placeholder(filename), False
+    try:
+        if prefetched is not None and prefetched.key == file_id:
+            saved_path, file_content = prefetch.result(prefetched)
+        else:
+            if prefetch is not None:
+                prefetch.cancel(prefetched)
+            saved_path, file_content = fetch_pdf_attachment(file_id, filename, attachment_index, ctx)
+    except Exception as e:
+        log.warning("    ⚠️  보고서용 첨부파일(%s) 다운로드 중 오류 발생: %s", filename, e)
+        return "", False
+    profiler.count("pdf_report_only")
+    return saved_path or "", file_content is not None
+
+def prefetch_first_pdf(prefetch, attachments, attachment_index, ctx):
+    """첫 PDF 첨부파일의 선행 다운로드 시작. 반환값: Future (prefetch 나 첨부파일이 없으면 None)"""
+    if prefetch is None or not attachments:
+        return None
+    file_id, filename = attachments[0]
+    return prefetch.submit(file_id, file_id, filename, attachment_index, ctx)
+
+def record_key(record):
+    """레코드의 항목 키 (process_single_item 이 state 에 추가할 때 쓰는 item_key 와 같음)"""
+    return item_key(record.get("H_관련 URL", ""), record.get("A_제목", ""))
+
+def process_single_item(driver, row, idx, attachment_index, state, ctx, ocr=None, snapshot=None, prefetch=None):
     """
-    # 파일명과 확장자 분리
-    name, ext = os.path.splitext(original_filename)
-    
-    # 특수문자를 모두 언더스코어로 변경
-    # 한글, 영문, 숫자만 남기고 나머지는 언더스코어로 변경
-    import re
-    safe_name = re.sub(r'[^\w가-힣]', '_', name)
-    
-    # 연속된 언더스코어를 하나로 변경
-    safe_name = re.sub(r'_+', '_', safe_name)
-    
-    # 앞뒤 언더스코어 제거
-    safe_name = safe_name.strip('_')
-    
-    # 파일명이 너무 길면 자르기 (Windows 파일명 길이 제한 고려)
-    if len(safe_name) > 100:
-        safe_name = safe_name[:100]
-    
-    return f"{safe_name}{ext}"
+    개별 항목을 처리하는 함수 (ctx: 결과 폴더 정보를 담은 RunContext)
+
+    state(nedrug_state 의 MemoryState/SQLiteState)에서 항목을 claim 한 작업자만 처리하고 레코드를 추가하므로,
+    여러 스레드/프로세스가 같은 state 로 목록을 나눠 처리해도 같은 항목이 두 번 처리되거나 레코드가 빠지지 않습니다.
+    처리에 실패한 항목은 claim 을 반납해 다른 작업자가 다시 가져갈 수 있습니다.
+    반환값: 이 호출에서 레코드를 추가했으면 True
+
+    attachment_index(AttachmentIndex)로 file_id/내용 해시가 같은 첨부파일은 한 번만 받고,
+    텍스트 추출 결과도 같은 파일을 참조하는 항목끼리 공유합니다.
+
+    ocr(OcrPool)가 주어지면 텍스트 레이어가 없는 PDF 는 OCR 작업으로 넘기고 기다리지 않습니다.
+    OCR 결과는 main 에서 크롤링이 끝난 뒤 apply_text_to_record 로 레코드에 반영됩니다.
+
+    snapshot(SnapshotStore)이 주어지면 목록 행을 지난 실행과 비교해 신규/변경 내역을 기록하고,
+    snapshot.skip_unchanged 일 때는 변경 없는 행의 상세 페이지/PDF 를 다시 처리하지 않습니다.
+
+    prefetch(PrefetchPool)가 주어지면 PDF 가 필요할 것 같은 시점(보고서용 PDF 를 받는 설정이면 상세 페이지를 열 때,
+    아니면 HTML 표/목록으로 채우지 못한 필드가 있을 때)에 첫 PDF 첨부파일을 미리 받고, 필요 없어지면 받는 중이라도 취소합니다.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
 
-def process_single_item(driver, row, idx, downloaded_files, records):
-    """개별 항목을 처리하는 함수"""
     current_item_processed_pdf_path = ""
+    current_item_pdf_bytes = None # 이번에 다운로드한 PDF 내용 (파서에 그대로 넘김)
+    pdf_downloaded = False # 이 항목에서 첨부파일을 네트워크에서 받았는지 (보고서용 포함, 절감 건수 집계)
+    row_key = None
     
     try:
         cells = row.find_elements(By.TAG_NAME, "td")
-        if len(cells) < 6:
-            return
+        if len(cells) < BOARD.min_cells:
+            return False
            
-        status = cells[5].text.strip()
-        title_elem = cells[1].find_element(By.TAG_NAME, "a")
+        status = cells[COLUMNS['status']].text.strip()
+        title_elem = cells[COLUMNS['title']].find_element(By.TAG_NAME, "a")
         title = title_elem.text.strip()
         href = title_elem.get_attribute("href")
-        change_reflect_date = cells[4].text.strip() if len(cells) > 4 else ""
-
-        print(f"[{idx}] 처리 중: {title} - {status}")
-
-        if status not in ["변경명령(안) 의견조회", "사전예고", "변경명령"]:
-            print(f"    ⏭️  스킵 (상태: {status})")
-            return
+        change_reflect_date = cells[COLUMNS['change_reflect_date']].text.strip()
+
+        log.debug("[%s] 처리 중: %s - %s", idx, title, status)
+
+        if status not in BOARD.target_statuses:
+            log.debug("    ⏭️  스킵 (상태: %s)", status)
+            return False
+
+        # 다른 작업자가 이미 가져간 항목이면 건너뜀
+        if not state.claim("item", item_key(href, title)):
+            state.incr("items_claimed_elsewhere")
+            log.debug("    ⏭️  다른 작업자가 처리 중이거나 처리한 항목")
+            return False
+
+        # 지난 실행의 목록 스냅샷과 비교 (상태/변경반영일/제목 지문)
+        row_key = item_key(href, title)
+        row_change = None
+        if snapshot is not None:
+            row_change = snapshot.compare(row_key, title, status, change_reflect_date)
+            profiler.count(f"rows_{row_change['kind']}")
+            if row_change['kind'] == 'unchanged' and snapshot.skip_unchanged and row_change['record']:
+                added = state.add_record(row_key, FinaleRecord.from_dict(row_change['record']))
+                if added:
+                    profiler.add_items()
+                    state.incr("items_reused")
+                snapshot.update(row_key, title, status, change_reflect_date, change=row_change)
+                log.debug("    ⏭️  변경 없음 - 지난 실행 결과 재사용")
+                return added
+            if row_change['kind'] == 'changed':
+                for field, before, after in row_change['changed_fields']:
+                    log.info("    🔄 [%s] %s 변경: %s → %s", row_key, FIELD_LABELS.get(field, field), before, after)
 
         record_url = href
 
         driver.execute_script("window.open(arguments[0]);", href)
         driver.switch_to.window(driver.window_handles[-1])
 
+        prefetched = None # 선행 다운로드 작업 (쓰거나 취소하지 않은 채 끝나면 finally 에서 취소)
         try:
+            # 보고서에 첫 첨부파일을 넣는 설정(NEDRUG_REPORT_PDFS, 기본)이면 PDF 는 어차피 필요하므로
+            # 첨부파일 ID 가 보이는 즉시 HTML 항목을 파싱하는 동안 미리 받기 시작
+            attachments = pdf_attachments_on_page(driver)
+            if report_pdfs_enabled():
+                prefetched = prefetch_first_pdf(prefetch, attachments, attachment_index, ctx)
+
             ingredient_name = extract_ingredient_name_from_html(driver)
             submit_deadline_from_html = ""
             plan_date_from_html = ""
@@ -426,245 +553,296 @@ def process_single_item(driver, row, idx, downloaded_files, records):
             elif status == "변경명령":
                 reflect_date_from_html = extract_reflect_date_from_html(driver)
            
-            need_pdf_processing = False
-            if not ingredient_name or \
-               (status == "변경명령(안) 의견조회" and not submit_deadline_from_html) or \
-               (status == "사전예고" and not plan_date_from_html) or \
-               (status == "변경명령" and not reflect_date_from_html) or \
-               status in ["변경명령(안) 의견조회", "변경명령"]:
-                need_pdf_processing = True
-           
+            # 필드별로 비용이 싼 출처(HTML 표 → 목록 행 → 내용 본문 → 이미 추출한 PDF 텍스트)부터 채우고,
+            # 그래도 빈 필드가 남을 때만 PDF 를 받아 처리
+            plan = ExtractionPlan(status)
+            plan.offer("html", ingredient=ingredient_name, submit_deadline=submit_deadline_from_html,
+                       plan_date=plan_date_from_html, reflect_date=reflect_date_from_html)
+            plan.offer("list", reflect_date=list_date(change_reflect_date))
+            if prefetched is None and not plan.complete:
+                # HTML 표/목록으로 채우지 못한 필드가 있으면 본문/캐시를 확인하는 동안 미리 받기 시작
+                prefetched = prefetch_first_pdf(prefetch, attachments, attachment_index, ctx)
+            if not plan.complete:
+                plan.apply_text("textarea", extract_content_text_from_html(driver), TEXTAREA_FIELDS)
+            cached_pdf_path = ""
+            if not plan.complete:
+                cached_pdf_path = apply_cached_pdf_text(plan, attachments, attachment_index)
+
+            need_pdf_processing = not plan.complete
             if not need_pdf_processing:
-                print(f"    🚀 HTML에서 모든 정보 추출 완료, PDF 다운로드 및 처리 생략")
+                log.debug("    🚀 HTML/본문에서 모든 정보 추출 완료, PDF 텍스트 추출 생략")
+                current_item_processed_pdf_path = cached_pdf_path
+                if not cached_pdf_path and attachments:
+                    # 보고서 PDF파일 칸용으로만 첫 첨부파일 확보 (NEDRUG_REPORT_PDFS=0 이면 이름만)
+                    current_item_processed_pdf_path, pdf_downloaded = report_only_pdf(
+                        attachments, attachment_index, ctx, prefetch, prefetched)
+                elif prefetch is not None:
+                    prefetch.cancel(prefetched)
+                prefetched = None
             else:
-                try:
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "button[onclick^='downEdmsFile']"))
-                    )
-                    buttons = driver.find_elements(By.CSS_SELECTOR, "button[onclick^='downEdmsFile']")
-                except TimeoutException:
-                    print(f"    ⚠️  첨부파일 버튼을 찾을 수 없음. PDF 처리 불가.")
-                    buttons = []
-
-                for btn in buttons:
-                    file_id = ""
-                    filename = ""
-                    
+                if not attachments:
                     try:
-                        onclick = btn.get_attribute("onclick")
-                        if not onclick:
-                            continue
-                           
-                        file_id_match = re.search(r"downEdmsFile\('([^']+)',\s*'([^']+)'\)", onclick)
-                        if not file_id_match:
-                            file_id_match = re.search(r"downEdmsFile\('([^']+)'\)", onclick)
-                            if file_id_match:
-                                file_id = file_id_match.group(1)
-                                filename = btn.get_attribute("title")
-                                if not filename:
-                                    filename = f"file_{file_id}.pdf"
-                            else:
-                                continue
+                        WebDriverWait(driver, 10).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, "button[onclick^='downEdmsFile']"))
+                        )
+                        attachments = pdf_attachments_on_page(driver)
+                    except TimeoutException:
+                        log.warning("    ⚠️  첨부파일 버튼을 찾을 수 없음. PDF 처리 불가.")
+
+                for file_id, filename in attachments:
+                    try:
+                        if prefetched is not None and prefetched.key == file_id:
+                            saved_path, file_content = prefetch.result(prefetched)
+                            prefetched = None
                         else:
-                            file_id = file_id_match.group(1)
-                            filename = file_id_match.group(2)
-
-                        filename = filename.strip()
-                        file_extension = os.path.splitext(filename)[1].lower()
-
-                        if file_extension != '.pdf':
-                            print(f"    ⏭️  PDF 파일 아님 ({file_extension}), 다운로드 스킵: {filename}")
-                            continue
-
-                        # ★★★ 핵심 수정: 안전한 파일명 생성 ★★★
-                        original_filename = filename
-                        safe_filename = create_safe_filename(original_filename)
-                        
-                        print(f"    📝 파일명 변환: {original_filename} → {safe_filename}")
-
-                        if original_filename in downloaded_files:
-                            print(f"    ⏭️  이미 다운로드됨: {original_filename}")
-                            continue
-
-                        download_url = f"https://nedrug.mfds.go.kr/cmn/edms/down/{file_id}"
-                        local_file_path = os.path.join(DOWNLOAD_DIR, safe_filename)
-
-                        file_content = None
-                        for attempt in range(MAX_RETRIES):
-                            try:
-                                print(f"    ⏳ {safe_filename} 다운로드 시도 {attempt + 1}/{MAX_RETRIES}...")
-                                response = requests.get(download_url, headers=HEADERS, timeout=30)
-                                response.raise_for_status()
-                                file_content = response.content
-                                print(f"      ✅ 다운로드 성공. 크기: {len(file_content)} bytes.")
-                                break
-                            except requests.exceptions.RequestException as req_err:
-                                print(f"      ⚠️  다운로드 요청 실패 (재시도 {attempt + 1}): {req_err}")
-                                time.sleep(RETRY_DELAY)
-                            except Exception as general_err:
-                                print(f"      ⚠️  다운로드 중 일반 오류 (재시도 {attempt + 1}): {general_err}")
-                                time.sleep(RETRY_DELAY)
-                        
-                        if file_content is None:
-                            print(f"   ❌ {safe_filename} 모든 재시도 실패. 다운로드 건너뜀.")
-                            continue
-
-                        try:
-                            with open(local_file_path, "wb") as f:
-                                f.write(file_content)
-                            print(f"   💾 파일 저장 완료: {safe_filename}")
-                            downloaded_files.add(original_filename)  # 원본 파일명으로 중복 체크
-                            current_item_processed_pdf_path = local_file_path
-                            break
-                            
-                        except Exception as save_err:
-                            print(f"   ❌ {safe_filename} 저장 중 오류 발생: {save_err}")
-                            continue
-
+                            saved_path, file_content = fetch_pdf_attachment(file_id, filename, attachment_index, ctx)
                     except Exception as btn_proc_error:
-                        print(f"    ⚠️  버튼({filename}) 처리 중 오류 발생: {btn_proc_error}")
+                        log.warning("    ⚠️  버튼(%s) 처리 중 오류 발생: %s", filename, btn_proc_error)
                         continue
+                    if saved_path:
+                        current_item_processed_pdf_path = saved_path
+                        current_item_pdf_bytes = file_content
+                        pdf_downloaded = file_content is not None
+                        break
             
-            # --- 다운로드된 PDF 파일 (혹은 HTML에서 추출된 텍스트)에서 정보 추출 ---
-            # 한 번 찾은 시행날짜, 제출날짜, 예정일, 반영일자는 덮어쓰지 않도록 플래그 사용
-            record_exec_date = ""
-            final_submit_deadline = ""
-            final_plan_date = ""
-            final_reflect_date = ""
+            # --- 다운로드된 PDF 파일에서 아직 비어 있는 항목 추출 ---
             full_text_from_pdf = "" # 텍스트 추출은 여기서 한번만 수행
-            record_pdf_path = "" # 관련 PDF 경로 저장
+            record_pdf_path = current_item_processed_pdf_path # 관련 PDF 경로 저장
+            ocr_job = None # 스캔본 PDF 의 OCR 작업 (결과는 나중에 반영)
+            pdf_source = None # 텍스트/시행날짜 추출에 함께 쓰는 PDF 내용 (PdfSource)
 
             # PDF가 성공적으로 다운로드되고 저장되었다면 텍스트 추출 시도
-            if current_item_processed_pdf_path:
-                print(f"    🔍 PDF 텍스트 추출 시작: {os.path.basename(current_item_processed_pdf_path)}")
-                full_text_from_pdf = _extract_text_from_pdf_with_fitz(current_item_processed_pdf_path)
+            # 같은 첨부파일의 파싱 결과는 attachment_index.parsed() 로 항목 간에 공유
+            parsed = attachment_index.parsed(current_item_processed_pdf_path) if need_pdf_processing and current_item_processed_pdf_path else {}
+            if 'text' in parsed:
+                full_text_from_pdf = default_text_store().get(parsed['text'])
+                ocr_job = parsed.get('ocr_job')
+                profiler.count("pdf_text_reused")
+                log.debug("    ♻️  이미 추출한 PDF 텍스트 재사용: %s", os.path.basename(current_item_processed_pdf_path))
+            elif need_pdf_processing and current_item_processed_pdf_path:
+                log.debug("    🔍 PDF 텍스트 추출 시작: %s", os.path.basename(current_item_processed_pdf_path))
+                # 방금 받은 bytes 또는 저장된 파일의 mmap 을 fitz/PyPDF2 가 함께 사용 (디스크 재읽기/복사 없음)
+                pdf_source = PdfSource.open(current_item_processed_pdf_path, current_item_pdf_bytes)
+                full_text_from_pdf = _extract_text_from_pdf_with_fitz(pdf_source)
                 if not full_text_from_pdf: # fitz 실패 시 PyPDF2 시도
-                    full_text_from_pdf = _extract_text_from_pdf_with_pypdf2(current_item_processed_pdf_path)
-                    if not full_text_from_pdf:
-                        print(f"    ❌ {os.path.basename(current_item_processed_pdf_path)}에서 텍스트 추출 최종 실패.")
-                # PDF 텍스트 추출 성공 여부와 관계없이, 다운로드된 PDF 경로를 저장합니다.
-                record_pdf_path = current_item_processed_pdf_path
-            
-            # HTML에서 성분명 추출이 실패했다면 PDF 텍스트에서 추출 시도
-            if not ingredient_name and full_text_from_pdf:
-                ingredient_name = extract_ingredient_name_from_pdf(full_text_from_pdf)
-                if ingredient_name:
-                    print(f"    ✅ 최종 원료/성분명 (PDF에서 추출): {ingredient_name}")
-
-            # 시행날짜 추출 (아직 찾지 못했을 경우에만 시도)
-            if status in ["변경명령(안) 의견조회", "변경명령"] and not record_exec_date and full_text_from_pdf:
-                exec_date_found = extract_exec_date_from_pdf(current_item_processed_pdf_path) # 함수 인자 변경 (텍스트 추출은 extract_exec_date_from_pdf 내부에서 수행)
-                if exec_date_found:
-                    record_exec_date = exec_date_found
-                    print(f"    ✅ 시행날짜 추출 성공: {record_exec_date}")
+                    full_text_from_pdf = _extract_text_from_pdf_with_pypdf2(pdf_source)
+                    if not full_text_from_pdf and ocr is not None:
+                        ocr_job = parsed['ocr_job'] = ocr.submit(current_item_processed_pdf_path)
+                    if ocr_job is not None:
+                        log.info("    🔠 %s 텍스트 레이어 없음 - OCR 대기열에 추가", os.path.basename(current_item_processed_pdf_path))
+                    elif not full_text_from_pdf:
+                        log.warning("    ❌ %s에서 텍스트 추출 최종 실패.", os.path.basename(current_item_processed_pdf_path))
+                # 긴 PDF 텍스트는 TextStore(임시 파일)에 두고 참조만 보관
+                parsed['text'] = default_text_store().put(full_text_from_pdf)
+
+            # 시행날짜는 fitz/PyPDF2 줄 단위 검색까지 하는 extract_exec_date_from_pdf 로 추출 (결과는 첨부파일별로 공유)
+            if "exec_date" in plan.missing() and full_text_from_pdf:
+                if 'exec_date' not in parsed:
+                    parsed['exec_date'] = extract_exec_date_from_pdf(pdf_source or current_item_processed_pdf_path)
+                plan.offer("pdf", exec_date=parsed['exec_date'])
+                if parsed['exec_date']:
+                    log.debug("    ✅ 시행날짜 추출 성공: %s", parsed['exec_date'])
                 else:
-                    print(f"    ❌ {os.path.basename(current_item_processed_pdf_path)} PDF에서 시행날짜 찾기 실패.")
-            
-            # 제출날짜/예정일/반영일자 추출 (아직 찾지 못했고, 텍스트가 있다면)
-            if status == "변경명령(안) 의견조회" and not submit_deadline_from_html and not final_submit_deadline and full_text_from_pdf:
-                extracted_date = extract_submit_deadline_from_pdf(full_text_from_pdf)
-                if extracted_date:
-                    final_submit_deadline = extracted_date
-                    print(f"    ✅ 제출날짜 (PDF에서 추출): {final_submit_deadline}")
-
-            if status == "사전예고" and not plan_date_from_html and not final_plan_date and full_text_from_pdf:
-                extracted_date = extract_plan_date_from_pdf(full_text_from_pdf)
-                if extracted_date:
-                    final_plan_date = extracted_date
-                    print(f"    ✅ 예정일 (PDF에서 추출): {final_plan_date}")
-
-            if status == "변경명령" and not reflect_date_from_html and not final_reflect_date and full_text_from_pdf:
-                extracted_date = extract_reflect_date_from_pdf(full_text_from_pdf)
-                if extracted_date:
-                    final_reflect_date = extracted_date
-                    print(f"    ✅ 반영일자 (PDF에서 추출): {final_reflect_date}")
-
-            # 최종 성분명 확인 (HTML 또는 PDF에서 추출된 것 중 마지막으로 업데이트된 값)
-            if not ingredient_name:
-                print(f"    ❌ 원료/성분명 추출 실패 (HTML 및 모든 PDF)")
-                ingredient_name = ""
-
-            final_exec_date = record_exec_date if record_exec_date else ""
-
-            # 단계별로 다른 레코드 구조 생성
-            if status == "변경명령(안) 의견조회":
-                record = {
-                    "A_제목": title,
-                    "B_단계": "의견조회",
-                    "C_시행날짜": final_exec_date,
-                    "D_제출날짜": submit_deadline_from_html if submit_deadline_from_html else final_submit_deadline,
-                    "E_예정일": "",
-                    "F_반영일자": "",
-                    "G_원료성분명": ingredient_name,
-                    "H_관련 URL": record_url,
-                    "I_관련 PDF": record_pdf_path
-                }
-
-            elif status == "사전예고":
-                record = {
-                    "A_제목": title,
-                    "B_단계": "사전예고",
-                    "C_시행날짜": "",
-                    "D_제출날짜": "",
-                    "E_예정일": plan_date_from_html if plan_date_from_html else final_plan_date,
-                    "F_반영일자": "",
-                    "G_원료성분명": ingredient_name,
-                    "H_관련 URL": record_url,
-                    "I_관련 PDF": record_pdf_path
-                }
-
-            elif status == "변경명령":
-                record = {
-                    "A_제목": title,
-                    "B_단계": "변경명령",
-                    "C_시행날짜": final_exec_date,
-                    "D_제출날짜": "",
-                    "E_예정일": "",
-                    "F_반영일자": reflect_date_from_html if reflect_date_from_html else final_reflect_date,
-                    "G_원료성분명": ingredient_name,
-                    "H_관련 URL": record_url,
-                    "I_관련 PDF": record_pdf_path
-                }
-
-            records.append(record)
-            print(f"    📝 레코드 추가됨")
-
-            if not any([record.get("C_시행날짜"), record.get("D_제출날짜"), record.get("E_예정일"), record.get("F_반영일자"), record.get("G_원료성분명")]):
-                print(f"    ⚠️  경고: 이 항목 [{title}]에서 필요한 모든 정보 추출 실패!")
+                    log.info("    ❌ %s PDF에서 시행날짜 찾기 실패.", os.path.basename(current_item_processed_pdf_path))
+            if pdf_source is not None:
+                pdf_source.close()
+
+            # 성분명/제출날짜/예정일/반영일자 중 아직 비어 있는 항목을 PDF 텍스트에서 추출
+            plan.apply_text("pdf", full_text_from_pdf, PDF_TEXT_FIELDS)
+            for field in PDF_TEXT_FIELDS:
+                if plan.sources.get(field) == "pdf":
+                    log.debug("    ✅ %s (PDF에서 추출): %s", field, plan.values[field])
+
+            if "ingredient" in plan.missing():
+                log.info("    ❌ 원료/성분명 추출 실패 (HTML 및 모든 PDF)")
+            plan.finish(needed=need_pdf_processing, downloaded=pdf_downloaded)
+
+            record = FinaleRecord(title=title, stage=STAGE_NAMES[status], url=record_url, pdf_path=record_pdf_path,
+                                  **plan.values)
+            if not state.add_record(row_key, record):
+                log.debug("    ⏭️  이미 추가된 레코드")
+                return False
+            profiler.add_items()
+            state.incr("items_processed")
+            log.debug("    📝 레코드 추가됨")
+            if snapshot is not None:
+                snapshot.update(row_key, title, status, change_reflect_date, record, row_change)
+
+            if ocr_job is not None:
+                ocr_job.tags.append(record)
+            elif not any([record.get("C_시행날짜"), record.get("D_제출날짜"), record.get("E_예정일"), record.get("F_반영일자"), record.get("G_원료성분명")]):
+                log.warning("    ⚠️  경고: 이 항목 [%s]에서 필요한 모든 정보 추출 실패!", title)
                 if current_item_processed_pdf_path:
-                    print(f"    🔍 처리된 PDF 파일: {current_item_processed_pdf_path}")
+                    log.warning("    🔍 처리된 PDF 파일: %s", current_item_processed_pdf_path)
                 else:
-                    print(f"    🔍 이 항목에 PDF 첨부파일이 없거나 다운로드에 실패했습니다.")
-
+                    log.warning("    🔍 이 항목에 PDF 첨부파일이 없거나 다운로드에 실패했습니다.")
+            return True
 
         except TimeoutException:
-            print(f"    ⚠️  첨부파일 버튼을 찾을 수 없음 또는 상세 페이지 로딩 실패. 스킵합니다.")
+            log.warning("    ⚠️  첨부파일 버튼을 찾을 수 없음 또는 상세 페이지 로딩 실패. 스킵합니다.")
+            _release_failed_item(state, row_key)
         except Exception as detail_error:
-            print(f"    ⚠️  상세 페이지 처리 중 오류 발생: {detail_error}")
+            log.warning("    ⚠️  상세 페이지 처리 중 오류 발생: %s", detail_error)
+            _release_failed_item(state, row_key)
         finally:
+            if prefetch is not None:
+                prefetch.cancel(prefetched)
             driver.close()
             driver.switch_to.window(driver.window_handles[0])
             time.sleep(0.5)
 
     except Exception as e:
-        print(f"[{idx}] ⚠️  오류 발생: {e}")
+        log.warning("[%s] ⚠️  오류 발생: %s", idx, e)
+        _release_failed_item(state, row_key)
         if len(driver.window_handles) > 1:
             driver.close()
             driver.switch_to.window(driver.window_handles[0])
+    return False
+
+def _release_failed_item(state, row_key):
+    """처리에 실패한 항목의 claim 반납 (같은 실행의 다른 작업자가 다시 처리할 수 있게)"""
+    state.incr("items_failed")
+    if row_key is not None:
+        state.release("item", row_key)
 
-def main():
-    driver = webdriver.Chrome(options=options)
-    records = []
-    downloaded_files = set()
+def finalize_records(state, ctx, ocr, snapshot):
+    """
+    크롤링이 끝난 레코드 후처리: OCR 결과 반영, 목록 스냅샷/변경 내역 저장, 전문 검색 인덱스 갱신
+
+    OCR 결과를 반영한 레코드는 state.update_record 로 다시 저장합니다 (SQLiteState 는 추가할 때의 사본을 보관하므로).
+    반환값: state 에 모인 최종 레코드 목록 (추가된 순서)
+    """
+    # 크롤링 중에 등록된 OCR 작업 결과 반영
+    ocr_pages = {}
+    if ocr.jobs:
+        print(f"🔠 OCR 결과 대기 중... ({len(ocr.jobs)}건)")
+        for job, ocr_text in ocr.drain():
+            ocr_pages[job.pdf_path] = job.page_texts
+            for record in job.tags:
+                if ocr_text:
+                    apply_text_to_record(record, ocr_text)
+                    state.update_record(record_key(record), record)
+
+    # 목록 스냅샷 저장 및 변경 내역 기록
+    snapshot.save()
+    new_count = sum(1 for change in snapshot.changes if change['kind'] == 'new')
+    print(f"🔄 변경 감지: 신규 {new_count}건, 변경 {len(snapshot.changes) - new_count}건")
+    change_log_path = snapshot.write_change_log(os.path.join(ctx.excel_save_dir, CHANGE_LOG_FILENAME))
+    if change_log_path:
+        print(f"  📝 변경 내역: {change_log_path}")
+
+    # 전문 검색 인덱스 갱신 (python nedrug_search.py query <검색어>)
+    records = state.records()
+    if records:
+        update_search_index(records, ocr_pages)
+    return records
+
+def write_excel_report(records, ctx, attachment_index, filename=None, side_outputs=None):
+    """
+    수집 레코드를 단계별 시트(의견조회/사전예고/변경명령)와 성분별 시트로 나눠 엑셀로 저장 (nedrug_report)
+
+    filename 이 없으면 '변경명령_의견조회_요약_최근N건.xlsx'
+    side_outputs: 같이 쓸 부가 출력 형식 ('csv', 'parquet'; 없으면 NEDRUG_REPORT_SIDE_OUTPUTS)
+    반환값: 저장한 엑셀 파일 경로
+    """
+    rows = report_rows(records)
+    output_path = os.path.join(ctx.excel_save_dir, filename or f"변경명령_의견조회_요약_최근{len(rows)}건.xlsx")
+    summary = write_workbook(records, output_path, side_outputs, rows=rows)
+
+    print(f"✅ 엑셀 파일 저장 완료!")
+    print(f"📁 저장 경로: {output_path}")
+    print(f"📋 최종 레코드 수: {summary.rows}개")
+
+    # 사용자 가이드 출력
+    print(f"\n📖 사용 가이드:")
+    print(f"┌─────────────────────────────────────────────────┐")
+    print(f"│ 📊 Excel 파일: {os.path.basename(output_path):<30} │")
+    print(f"│ 📂 PDF 폴더:   nedrug_pdfs/                     │")
+    print(f"│ 💡 사용법:     Excel에서 PDF파일명 확인 후      │")
+    print(f"│               PDF 폴더에서 직접 열어주세요      │")
+    print(f"│ 🔗 웹링크:     '관련 URL' 컬럼 클릭으로 이동    │")
+    print(f"└─────────────────────────────────────────────────┘")
+    if not report_pdfs_enabled():
+        print(f"ℹ️  NEDRUG_REPORT_PDFS=0: 필드 추출에 필요 없던 첨부파일은 받지 않았습니다 "
+              f"(PDF파일 칸 '{PDF_NOT_DOWNLOADED_PREFIX}<첨부파일 이름>', 상세 페이지에서 받을 수 있음)")
+
+    print(f"\n📈 상태별 통계:")
+    for status_item, count_item in sorted(summary.stage_counts.items(), key=lambda item: -item[1]):
+        print(f"  - {status_item}: {count_item}개")
+
+    print(f"\n📂 저장된 파일들:")
+    print(f"  📊 엑셀 파일: {output_path}")
+    for sheet_name in STAGE_SHEETS:
+        print(f"     - {sheet_name} 시트: {summary.sheets.get(sheet_name, 0)}건")
+    print(f"     - {INGREDIENT_SHEET} 시트: {summary.sheets.get(INGREDIENT_SHEET, 0)}개 성분")
+    for side_path in summary.side_outputs:
+        print(f"  🧾 부가 출력: {side_path}")
+    print(f"  📄 다운로드된 PDF 파일들: {ctx.download_dir}")
+    print(f"     (총 {len(attachment_index)}개 PDF 파일이 다운로드되었습니다.)")
+
+    # 폴더 구조 안내
+    print(f"\n📁 폴더 구조:")
+    print(f"  {ctx.result_folder_name}/")
+    print(f"  ├── {os.path.basename(output_path)}")
+    print(f"  └── nedrug_pdfs/")
+    saved_filenames = attachment_index.filenames()
+    for i, filename in enumerate(saved_filenames, 1):
+        if i <= 3:  # 처음 3개만 표시
+            print(f"      ├── {filename}")
+        elif i == 4 and len(saved_filenames) > 3:
+            print(f"      └── ... (총 {len(saved_filenames)}개 파일)")
+            break
+    return output_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="의약품안전나라 변경명령/의견조회/사전예고 수집")
+    parser.add_argument("--changes-only", action="store_true",
+                        help="지난 실행 스냅샷과 비교해 신규/변경된 항목만 상세 페이지와 PDF 를 다시 처리")
+    parser.add_argument("--metrics-port", type=int,
+                        help="진행률/계측값 HTTP 엔드포인트 포트 (Prometheus 형식, 기본: NEDRUG_METRICS_PORT)")
+    parser.add_argument("--side-outputs",
+                        help="엑셀과 함께 시트별로 쓸 부가 출력 (csv,parquet 쉼표 구분, 기본: NEDRUG_REPORT_SIDE_OUTPUTS)")
+    parser.add_argument("--state-db",
+                        help="여러 프로세스가 함께 쓰는 실행 상태 SQLite 파일 (같은 파일을 쓰는 프로세스끼리 항목을 나눠 처리, "
+                             "기본: NEDRUG_STATE_DB, 없으면 프로세스 메모리)")
+    parser.add_argument("--run-id",
+                        help="--state-db 를 함께 쓰는 작업자들이 맞추는 실행 ID (기본: NEDRUG_RUN_ID, 없으면 새 실행)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    metrics_server = start_metrics_server(args.metrics_port)
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    ctx = RunContext().prepare()
+    ocr = OcrPool(cache_dir=os.path.join(ctx.script_run_dir, OCR_CACHE_DIRNAME))
+    if ocr.available:
+        print(f"🔠 OCR 사용: tesseract ({ocr.lang}, 작업 프로세스 {ocr.workers}개)")
+    elif ocr.enabled:
+        print(f"ℹ️  OCR 사용 안 함: {ocr.unavailable_reason}")
+    snapshot = SnapshotStore(os.path.join(ctx.script_run_dir, SNAPSHOT_FILENAME), skip_unchanged=args.changes_only)
+    if args.changes_only:
+        print(f"🔄 변경 감지 모드: 스냅샷 {len(snapshot)}건과 비교해 신규/변경 항목만 다시 처리")
+    driver = webdriver.Chrome(options=ctx.chrome_options())
+    state = open_state(args.state_db, run_id=args.run_id)
+    if getattr(state, "run_id", None):
+        print(f"🗄️  공유 실행 상태: {state.path} (실행 ID {state.run_id}, 다른 작업자는 --run-id {state.run_id})")
+    attachment_index = AttachmentIndex(ctx.download_dir)
+    prefetch = PrefetchPool(fetch_pdf_attachment) # 상세 페이지 파싱 중 첨부파일 선행 다운로드
+    register_gauge("attachments", attachment_index.__len__, "이번 실행에서 확보한 첨부파일 수 (중복 제외)")
+    register_gauge("state_records", state.record_count, "실행 상태에 모인 레코드 수 (작업자 전체)")
     max_items = 10 
 
     try:
         print(f"🚀 크롤링 시작... (최근 {max_items}건만 처리)")
        
-        driver.get(BASE_URL)
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
-        )
+        with profiler.stage("fetch"):
+            driver.get(BASE_URL)
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+            )
        
         total_pages, total_items = get_total_pages(driver)
         print(f"📊 현재 데이터베이스 현황:")
@@ -672,185 +850,66 @@ def main():
         print(f"   - 총 항목: {total_items}건")
         print(f"   - 처리 예정: 최신 {min(max_items, total_items)}건")
        
-        for page_num in range(1, total_pages + 1):
-            if len(records) >= max_items:
-                print(f"✅ 목표 {max_items}건 도달로 처리 완료")
-                break
-               
-            print(f"\n📄 === 페이지 {page_num}/{total_pages} 처리 중 ===")
-            print(f"현재 처리된 건수: {len(records)}/{max_items}")
-           
-            if not navigate_to_page(driver, page_num):
-                continue
-           
-            rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
-           
-            for idx, row in enumerate(rows, start=(page_num-1)*10 + 1):
-                if len(records) >= max_items:
-                    print(f"✅ 목표 {max_items}건 도달로 페이지 내 처리 중단")
+        with ProgressBar(total=min(max_items, total_items), desc="📋 수집") as progress:
+            for page_num in range(1, total_pages + 1):
+                if state.record_count() >= max_items:
+                    log.info("✅ 목표 %s건 도달로 처리 완료", max_items)
                     break
                    
-                process_single_item(driver, row, idx, downloaded_files, records)
-            
-            print(f"페이지 {page_num} 완료 - (누적: {len(records)}개)") 
-           
-            if len(records) >= max_items:
-                break
+                log.debug("\n📄 === 페이지 %s/%s 처리 중 ===", page_num, total_pages)
+                log.debug("현재 처리된 건수: %s/%s", state.record_count(), max_items)
+               
+                if not navigate_to_page(driver, page_num):
+                    continue
+               
+                rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
+               
+                for idx, row in enumerate(rows, start=(page_num-1)*10 + 1):
+                    if state.record_count() >= max_items:
+                        log.info("✅ 목표 %s건 도달로 페이지 내 처리 중단", max_items)
+                        break
+                       
+                    if process_single_item(driver, row, idx, attachment_index, state, ctx, ocr, snapshot, prefetch):
+                        progress.update(1, ok=True)
+                
+                log.debug("페이지 %s 완료 - (누적: %s개)", page_num, state.record_count())
+               
+                if state.record_count() >= max_items:
+                    break
 
     except Exception as e:
         print(f"❌ 전체 프로세스 오류: {e}")
     finally:
         driver.quit()
+        prefetch.close()
+        attachment_index.close()
+        ctx.close()
+
+    records = finalize_records(state, ctx, ocr, snapshot)
+    ocr.close()
+    counters = state.counters()
+    state.close()
 
     print(f"\n📊 수집 완료!")
     print(f"목표: {max_items}건")
     print(f"실제 수집된 레코드: {len(records)}개")
-    print(f"다운로드된 파일: {len(downloaded_files)}개")
+    print(f"다운로드된 파일: {len(attachment_index)}개 (중복 제외)")
+    if counters.get("items_failed") or counters.get("items_claimed_elsewhere"):
+        print(f"작업자 상태: 처리 실패 {counters.get('items_failed', 0)}건, "
+              f"다른 작업자 처리 {counters.get('items_claimed_elsewhere', 0)}건")
    
-    # Excel 파일 생성 부분 (main 함수의 마지막 부분을 수정)
-
+    # Excel 파일 생성
     if records:
-        df = pd.DataFrame(records).drop_duplicates()
-    
-        output_path = os.path.join(EXCEL_SAVE_DIR, f"변경명령_의견조회_요약_최근{len(df)}건.xlsx")
-    
-        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-            workbook = writer.book
-            hyperlink_format = workbook.add_format({'font_color': 'blue', 'underline': 1})
-
-            # 의견조회 시트
-            opinion_df = df[df['B_단계'] == '의견조회'].copy()
-            if not opinion_df.empty:
-                opinion_final = opinion_df[['A_제목', 'B_단계', 'C_시행날짜', 'D_제출날짜', 'G_원료성분명', 'H_관련 URL', 'I_관련 PDF']]
-                opinion_final.columns = ['제목', '단계', '시행날짜', '제출날짜', '원료/성분명(영문)', '관련 URL', 'PDF파일']
-                opinion_final.to_excel(writer, sheet_name='의견조회', index=False)
-                worksheet = writer.sheets['의견조회']
-                
-                # 컬럼 너비 자동 조정
-                worksheet.set_column('A:A', 35)  # 제목
-                worksheet.set_column('B:B', 12)  # 단계
-                worksheet.set_column('C:C', 15)  # 시행날짜
-                worksheet.set_column('D:D', 15)  # 제출날짜
-                worksheet.set_column('E:E', 25)  # 원료/성분명
-                worksheet.set_column('F:F', 35)  # 관련 URL
-                worksheet.set_column('G:G', 45)  # PDF파일
-                
-                # '관련 URL' 컬럼에 하이퍼링크 적용
-                url_col_idx = opinion_final.columns.get_loc('관련 URL')
-                for row_num, url in enumerate(opinion_final['관련 URL'], start=1):
-                    if url:
-                        worksheet.write_url(row_num, url_col_idx, url, hyperlink_format, url)
-                
-                # 'PDF파일' 컬럼에 파일명만 표시 (하이퍼링크 없음)
-                pdf_col_idx = opinion_final.columns.get_loc('PDF파일')
-                for row_num, pdf_path in enumerate(opinion_final['PDF파일'], start=1):
-                    if pdf_path and os.path.exists(pdf_path):
-                        pdf_filename = os.path.basename(pdf_path)
-                        worksheet.write_string(row_num, pdf_col_idx, pdf_filename)
-                    else:
-                        worksheet.write_string(row_num, pdf_col_idx, "")
-            
-            # 사전예고 시트
-            preview_df = df[df['B_단계'] == '사전예고'].copy()
-            if not preview_df.empty:
-                preview_final = preview_df[['A_제목', 'B_단계', 'E_예정일', 'G_원료성분명', 'H_관련 URL', 'I_관련 PDF']]
-                preview_final.columns = ['제목', '단계', '예정일', '원료/성분명(영문)', '관련 URL', 'PDF파일']
-                preview_final.to_excel(writer, sheet_name='사전예고', index=False)
-                worksheet = writer.sheets['사전예고']
-
-                # 컬럼 너비 조정
-                worksheet.set_column('A:A', 35)  # 제목
-                worksheet.set_column('B:B', 12)  # 단계
-                worksheet.set_column('C:C', 15)  # 예정일
-                worksheet.set_column('D:D', 25)  # 원료/성분명
-                worksheet.set_column('E:E', 35)  # 관련 URL
-                worksheet.set_column('F:F', 45)  # PDF파일
-
-                url_col_idx = preview_final.columns.get_loc('관련 URL')
-                for row_num, url in enumerate(preview_final['관련 URL'], start=1):
-                    if url:
-                        worksheet.write_url(row_num, url_col_idx, url, hyperlink_format, url)
-                
-                pdf_col_idx = preview_final.columns.get_loc('PDF파일')
-                for row_num, pdf_path in enumerate(preview_final['PDF파일'], start=1):
-                    if pdf_path and os.path.exists(pdf_path):
-                        pdf_filename = os.path.basename(pdf_path)
-                        worksheet.write_string(row_num, pdf_col_idx, pdf_filename)
-                    else:
-                        worksheet.write_string(row_num, pdf_col_idx, "")
-
-            # 변경명령 시트
-            command_df = df[df['B_단계'] == '변경명령'].copy()
-            if not command_df.empty:
-                command_final = command_df[['A_제목', 'B_단계', 'C_시행날짜', 'F_반영일자', 'G_원료성분명', 'H_관련 URL', 'I_관련 PDF']]
-                command_final.columns = ['제목', '단계', '시행날짜', '반영일자', '원료/성분명(영문)', '관련 URL', 'PDF파일']
-                command_final.to_excel(writer, sheet_name='변경명령', index=False)
-                worksheet = writer.sheets['변경명령']
-
-                # 컬럼 너비 조정
-                worksheet.set_column('A:A', 35)  # 제목
-                worksheet.set_column('B:B', 12)  # 단계
-                worksheet.set_column('C:C', 15)  # 시행날짜
-                worksheet.set_column('D:D', 15)  # 반영일자
-                worksheet.set_column('E:E', 25)  # 원료/성분명
-                worksheet.set_column('F:F', 35)  # 관련 URL
-                worksheet.set_column('G:G', 45)  # PDF파일
-
-                url_col_idx = command_final.columns.get_loc('관련 URL')
-                for row_num, url in enumerate(command_final['관련 URL'], start=1):
-                    if url:
-                        worksheet.write_url(row_num, url_col_idx, url, hyperlink_format, url)
-                
-                pdf_col_idx = command_final.columns.get_loc('PDF파일')
-                for row_num, pdf_path in enumerate(command_final['PDF파일'], start=1):
-                    if pdf_path and os.path.exists(pdf_path):
-                        pdf_filename = os.path.basename(pdf_path)
-                        worksheet.write_string(row_num, pdf_col_idx, pdf_filename)
-                    else:
-                        worksheet.write_string(row_num, pdf_col_idx, "")
-    
-        print(f"✅ 엑셀 파일 저장 완료!")
-        print(f"📁 저장 경로: {output_path}")
-        print(f"📋 최종 레코드 수: {len(df)}개")
-        
-        # 사용자 가이드 출력
-        print(f"\n📖 사용 가이드:")
-        print(f"┌─────────────────────────────────────────────────┐")
-        print(f"│ 📊 Excel 파일: {os.path.basename(output_path):<30} │")
-        print(f"│ 📂 PDF 폴더:   nedrug_pdfs/                     │")
-        print(f"│ 💡 사용법:     Excel에서 PDF파일명 확인 후      │")
-        print(f"│               PDF 폴더에서 직접 열어주세요      │")
-        print(f"│ 🔗 웹링크:     '관련 URL' 컬럼 클릭으로 이동    │")
-        print(f"└─────────────────────────────────────────────────┘")
-    
-        status_counts = df['B_단계'].value_counts()
-        print(f"\n📈 상태별 통계:")
-        for status_item, count_item in status_counts.items():
-            print(f"  - {status_item}: {count_item}개")
-    
-        print(f"\n📂 저장된 파일들:")
-        print(f"  📊 엑셀 파일: {output_path}")
-        print(f"     - 의견조회 시트: {len(opinion_df) if 'opinion_df' in locals() else 0}건")
-        print(f"     - 사전예고 시트: {len(preview_df) if 'preview_df' in locals() else 0}건")
-        print(f"     - 변경명령 시트: {len(command_df) if 'command_df' in locals() else 0}건")
-        print(f"  📄 다운로드된 PDF 파일들: {DOWNLOAD_DIR}")
-        print(f"     (총 {len(downloaded_files)}개 PDF 파일이 다운로드되었습니다.)")
-        
-        # 폴더 구조 안내
-        print(f"\n📁 폴더 구조:")
-        print(f"  {RESULT_FOLDER_NAME}/")
-        print(f"  ├── {os.path.basename(output_path)}")
-        print(f"  └── nedrug_pdfs/")
-        for i, filename in enumerate(sorted(downloaded_files), 1):
-            if i <= 3:  # 처음 3개만 표시
-                safe_name = create_safe_filename(filename)
-                print(f"      ├── {safe_name}")
-            elif i == 4 and len(downloaded_files) > 3:
-                print(f"      └── ... (총 {len(downloaded_files)}개 파일)")
-                break
-                
+        write_excel_report(records, ctx, attachment_index, side_outputs=args.side_outputs)
     else:
         print("❌ 수집된 데이터가 없습니다.")
+
+    # 단계별 소요 시간 보고서 (JSON/CSV)
+    profiler.count("pdf_downloaded", len(attachment_index))
+    profiler.print_summary()
+    profiler.write_report(os.path.join(ctx.excel_save_dir, "run_profile"))
+    if metrics_server:
+        metrics_server.stop()
    
 if __name__ == "__main__":
     main()
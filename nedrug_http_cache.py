@@ -0,0 +1,284 @@
+"""
+목록/상세 페이지 HTTP 응답 디스크 캐시
+
+개발 중 재실행이나 매일 실행에서 같은 HTML 을 매번 다시 받지 않도록, requests 응답을 URL 별로 압축해 저장합니다.
+    - 키: 쿼리 파라미터까지 붙인 요청 URL (파일 이름은 그 SHA-256)
+    - 파일: 첫 줄은 메타데이터 JSON (상태 코드, ETag/Last-Modified, 만료 시각), 나머지는 zlib 으로 압축한 본문
+    - 200 응답의 유지 시간은 호출하는 쪽이 정합니다. 목록 페이지는 새 공고가 올라오므로 짧게(LIST_TTL),
+      상세 페이지는 목록 행의 상태별로(detail_ttl): 끝난 변경명령은 거의 바뀌지 않으므로 길게, 의견조회/사전예고는 짧게
+    - 리다이렉트/오류 응답은 HTTP 상태별 유지 시간(STATUS_TTLS)
+    - 유지 시간이 지난 항목은 ETag/Last-Modified 로 조건부 요청을 보내고, 304 면 저장된 본문을 그대로 사용
+    - 캐시 폴더 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU, 사용 시각은 파일 mtime)
+
+환경변수:
+    NEDRUG_HTTP_CACHE         1(기본) / 0 - 0 이면 항상 네트워크에서 받음
+    NEDRUG_HTTP_CACHE_DIR     캐시 폴더 (기본: 스크립트 폴더의 .http_cache)
+    NEDRUG_HTTP_CACHE_MAX_MB  캐시 폴더 최대 크기 (기본 256MB)
+
+    cache = HttpCache()
+    response = cache.get(session, url, params={'page': 1}, ttl=LIST_TTL, timeout=15)
+    response = cache.get(session, detail_url, ttl=detail_ttl(row['status']), timeout=15)
+    if not response.from_cache:
+        profiler.add_bytes(len(response.content))
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from nedrug_log import get_logger
+from nedrug_profile import profiler
+
+log = get_logger("http_cache")
+
+HTTP_CACHE_DIRNAME = ".http_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".http"
+
+LIST_TTL = 10 * 60            # 목록 페이지 (초)
+DETAIL_TTL = 24 * 60 * 60     # 상세 페이지 (목록 상태를 모를 때)
+
+# 목록 행 상태별 상세 페이지 유지 시간 (초)
+ITEM_STATUS_TTLS = {
+    "변경명령": 90 * 24 * 60 * 60,              # 확정된 명령: 거의 바뀌지 않음
+    "종료": 90 * 24 * 60 * 60,
+    "변경명령(안) 의견조회": 6 * 60 * 60,       # 진행 중: 내용/첨부가 바뀔 수 있음
+    "사전예고": 6 * 60 * 60,
+}
+
+# 200 이외 응답의 HTTP 상태별 유지 시간 (초). 목록에 없는 상태(5xx 등)는 저장하지 않습니다.
+STATUS_TTLS = {
+    301: 7 * 24 * 60 * 60,
+    308: 7 * 24 * 60 * 60,
+    404: 60 * 60,
+    410: 24 * 60 * 60,
+}
+
+# 저장하는 응답 헤더 (본문은 이미 풀린 상태로 저장하므로 Content-Encoding 등은 제외)
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Location")
+
+
+def detail_ttl(item_status):
+    """목록 행 상태(변경명령/의견조회 등)에 맞는 상세 페이지 유지 시간 (모르는 상태는 DETAIL_TTL)"""
+    return ITEM_STATUS_TTLS.get((item_status or "").strip(), DETAIL_TTL)
+
+
+def default_cache_dir():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.environ.get("NEDRUG_HTTP_CACHE_DIR") or os.path.join(base_dir, HTTP_CACHE_DIRNAME)
+
+
+def request_key(url, params=None):
+    """캐시 키: 쿼리 파라미터까지 붙인 요청 URL"""
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+class HttpCache:
+    """
+    URL 별 HTTP 응답 디스크 캐시
+
+    여러 스레드가 함께 써도 되며, 항목 파일은 임시 파일에 쓴 뒤 교체하므로
+    다른 프로세스가 같은 폴더를 읽는 중에도 깨진 항목을 보지 않습니다.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, enabled=None, status_ttls=None):
+        if enabled is None:
+            enabled = os.environ.get("NEDRUG_HTTP_CACHE", "1").lower() not in ("0", "false", "off", "no")
+        self.enabled = enabled
+        self.directory = directory or default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("NEDRUG_HTTP_CACHE_MAX_MB", 0)) * 1024 * 1024) or DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.status_ttls = {**STATUS_TTLS, **(status_ttls or {})}
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 캐시 폴더 전체 크기 (처음 저장할 때 계산)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ENTRY_SUFFIX)
+
+    def get(self, session, url, params=None, ttl=None, **kwargs):
+        """
+        session.get(url, params=params, **kwargs) 와 같지만 유효한 캐시 항목이 있으면 네트워크를 쓰지 않습니다.
+
+        ttl: 200 응답의 유지 시간(초). 없으면 DETAIL_TTL (상세 페이지는 detail_ttl(목록 상태) 를 넘김)
+        반환값: requests.Response (response.from_cache 가 True 면 캐시에서 읽은 응답)
+        """
+        if not self.enabled or kwargs.get("stream"):
+            response = session.get(url, params=params, **kwargs)
+            response.from_cache = False
+            return response
+
+        key = request_key(url, params)
+        path = self._path(key)
+        meta, body = self._load(path)
+        if meta is not None and meta["expires_at"] > time.time():
+            profiler.count("http_cache_hit")
+            self._touch(path)
+            return self._to_response(meta, body)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if meta is not None and meta["status"] == 200:
+            if meta["headers"].get("ETag"):
+                headers["If-None-Match"] = meta["headers"]["ETag"]
+            if meta["headers"].get("Last-Modified"):
+                headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        response = session.get(url, params=params, headers=headers, **kwargs)
+        if meta is not None and response.status_code == 304:
+            profiler.count("http_cache_revalidated")
+            meta["expires_at"] = time.time() + self._ttl(meta["status"], ttl)
+            self._write(path, meta, body)
+            return self._to_response(meta, body)
+
+        profiler.count("http_cache_miss")
+        response.from_cache = False
+        self._store(path, key, response, ttl)
+        return response
+
+    def _ttl(self, status, ttl):
+        if status == 200:
+            return DETAIL_TTL if ttl is None else ttl
+        return self.status_ttls.get(status)
+
+    def _load(self, path):
+        """저장된 항목 (메타데이터, 본문). 없거나 읽을 수 없으면 (None, None)"""
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = zlib.decompress(f.read())
+            return meta, body
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError, zlib.error) as e:
+            log.debug("손상된 캐시 항목 삭제 (%s): %s", os.path.basename(path), e)
+            self._remove(path)
+            return None, None
+
+    @staticmethod
+    def _to_response(meta, body):
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.reason = meta.get("reason", "")
+        response.url = meta["url"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = meta.get("encoding")
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def _store(self, path, key, response, ttl):
+        ttl = self._ttl(response.status_code, ttl)
+        if ttl is None or "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        meta = {
+            "key": key,
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "encoding": response.encoding,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            "stored_at": time.time(),
+            "expires_at": time.time() + ttl,
+        }
+        self._write(path, meta, response.content)
+
+    def _write(self, path, meta, body):
+        data = json.dumps(meta, ensure_ascii=False).encode("utf-8") + b"\n" + zlib.compress(body, 6)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                previous = os.path.getsize(path)
+            except OSError:
+                previous = 0
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            log.debug("캐시 저장 실패 (%s): %s", meta["url"], e)
+            self._remove(temp_path)
+            return
+        self._account(len(data) - previous)
+
+    def _touch(self, path):
+        """LRU 사용 시각 갱신"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """(사용 시각, 크기, 경로) 목록"""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(ENTRY_SUFFIX):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _account(self, delta):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += delta
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """최근에 사용하지 않은 항목부터 상한의 90% 이하가 될 때까지 삭제 (self._lock 안에서 호출)"""
+        entries = sorted(self._entries())
+        self._total_bytes = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._total_bytes <= target:
+                break
+            self._remove(path)
+            self._total_bytes -= size
+            profiler.count("http_cache_evicted")
+
+    def invalidate(self, url, params=None):
+        """
+        요청 하나의 캐시 항목 삭제 (다음 get 은 조건부 요청 없이 네트워크에서 새로 받음)
+
+        200 이지만 내용을 해석하지 못한 페이지가 TTL 동안 계속 캐시에서 나오지 않도록 호출합니다.
+        """
+        if not self.enabled:
+            return
+        path = self._path(request_key(url, params))
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._remove(path)
+        profiler.count("http_cache_invalidated")
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def clear(self):
+        """캐시 항목 전체 삭제"""
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self._total_bytes = 0
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+원료/성분명 사전 (대표 이름 + 영문/국문 동의어)
+
+HTML 성분정보 표와 PDF 정규식에서 얻은 원료/성분명은 대소문자, 염 형태(… Hydrochloride), 국문 표기가 제각각이라
+보고서에서 성분별로 묶기 어렵습니다. 사전의 모든 이름을 하나의 Aho-Corasick 오토마톤(nedrug_aho)에 넣어
+텍스트를 한 번만 훑어 알려진 성분을 찾고, 찾은 이름은 대표 이름으로 바꿉니다.
+
+    - 사전 파일: 대표 이름<TAB>동의어|동의어 (기본: 스크립트 폴더의 nedrug_ingredients.tsv)
+    - 이름과 텍스트는 NFKC 정규화 + 소문자 + 공백 정리 후 비교 ('AMLODIPINE  besylate' = 'Amlodipine Besylate')
+    - 영문 이름은 단어 경계에서만 일치 (다른 단어 안의 부분 문자열은 무시), 국문은 조사가 붙어도 일치
+    - 만든 오토마톤은 사전 파일 옆(.index.pickle)에 저장해 두고, 사전 파일이 바뀌지 않았으면 다시 만들지 않음
+
+환경변수:
+    NEDRUG_INGREDIENTS_FILE  사전 파일 경로
+
+사용법:
+    python nedrug_ingredients.py lookup "amlodipine besylate"
+    python nedrug_ingredients.py find 공문.txt
+    python nedrug_ingredients.py stats
+"""
+
+import argparse
+import os
+import pickle
+import re
+import sys
+import threading
+import unicodedata
+
+from nedrug_aho import KeywordAutomaton
+from nedrug_log import get_logger
+from nedrug_profile import profiler
+
+log = get_logger("ingredients")
+
+INGREDIENTS_FILENAME = "nedrug_ingredients.tsv"
+INDEX_SUFFIX = ".index.pickle"
+INDEX_VERSION = 1
+
+_SPACE_RE = re.compile(r"[\s\-_·・]+")
+_SPLIT_RE = re.compile(r"\s*(?:[,;/+]|\s및\s|\sand\s)\s*", re.IGNORECASE)
+
+
+def default_ingredients_path():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.environ.get("NEDRUG_INGREDIENTS_FILE") or os.path.join(base_dir, INGREDIENTS_FILENAME)
+
+
+def normalize_name(text):
+    """비교용 정규화: NFKC, 소문자, 하이픈/가운뎃점/연속 공백 -> 공백 하나"""
+    return _SPACE_RE.sub(" ", unicodedata.normalize("NFKC", text or "").casefold()).strip()
+
+
+def _is_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+def _on_word_boundary(text, start, end):
+    """영문 이름이 다른 영문 단어의 일부가 아닌지 (국문 쪽은 조사가 붙으므로 확인하지 않음)"""
+    if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+        return False
+    if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+        return False
+    return True
+
+
+class IngredientDictionary:
+    """대표 이름과 동의어 목록. find()/canonical() 은 처음 호출할 때 오토마톤을 만듭니다."""
+
+    def __init__(self, entries=()):
+        self._names = {}  # 정규화한 이름 -> 대표 이름
+        self._automaton = None
+        for canonical, synonyms in entries:
+            self.add(canonical, synonyms)
+
+    def __len__(self):
+        return len(set(self._names.values()))
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._names
+
+    def add(self, canonical, synonyms=()):
+        """대표 이름과 동의어 등록 (대표 이름 자신도 동의어로 취급)"""
+        canonical = " ".join(canonical.split())
+        for name in (canonical, *synonyms):
+            key = normalize_name(name)
+            if key:
+                self._names[key] = canonical
+        self._automaton = None
+
+    def names(self):
+        """대표 이름 목록 (정렬)"""
+        return sorted(set(self._names.values()))
+
+    @property
+    def automaton(self):
+        if self._automaton is None:
+            self._automaton = KeywordAutomaton(self._names.items()).build()
+        return self._automaton
+
+    def find(self, text):
+        """text 에 나오는 성분의 대표 이름 목록 (처음 나온 순서, 중복 제거)"""
+        found = []
+        for _, _, canonical in self.automaton.findall(normalize_name(text), accept=_on_word_boundary):
+            if canonical not in found:
+                found.append(canonical)
+        return found
+
+    def first(self, text):
+        """text 에 처음 나오는 성분의 대표 이름 (없으면 빈 문자열)"""
+        found = self.find(text)
+        return found[0] if found else ""
+
+    def canonical(self, name):
+        """
+        추출한 원료/성분명을 대표 이름으로 변환
+
+        쉼표/슬래시/'및' 으로 나뉜 복합제는 성분마다 변환해 ', ' 로 다시 잇습니다.
+        사전에 없는 성분은 공백만 정리해 그대로 둡니다.
+        """
+        name = " ".join((name or "").split())
+        if not name:
+            return ""
+        canonical = self._names.get(normalize_name(name))
+        if canonical:
+            profiler.count("ingredient_known")
+            return canonical
+        parts = [part for part in _SPLIT_RE.split(name) if part]
+        result = []
+        for part in parts:
+            canonical = self._names.get(normalize_name(part))
+            if canonical is None:
+                found = self.find(part)
+                # '… 5mg' 처럼 이름 하나에 군더더기만 붙은 경우만 바꿈
+                canonical = found[0] if len(found) == 1 else part
+            if canonical not in result:
+                result.append(canonical)
+        profiler.count("ingredient_known" if all(part in self for part in result) else "ingredient_unknown")
+        return ", ".join(result)
+
+    # --- 사전 파일 ---
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        사전 파일 읽기. 파일 옆의 .index.pickle 이 같은 파일(크기/수정 시각)로 만든 것이면 그대로 사용합니다.
+        파일이 없으면 빈 사전
+        """
+        path = path or default_ingredients_path()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            log.debug("성분명 사전 파일 없음: %s", path)
+            return cls()
+        signature = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+
+        index_path = path + INDEX_SUFFIX
+        try:
+            with open(index_path, "rb") as f:
+                saved = pickle.load(f)
+            if saved.get("signature") == signature:
+                dictionary = cls()
+                dictionary._names = saved["names"]
+                dictionary._automaton = saved["automaton"]
+                profiler.count("ingredient_index_loaded")
+                return dictionary
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+            pass
+
+        dictionary = cls(_read_table(path))
+        try:
+            with open(index_path + ".tmp", "wb") as f:
+                pickle.dump({"signature": signature, "names": dictionary._names,
+                             "automaton": dictionary.automaton}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(index_path + ".tmp", index_path)
+            profiler.count("ingredient_index_built")
+        except OSError as e:
+            log.debug("성분명 색인 저장 실패 (%s): %s", index_path, e)
+        return dictionary
+
+    def save(self, path):
+        """사전 파일 쓰기 (대표 이름별로 동의어를 모아 정렬)"""
+        synonyms = {}
+        for key, canonical in self._names.items():
+            if key != normalize_name(canonical):
+                synonyms.setdefault(canonical, []).append(key)
+        with open(path, "w", encoding="utf-8") as f:
+            for canonical in self.names():
+                f.write(f"{canonical}\t{'|'.join(sorted(synonyms.get(canonical, [])))}\n")
+
+
+def _read_table(path):
+    """사전 파일의 (대표 이름, [동의어]) 목록"""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            canonical, _, synonyms = line.partition("\t")
+            entries.append((canonical, [name.strip() for name in synonyms.split("|") if name.strip()]))
+    return entries
+
+
+_default_dictionary = None
+_default_lock = threading.Lock()
+
+
+def default_dictionary():
+    """기본 사전 (처음 필요할 때 한 번 로드해 프로세스 안에서 공유)"""
+    global _default_dictionary
+    with _default_lock:
+        if _default_dictionary is None:
+            _default_dictionary = IngredientDictionary.load()
+        return _default_dictionary
+
+
+def canonical_ingredient(name):
+    """기본 사전으로 원료/성분명을 대표 이름으로 변환"""
+    return default_dictionary().canonical(name)
+
+
+def group_by_ingredient(records, key="G_원료성분명"):
+    """
+    레코드를 대표 이름별로 묶음 {원료/성분명: [레코드, ...]} (이름순, 성분명이 없는 레코드는 '' 아래)
+
+    복합제('A, B')는 각 성분 아래에 모두 들어갑니다.
+    key 가 정수면 레코드를 튜플 행으로 보고 그 열을 읽습니다 (nedrug_report).
+    """
+    dictionary = default_dictionary()
+    canonical_names = {}  # 원래 이름 -> 대표 이름 (같은 이름은 한 번만 변환)
+    groups = {}
+    for record in records:
+        value = record[key] if isinstance(key, int) else record.get(key, "")
+        name = canonical_names.get(value)
+        if name is None:
+            name = canonical_names[value] = dictionary.canonical(value)
+        for part in (name.split(", ") if name else [""]):
+            groups.setdefault(part, []).append(record)
+    return dict(sorted(groups.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="원료/성분명 사전")
+    parser.add_argument("--file", help="사전 파일 (기본: NEDRUG_INGREDIENTS_FILE 또는 스크립트 폴더의 nedrug_ingredients.tsv)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    lookup_parser = sub.add_parser("lookup", help="원료/성분명을 대표 이름으로 변환")
+    lookup_parser.add_argument("name")
+    find_parser = sub.add_parser("find", help="텍스트 파일에서 알려진 성분 찾기")
+    find_parser.add_argument("path")
+    sub.add_parser("stats", help="사전 크기")
+    args = parser.parse_args(argv)
+
+    dictionary = IngredientDictionary.load(args.file)
+    if args.command == "lookup":
+        print(dictionary.canonical(args.name))
+    elif args.command == "find":
+        with open(args.path, encoding="utf-8", errors="replace") as f:
+            found = dictionary.find(f.read())
+        print("\n".join(found) if found else "❌ 알려진 성분이 없습니다.")
+    else:
+        print(f"📚 성분 {len(dictionary)}개, 이름/동의어 {len(dictionary._names)}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+구조화 로깅과 진행률 표시줄
+
+표준 logging 위에 다음을 얹습니다.
+    - 레벨별 출력 (환경변수 NEDRUG_LOG_LEVEL=DEBUG/INFO/WARNING, 기본 INFO)
+    - JSON Lines 파일 싱크 (환경변수 NEDRUG_LOG_JSONL=경로)
+    - 한 줄짜리 진행률 표시줄 (항목별 출력 대신 사용)
+
+사용 예:
+    from nedrug_log import get_logger, setup_logging, ProgressBar
+
+    log = get_logger("finale")
+    setup_logging()                       # 스크립트 main 에서 한 번
+
+    log.debug("PDF 텍스트 샘플: %s", text[-500:])   # %-형식 인자는 DEBUG 가 꺼져 있으면 포맷하지 않음
+    if log.isEnabledFor(logging.DEBUG):            # 인자 계산 자체가 비싸면 레벨을 먼저 확인
+        ...
+
+    with ProgressBar(total=len(urls), desc="상세 추출") as progress:
+        for url in urls:
+            ...
+            progress.update(ok=True)
+
+로그 호출에 extra={'infoNo': ..., 'stage': ...} 를 넘기면 JSON Lines 레코드에 필드로 기록됩니다.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+
+LOGGER_NAME = "nedrug"
+
+# 진행률 표시줄이 떠 있는 동안 로그 출력이 표시줄을 깨뜨리지 않도록 참조를 보관
+_active_progress = None
+
+# 진행 중인 모든 진행률 (터미널 표시 여부와 관계없이, 메트릭 엔드포인트에서 남은 작업 수로 노출)
+_open_progress = weakref.WeakSet()
+_open_progress_lock = threading.Lock()
+
+# LogRecord 기본 속성 (JSON 싱크에서 extra 필드만 골라내기 위함)
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def get_logger(name=None):
+    """nedrug 하위 로거 반환 (예: get_logger('finale') -> 'nedrug.finale')"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """표준 출력 핸들러. 진행률 표시줄을 지웠다가 다시 그림"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    def emit(self, record):
+        # redirect_stdout 등으로 바뀐 sys.stdout 을 따라감
+        self.stream = sys.stdout
+        progress = _active_progress
+        if progress is not None:
+            progress.clear()
+        super().emit(record)
+        if progress is not None:
+            progress.redraw()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON 으로 변환 (extra 필드 포함)"""
+
+    def format(self, record):
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=None, jsonl_path=None):
+    """
+    nedrug 로거 설정. 여러 번 호출해도 핸들러가 중복되지 않습니다.
+
+    level: 'DEBUG'/'INFO'/... 또는 logging 상수. 없으면 NEDRUG_LOG_LEVEL, 기본 INFO
+    jsonl_path: JSON Lines 로그 파일 경로. 없으면 NEDRUG_LOG_JSONL (미설정 시 사용 안 함)
+    """
+    level = level or os.environ.get("NEDRUG_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    jsonl_path = jsonl_path or os.environ.get("NEDRUG_LOG_JSONL")
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(level)
+    logger.propagate = False
+
+    console = _ConsoleHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(console)
+
+    if jsonl_path:
+        directory = os.path.dirname(os.path.abspath(jsonl_path))
+        os.makedirs(directory, exist_ok=True)
+        sink = logging.FileHandler(jsonl_path, encoding="utf-8")
+        sink.setFormatter(JsonLinesFormatter())
+        logger.addHandler(sink)
+    return logger
+
+
+def open_progress_bars():
+    """닫히지 않은 ProgressBar 목록"""
+    with _open_progress_lock:
+        return list(_open_progress)
+
+
+class ProgressBar:
+    """
+    한 줄 진행률 표시줄
+
+    터미널(TTY)일 때만 그리며, 갱신은 min_interval 초에 한 번으로 제한합니다.
+    터미널이 아니면 아무것도 출력하지 않으므로 로그 파일이 지저분해지지 않습니다.
+    """
+
+    def __init__(self, total, desc="", width=28, stream=None, min_interval=0.2, enabled=None):
+        self.total = max(0, int(total or 0))
+        self.desc = desc
+        self.width = width
+        self.stream = stream or sys.stderr
+        self.min_interval = min_interval
+        if enabled is None:
+            enabled = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.enabled = enabled
+        self.count = 0
+        self.ok = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+        self._last_draw = 0.0
+        self._line_len = 0
+        self._lock = threading.Lock()
+        with _open_progress_lock:
+            _open_progress.add(self)
+
+    def __enter__(self):
+        global _active_progress
+        if self.enabled:
+            _active_progress = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def update(self, n=1, ok=None):
+        """n 건 진행. ok=True/False 로 성공/실패 수도 함께 집계"""
+        with self._lock:
+            self.count += n
+            if ok is True:
+                self.ok += n
+            elif ok is False:
+                self.failed += n
+            now = time.perf_counter()
+            if self.enabled and (now - self._last_draw >= self.min_interval or self.count >= self.total):
+                self._draw(now)
+
+    def _render(self, now):
+        elapsed = max(now - self._start, 1e-9)
+        rate = self.count / elapsed
+        if self.total:
+            ratio = min(1.0, self.count / self.total)
+            filled = int(ratio * self.width)
+            bar = "█" * filled + "░" * (self.width - filled)
+            remaining = (self.total - self.count) / rate if rate > 0 else 0
+            eta = time.strftime("%M:%S", time.gmtime(max(0, remaining)))
+            text = f"{self.desc} [{bar}] {self.count}/{self.total} ({ratio:.0%}) {rate:.1f}건/s 남은 {eta}"
+        else:
+            text = f"{self.desc} {self.count}건 {rate:.1f}건/s"
+        if self.ok or self.failed:
+            text += f" ✅{self.ok} ❌{self.failed}"
+        return text
+
+    def _draw(self, now=None):
+        text = self._render(now or time.perf_counter())
+        padding = " " * max(0, self._line_len - len(text))
+        self.stream.write("\r" + text + padding)
+        self.stream.flush()
+        self._line_len = len(text)
+        self._last_draw = now or time.perf_counter()
+
+    def clear(self):
+        if self.enabled and self._line_len:
+            self.stream.write("\r" + " " * self._line_len + "\r")
+            self.stream.flush()
+
+    def redraw(self):
+        if self.enabled and self._line_len:
+            self._draw()
+
+    def close(self):
+        global _active_progress
+        with _open_progress_lock:
+            _open_progress.discard(self)
+        if _active_progress is self:
+            _active_progress = None
+        if self.enabled:
+            with self._lock:
+                self._draw()
+                self.stream.write("\n")
+                self.stream.flush()
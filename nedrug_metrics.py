@@ -0,0 +1,241 @@
+"""
+실행 중 진행률/계측값 HTTP 엔드포인트 (Prometheus 텍스트 형식)
+
+긴 실행 중에 nedrug_profile 의 카운터와 단계별 소요 시간, 진행 중인 ProgressBar 의 남은 작업 수를
+http://127.0.0.1:<포트>/metrics 로 노출합니다. Prometheus 나 부하 테스트 스크립트가 주기적으로 읽어 갈 수 있습니다.
+포트를 지정하지 않으면 서버를 띄우지 않습니다.
+
+노출 항목:
+    nedrug_items_total, nedrug_bytes_transferred_total   처리 항목 수, 네트워크 전송량
+    nedrug_events_total{event}                           profiler.count() 카운터 전체 (pdf_downloaded, http_cache_hit ...)
+    nedrug_field_extracted_total{field,source}           항목별 추출 출처 (nedrug_plan)
+    nedrug_field_hit_ratio{field}                        항목별 추출 성공 비율
+    nedrug_stage_duration_seconds{stage}                 단계별 소요 시간 히스토그램 (fetch = 요청 지연)
+    nedrug_progress_done/total/remaining{task}           진행률 표시줄별 진행/남은 작업 수 (큐 깊이)
+    register_gauge() 로 등록한 값                          (예: nedrug_prefetch_pending)
+
+환경변수:
+    NEDRUG_METRICS_PORT   포트 (없으면 끔)
+    NEDRUG_METRICS_HOST   바인드 주소 (기본 127.0.0.1)
+
+    server = start_metrics_server(args.metrics_port)   # 포트가 없으면 None
+    ...
+    if server:
+        server.stop()
+"""
+
+import os
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nedrug_log import get_logger, open_progress_bars
+from nedrug_profile import HISTOGRAM_BUCKETS
+from nedrug_profile import profiler as default_profiler
+
+log = get_logger("metrics")
+
+METRIC_PREFIX = "nedrug"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 소요 시간 히스토그램 버킷 (초) - 계측기가 기록할 때 쓰는 버킷 (그중 일부만 골라 노출할 수 있음)
+DEFAULT_BUCKETS = HISTOGRAM_BUCKETS
+
+# nedrug_plan 이 남기는 field_<항목>_<출처> 카운터의 출처 ('missing' 은 끝까지 못 찾은 경우)
+FIELD_SOURCES = ("html", "list", "textarea", "cache", "pdf", "missing")
+
+_gauges = {}  # 이름 -> (설명, 값 함수)
+_gauges_lock = threading.Lock()
+
+
+def register_gauge(name, func, help_text=""):
+    """
+    스크랩할 때마다 func() 값을 nedrug_<name> 게이지로 노출 (같은 이름은 교체)
+
+    func 가 객체의 메서드면 약한 참조로 보관하므로, 객체가 사라지면 게이지도 빠집니다.
+    """
+    if hasattr(func, "__self__"):
+        func = weakref.WeakMethod(func)
+    with _gauges_lock:
+        _gauges[name] = (help_text, func)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class _Writer:
+    """메트릭 이름별 HELP/TYPE 을 한 번씩만 쓰는 텍스트 버퍼"""
+
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def sample(self, name, kind, help_text, value, labels=None):
+        name = f"{METRIC_PREFIX}_{name}"
+        base = name[:-len("_bucket")] if name.endswith("_bucket") else name
+        for suffix in ("_sum", "_count"):
+            if kind == "histogram" and name.endswith(suffix):
+                base = name[:-len(suffix)]
+        if base not in self._declared:
+            self._declared.add(base)
+            self.lines.append(f"# HELP {base} {help_text}")
+            self.lines.append(f"# TYPE {base} {kind}")
+        label_text = ""
+        if labels:
+            label_text = "{" + ",".join(f'{key}="{_label(value)}"' for key, value in labels.items()) + "}"
+        self.lines.append(f"{name}{label_text} {_number(value)}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(profiler=None, buckets=DEFAULT_BUCKETS):
+    """현재 계측값을 Prometheus 텍스트 형식 문자열로"""
+    profiler = profiler or default_profiler
+    summary = profiler.summary()
+    out = _Writer()
+
+    out.sample("run_elapsed_seconds", "gauge", "실행 시작 후 경과 시간", summary["elapsed_s"])
+    out.sample("items_total", "counter", "처리 완료 항목 수", summary["items"])
+    out.sample("items_per_second", "gauge", "실행 전체 평균 처리량", summary["items_per_sec"])
+    out.sample("bytes_transferred_total", "counter", "네트워크에서 받은 바이트 수", summary["bytes_transferred"])
+
+    fields = {}
+    for event, value in sorted(summary["counters"].items()):
+        out.sample("events_total", "counter", "profiler.count() 이벤트 수", value, {"event": event})
+        if event.startswith("field_"):
+            field, _, source = event[len("field_"):].rpartition("_")
+            if field and source in FIELD_SOURCES:
+                fields.setdefault(field, {})[source] = value
+    for field, sources in sorted(fields.items()):
+        for source, value in sorted(sources.items()):
+            if source != "missing":
+                out.sample("field_extracted_total", "counter", "항목별 추출 성공 수 (출처별)", value,
+                           {"field": field, "source": source})
+    for field, sources in sorted(fields.items()):
+        found = sum(value for source, value in sources.items() if source != "missing")
+        wanted = found + sources.get("missing", 0)
+        out.sample("field_hit_ratio", "gauge", "항목별 추출 성공 비율", found / wanted if wanted else 0.0,
+                   {"field": field})
+
+    for stage, (cumulative, count, total) in sorted(profiler.histograms(buckets).items()):
+        help_text = "단계별 소요 시간 (초)"
+        for bound, bucket_count in zip(buckets, cumulative):
+            out.sample("stage_duration_seconds_bucket", "histogram", help_text, bucket_count,
+                       {"stage": stage, "le": _number(float(bound))})
+        out.sample("stage_duration_seconds_bucket", "histogram", help_text, count, {"stage": stage, "le": "+Inf"})
+        out.sample("stage_duration_seconds_sum", "histogram", help_text, total, {"stage": stage})
+        out.sample("stage_duration_seconds_count", "histogram", help_text, count, {"stage": stage})
+
+    for progress in sorted(open_progress_bars(), key=lambda bar: bar.desc):
+        labels = {"task": progress.desc.strip()}
+        out.sample("progress_done", "gauge", "진행률 표시줄 진행 수", progress.count, labels)
+        out.sample("progress_failed", "gauge", "진행률 표시줄 실패 수", progress.failed, labels)
+        if progress.total:
+            out.sample("progress_total", "gauge", "진행률 표시줄 전체 수", progress.total, labels)
+            out.sample("progress_remaining", "gauge", "남은 작업 수 (큐 깊이)",
+                       max(0, progress.total - progress.count), labels)
+
+    with _gauges_lock:
+        gauges = sorted(_gauges.items())
+    for name, (help_text, func) in gauges:
+        if isinstance(func, weakref.WeakMethod):
+            func = func()
+            if func is None:
+                with _gauges_lock:
+                    _gauges.pop(name, None)
+                continue
+        try:
+            value = func()
+        except Exception as e:
+            log.debug("게이지 %s 계산 실패: %s", name, e)
+            continue
+        out.sample(name, "gauge", help_text or name, value)
+    return out.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            started = time.perf_counter()
+            body = render_metrics(self.server.profiler).encode("utf-8")
+            log.debug("메트릭 응답 %d바이트 (%.1fms)", len(body), (time.perf_counter() - started) * 1000)
+            self._reply(200, CONTENT_TYPE, body)
+        elif path == "/":
+            self._reply(200, "text/plain; charset=utf-8", b"nedrug metrics: /metrics\n")
+        else:
+            self._reply(404, "text/plain; charset=utf-8", b"not found\n")
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # 스크랩마다 stderr 에 찍지 않음
+        log.debug("metrics %s", format % args)
+
+
+class MetricsServer:
+    """백그라운드 스레드에서 /metrics 를 제공하는 HTTP 서버 (port=0 이면 빈 포트 자동 선택)"""
+
+    def __init__(self, port=0, host=None, profiler=None):
+        self.host = host or os.environ.get("NEDRUG_METRICS_HOST") or "127.0.0.1"
+        self.port = port
+        self.profiler = profiler or default_profiler
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.profiler = self.profiler
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def start_metrics_server(port=None, host=None):
+    """
+    port(없으면 NEDRUG_METRICS_PORT)가 있으면 메트릭 서버를 띄워 반환, 없으면 None
+
+    포트를 열 수 없으면 경고만 남기고 None (수집 자체는 계속)
+    """
+    if port is None:
+        port = os.environ.get("NEDRUG_METRICS_PORT")
+    if port in (None, ""):
+        return None
+    try:
+        server = MetricsServer(int(port), host).start()
+    except (OSError, ValueError) as e:
+        log.warning("⚠️  메트릭 서버를 시작하지 못했습니다 (%s): %s", port, e)
+        return None
+    print(f"📈 메트릭 엔드포인트: {server.url}")
+    return server
@@ -0,0 +1,222 @@
+"""
+스캔본 PDF 용 OCR 보조 단계 (로컬 Tesseract)
+
+PyMuPDF/PyPDF2 로 텍스트 레이어를 얻지 못한 PDF 만 대상으로 하며,
+텍스트 레이어가 비어 있는 페이지만 이미지로 렌더링해 Tesseract(kor) 로 인식합니다.
+페이지 단위 작업은 별도 프로세스 풀에서 실행되므로 크롤러는 기다리지 않고 다음 항목으로 넘어가고,
+결과는 나중에 OcrJob.result() 로 받습니다.
+
+인식 결과는 페이지별로 캐시(PDF 내용 해시 + 페이지 번호 + 언어 + 해상도)에 저장되어
+같은 공문을 다시 받으면 OCR 을 건너뜁니다.
+
+환경변수:
+    NEDRUG_OCR           auto(기본, tesseract 와 언어 데이터가 있으면 사용) / 1 / 0
+    NEDRUG_OCR_LANG      Tesseract 언어 (기본 kor+eng)
+    NEDRUG_OCR_WORKERS   OCR 프로세스 수 (기본 CPU 수의 절반, 최소 1)
+    NEDRUG_OCR_DPI       페이지 렌더링 해상도 (기본 300)
+
+사용 예:
+    with OcrPool(cache_dir=".ocr_cache") as ocr:
+        job = ocr.submit(pdf_path)          # 사용할 수 없거나 OCR 할 페이지가 없으면 None
+        ...
+        text = job.result()
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from nedrug_log import get_logger
+from nedrug_profile import profiler
+
+log = get_logger("ocr")
+
+OCR_CACHE_DIRNAME = ".ocr_cache"
+DEFAULT_LANG = "kor+eng"
+DEFAULT_DPI = 300
+PAGE_TIMEOUT = 120 # 페이지당 Tesseract 실행 제한 시간 (초)
+
+_languages_cache = {}
+
+
+def tesseract_languages(binary):
+    """설치된 Tesseract 언어 데이터 목록 (실행 실패 시 빈 집합)"""
+    if binary not in _languages_cache:
+        try:
+            result = subprocess.run([binary, "--list-langs"], capture_output=True, timeout=15)
+            lines = result.stdout.decode("utf-8", "replace").splitlines()
+            _languages_cache[binary] = {line.strip() for line in lines[1:] if line.strip()}
+        except (OSError, subprocess.SubprocessError):
+            _languages_cache[binary] = set()
+    return _languages_cache[binary]
+
+
+def empty_text_pages(pdf_path):
+    """
+    페이지별 텍스트 레이어를 확인합니다.
+
+    반환값: (페이지별 텍스트 리스트, 텍스트가 비어 있는 페이지 번호 리스트)
+    """
+    import fitz  # PyMuPDF - OCR 단계가 실제로 실행될 때만 로드
+
+    with fitz.open(pdf_path) as doc:
+        texts = [page.get_text() for page in doc]
+    return texts, [index for index, text in enumerate(texts) if not text.strip()]
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _ocr_page(binary, pdf_path, page_index, lang, dpi, cache_path):
+    """
+    (작업 프로세스에서 실행) 한 페이지를 렌더링해 Tesseract 로 인식하고 캐시에 저장
+
+    반환값: (인식된 텍스트, 소요 시간)
+    """
+    import fitz
+
+    start = time.perf_counter()
+    with fitz.open(pdf_path) as doc:
+        pixmap = doc[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        image = pixmap.tobytes("png")
+    result = subprocess.run([binary, "stdin", "stdout", "-l", lang], input=image,
+                            capture_output=True, timeout=PAGE_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace").strip() or f"tesseract 종료 코드 {result.returncode}")
+    text = result.stdout.decode("utf-8", "replace")
+
+    if cache_path:
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, cache_path)
+    return text, time.perf_counter() - start
+
+
+class OcrJob:
+    """PDF 한 건의 OCR 작업. 페이지별 작업은 프로세스 풀에서 병렬로 실행됩니다."""
+
+    def __init__(self, pdf_path, page_texts, futures, tags=None):
+        self.pdf_path = pdf_path
+        self.page_texts = page_texts # 텍스트 레이어 또는 캐시에서 이미 얻은 페이지 텍스트
+        self.futures = futures       # {페이지 번호: Future}
+        self.tags = list(tags or []) # 호출 측에서 결과를 붙일 대상 (예: 같은 PDF 를 참조하는 레코드들)
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def result(self, timeout=None):
+        """모든 페이지 결과를 기다린 뒤 페이지 순서대로 합친 텍스트 반환 (실패한 페이지는 빈 문자열)"""
+        for page_index, future in self.futures.items():
+            try:
+                text, elapsed = future.result(timeout=timeout)
+                profiler.record("ocr", elapsed)
+                profiler.count("ocr_pages")
+            except Exception as e:
+                log.warning("    ⚠️  OCR 실패 (%s %d쪽): %s", os.path.basename(self.pdf_path), page_index + 1, e)
+                profiler.count("ocr_failed")
+                text = ""
+            self.page_texts[page_index] = text
+        self.futures = {}
+        full_text = "\n".join(self.page_texts)
+        return full_text if full_text.strip() else ""
+
+
+class OcrPool:
+    """
+    OCR 작업 프로세스 풀
+
+    workers 개의 프로세스만 사용하므로 OCR 이 많이 쌓여도 CPU 를 모두 차지하지 않습니다.
+    프로세스 풀은 처음 submit() 할 때 만들어집니다.
+    """
+
+    def __init__(self, cache_dir=None, lang=None, dpi=None, workers=None, enabled=None):
+        self.lang = lang or os.environ.get("NEDRUG_OCR_LANG", DEFAULT_LANG)
+        self.dpi = int(dpi or os.environ.get("NEDRUG_OCR_DPI", DEFAULT_DPI))
+        self.workers = int(workers or os.environ.get("NEDRUG_OCR_WORKERS", 0)) or max(1, (os.cpu_count() or 2) // 2)
+        self.cache_dir = cache_dir
+        self.binary = shutil.which("tesseract")
+        self.jobs = []
+        self._executor = None
+
+        if enabled is None:
+            enabled = os.environ.get("NEDRUG_OCR", "auto").lower() not in ("0", "false", "off", "no")
+        self.enabled = enabled
+        self.unavailable_reason = ""
+        if self.enabled:
+            if not self.binary:
+                self.unavailable_reason = "tesseract 실행 파일을 찾을 수 없음"
+            else:
+                missing = set(self.lang.split("+")) - tesseract_languages(self.binary)
+                if missing:
+                    self.unavailable_reason = f"Tesseract 언어 데이터 없음: {', '.join(sorted(missing))}"
+
+    @property
+    def available(self):
+        return self.enabled and not self.unavailable_reason
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cache_path(self, digest, page_index):
+        return os.path.join(self.cache_dir, f"{digest[:2]}", f"{digest}_{self.lang}_{self.dpi}_p{page_index + 1}.txt")
+
+    def submit(self, pdf_path, tags=None):
+        """
+        텍스트 레이어가 빈 페이지만 OCR 작업으로 등록합니다. 결과를 기다리지 않고 바로 반환합니다.
+
+        반환값: OcrJob (OCR 을 사용할 수 없거나 빈 페이지가 없으면 None)
+        """
+        if not self.available:
+            return None
+        try:
+            page_texts, pages = empty_text_pages(pdf_path)
+        except Exception as e:
+            log.warning("    ⚠️  OCR 대상 페이지 확인 실패: %s", e)
+            return None
+        if not pages:
+            return None
+
+        digest = _file_digest(pdf_path) if self.cache_dir else ""
+        futures = {}
+        for page_index in pages:
+            cache_path = ""
+            if self.cache_dir:
+                cache_path = self._cache_path(digest, page_index)
+                if os.path.isfile(cache_path):
+                    with open(cache_path, "r", encoding="utf-8") as f:
+                        page_texts[page_index] = f.read()
+                    profiler.count("ocr_cache_hits")
+                    continue
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            futures[page_index] = self._executor.submit(
+                _ocr_page, self.binary, pdf_path, page_index, self.lang, self.dpi, cache_path)
+
+        job = OcrJob(pdf_path, page_texts, futures, tags)
+        self.jobs.append(job)
+        log.debug("    🔠 OCR 작업 등록: %s (%d쪽, 캐시 %d쪽)", os.path.basename(pdf_path), len(pages), len(pages) - len(futures))
+        return job
+
+    def drain(self, timeout=None):
+        """등록된 모든 작업을 기다려 (job, 텍스트) 를 차례로 반환"""
+        jobs, self.jobs = self.jobs, []
+        for job in jobs:
+            yield job, job.result(timeout=timeout)
+
+    def close(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
@@ -0,0 +1,104 @@
+"""
+첨부파일 파일명 정리와 충돌 없는 저장 경로 할당
+
+mfds_downloader 와 nedrug_finale_with_url 이 같은 규칙으로 파일명을 정리하고,
+같은 이름으로 정리되는 서로 다른 첨부파일이 서로를 덮어쓰지 않도록 합니다.
+
+    - 유니코드 NFC 정규화 (macOS 등에서 온 NFD 한글 파일명도 같은 이름으로 취급)
+    - 파일명 길이는 글자 수가 아니라 UTF-8 바이트 수로 제한 (한글은 글자당 3바이트, 대부분 파일시스템 한도 255바이트)
+    - 파일은 O_EXCL 로 만들어서 이미 있으면 실패 -> 다음 후보 이름으로 재시도
+      후보: 이름.pdf, 이름_{file_id}.pdf, 이름_{file_id}_2.pdf, ...
+      파일 생성 자체가 원자적이므로 여러 스레드/프로세스가 잠금 없이 동시에 저장해도 같은 파일을 쓰지 않습니다.
+
+    path, f = create_exclusive(download_dir, sanitize_filename(name), file_id)
+    with f:
+        f.write(content)
+"""
+
+import itertools
+import os
+import re
+import unicodedata
+
+# 파일명 최대 바이트 수 (255 바이트 한도에서 _{file_id}_{n} 접미사 여유를 둠)
+MAX_NAME_BYTES = 200
+
+# Windows/리눅스에서 파일명에 쓸 수 없는 문자
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# create_safe_filename 규칙: 한글, 영문, 숫자, _ 만 남김
+_NON_WORD_CHARS = re.compile(r'[^\w가-힣]')
+_REPEATED_UNDERSCORES = re.compile(r'_+')
+
+# Windows 예약 장치 이름 (확장자가 붙어도 사용할 수 없음)
+_WINDOWS_RESERVED = {"CON", "PRN", "AUX", "NUL"} | {f"COM{i}" for i in range(1, 10)} | {f"LPT{i}" for i in range(1, 10)}
+
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+
+def truncate_utf8(text, max_bytes):
+    """UTF-8 로 max_bytes 바이트 이내가 되도록 글자 단위로 자름"""
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", "ignore")
+
+
+def sanitize_filename(filename, fallback="download", max_bytes=MAX_NAME_BYTES, strict=False):
+    """
+    안전한 파일명으로 변환
+
+    strict=False: 파일명에 쓸 수 없는 문자만 '_' 로 변경 (mfds_downloader)
+    strict=True : 한글/영문/숫자 외 문자를 모두 '_' 로 바꾸고 연속 '_' 를 합침 (nedrug_finale_with_url)
+    확장자는 유지하고 이름 부분을 UTF-8 max_bytes 이내로 자릅니다. 남는 이름이 없으면 fallback 사용
+    """
+    filename = unicodedata.normalize("NFC", filename or "")
+    name, ext = os.path.splitext(filename)
+    if strict:
+        name = _REPEATED_UNDERSCORES.sub("_", _NON_WORD_CHARS.sub("_", name)).strip("_")
+    else:
+        name = _UNSAFE_CHARS.sub("_", name)
+    ext = truncate_utf8(_UNSAFE_CHARS.sub("_", ext), 16)
+
+    # Windows 는 끝의 공백/마침표를 허용하지 않음
+    name = name.strip().rstrip(". ")
+    if not name.strip("_"):
+        name = fallback
+    if name.split(".")[0].upper() in _WINDOWS_RESERVED:
+        name = f"_{name}"
+    return truncate_utf8(name, max_bytes - len(ext.encode("utf-8"))) + ext
+
+
+def candidate_names(filename, file_id="", max_bytes=MAX_NAME_BYTES):
+    """저장 경로 후보 이름: 원래 이름, 이름_{file_id}, 이름_{file_id}_2, ... (모두 max_bytes 이내)"""
+    name, ext = os.path.splitext(filename)
+    tag = f"_{_UNSAFE_CHARS.sub('_', str(file_id))}" if file_id else ""
+
+    def with_suffix(suffix):
+        return truncate_utf8(name, max_bytes - len((suffix + ext).encode("utf-8"))) + suffix + ext
+
+    yield filename
+    if tag:
+        yield with_suffix(tag)
+    for number in itertools.count(2):
+        yield with_suffix(f"{tag}_{number}")
+
+
+def create_exclusive(directory, filename, file_id="", max_attempts=1000):
+    """
+    directory 에 새 파일을 O_EXCL 로 만들어 (경로, 쓰기용 파일 객체) 를 반환
+
+    같은 이름의 파일이 있으면 file_id 접미사를 붙인 이름으로 다시 시도합니다.
+    """
+    os.makedirs(directory, exist_ok=True)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | _O_BINARY
+    for attempt, name in enumerate(candidate_names(filename, file_id)):
+        if attempt >= max_attempts:
+            break
+        path = os.path.join(directory, name)
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileExistsError:
+            continue
+        return path, os.fdopen(fd, "wb")
+    raise FileExistsError(f"사용할 수 있는 파일명을 찾지 못함: {os.path.join(directory, filename)}")
@@ -0,0 +1,130 @@
+"""
+항목별 추출 계획 (필요할 때만 PDF 다운로드)
+
+단계(목록 상태)마다 채워야 하는 필드가 정해져 있고, 값은 비용이 싼 출처부터 채웁니다.
+    1. html      상세 페이지 표 (성분정보, 의견제출기한, 허가반영일자, 내용의 예정일)
+    2. list      목록 행 (변경반영일)
+    3. textarea  상세 페이지 '내용' 본문에 적힌 날짜 (시행일 등)
+    4. cache     같은 첨부파일을 이번 실행에서 이미 받아 추출해 둔 PDF 텍스트
+    5. pdf       PDF 다운로드 후 텍스트 추출
+앞 단계에서 모든 필드가 채워지면 PDF 는 받지 않습니다.
+
+    plan = ExtractionPlan(status)
+    plan.offer("html", ingredient=..., reflect_date=...)
+    plan.apply_text("textarea", content_text, TEXTAREA_FIELDS)
+    if plan.complete:
+        ...  # PDF 생략
+    plan.finish(needed=False, downloaded=False)
+"""
+
+import re
+
+from nedrug_profile import profiler
+
+# 단계별로 채워야 하는 필드 (FinaleRecord 속성 이름)
+STAGE_FIELDS = {
+    "변경명령(안) 의견조회": ("ingredient", "exec_date", "submit_deadline"),
+    "사전예고": ("ingredient", "plan_date"),
+    "변경명령": ("ingredient", "exec_date", "reflect_date"),
+}
+
+# 예전 규칙에서 HTML 결과와 관계없이 항상 PDF 를 받던 단계 (절감 건수 집계용)
+ALWAYS_PDF_STATUSES = ("변경명령(안) 의견조회", "변경명령")
+
+# 상세 페이지 '내용' 본문에서 찾는 필드 (성분명은 본문에 영문 단어가 섞이면 오인식하므로 제외)
+TEXTAREA_FIELDS = ("exec_date", "submit_deadline", "plan_date", "reflect_date")
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _text_extractors():
+    """필드 -> 텍스트에서 값을 찾는 함수 (nedrug_extract 는 처음 필요할 때 로드)"""
+    from nedrug_extract import (
+        extract_exec_date_from_text,
+        extract_ingredient_name_from_pdf,
+        extract_plan_date_from_pdf,
+        extract_reflect_date_from_pdf,
+        extract_submit_deadline_from_pdf,
+    )
+
+    return {
+        "ingredient": extract_ingredient_name_from_pdf,
+        "exec_date": extract_exec_date_from_text,
+        "submit_deadline": extract_submit_deadline_from_pdf,
+        "plan_date": extract_plan_date_from_pdf,
+        "reflect_date": extract_reflect_date_from_pdf,
+    }
+
+
+def list_date(value):
+    """목록 행의 날짜 칸 값 (YYYY-MM-DD 형식이 아니면 빈 문자열)"""
+    match = _DATE_RE.search(value or "")
+    return match.group() if match else ""
+
+
+class ExtractionPlan:
+    """
+    한 항목의 필드별 값과 출처
+
+    offer()/apply_text() 는 아직 비어 있는 필드만 채우며, 먼저 채운 출처가 우선합니다.
+    """
+
+    def __init__(self, status):
+        self.status = status
+        self.fields = STAGE_FIELDS.get(status, ())
+        self.values = {field: "" for field in self.fields}
+        self.sources = {}
+        self.html_complete = None  # html 출처까지만으로 완성됐는지 (finish 에서 절감 건수 판단)
+
+    def __repr__(self):
+        return f"ExtractionPlan({self.status!r}, {self.values!r}, sources={self.sources!r})"
+
+    def missing(self, fields=None):
+        return [field for field in (fields or self.fields) if field in self.values and not self.values[field]]
+
+    @property
+    def complete(self):
+        return not self.missing()
+
+    def offer(self, source, **values):
+        """이미 구한 값 제공 (이 단계에 필요 없는 필드와 빈 값은 무시)"""
+        for field, value in values.items():
+            if value and field in self.values and not self.values[field]:
+                self.values[field] = value
+                self.sources[field] = source
+        if source == "html":
+            self.html_complete = self.complete
+        return self
+
+    def apply_text(self, source, text, fields=None):
+        """text 에서 아직 비어 있는 필드(fields 로 제한 가능)를 찾아 채움"""
+        missing = self.missing(fields)
+        if not text or not missing:
+            return self
+        extractors = _text_extractors()
+        return self.offer(source, **{field: extractors[field](text) for field in missing})
+
+    def finish(self, needed, downloaded):
+        """
+        항목 처리 끝. 필드별 출처와 PDF 생략/절감 건수를 집계합니다.
+
+        needed: 필드 추출에 PDF 텍스트가 필요했는지
+        downloaded: 이 항목에서 첨부파일을 실제로 네트워크에서 받았는지 (보고서 PDF파일 칸용 포함)
+            field_<필드>_missing   끝까지 채우지 못한 필드
+            pdf_not_needed         PDF 텍스트 없이 모든 필드를 채움
+            pdf_parse_avoided      그중 예전 규칙이었다면 PDF 텍스트를 추출했을 항목
+            pdf_download_avoided   그중 첨부파일도 받지 않은 항목 (NEDRUG_REPORT_PDFS=0 이거나 이미 받은 파일 재사용)
+        """
+        for field, source in self.sources.items():
+            profiler.count(f"field_{field}_{source}")
+        for field in self.missing():
+            profiler.count(f"field_{field}_missing")
+        if needed:
+            profiler.count("pdf_needed")
+            return
+        if self.complete:
+            profiler.count("pdf_not_needed")
+            if self.status in ALWAYS_PDF_STATUSES or not self.html_complete:
+                profiler.count("pdf_parse_avoided")
+                if not downloaded:
+                    profiler.count("pdf_download_avoided")
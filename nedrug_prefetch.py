@@ -0,0 +1,118 @@
+"""
+첨부파일 선행 다운로드(prefetch) 풀
+
+PDF 가 필요할 것 같은 시점에(보고서용 PDF 를 받는 설정이면 상세 페이지가 열리자마자, 아니면 HTML 표/목록으로
+채우지 못한 필드가 있을 때) downEdmsFile 첨부파일 ID 로 PDF 다운로드를 백그라운드 스레드에 맡기고,
+그동안 메인 스레드는 HTML 항목(성분명, 제출기한/예정일/반영일자)과 본문을 파싱합니다.
+HTML 만으로 충분해 PDF 가 필요 없다고 판정되면 작업을 취소합니다. 아직 시작하지 않은 작업은 실행되지 않고,
+이미 받고 있는 작업은 fetch 에 넘긴 cancelled(threading.Event)가 설정되어 다음 청크를 받기 전에 중단됩니다.
+
+환경변수:
+    NEDRUG_PREFETCH          1(기본) / 0 - 0 이면 기존처럼 필요할 때 순서대로 다운로드
+    NEDRUG_PREFETCH_WORKERS  동시 다운로드 수 (기본 2)
+
+    prefetch = PrefetchPool(fetch_pdf_attachment)   # fetch(*args, cancelled=Event) 형태로 호출
+    future = prefetch.submit(file_id, file_id, filename, attachment_index, ctx)
+    ...
+    if not need_pdf:
+        prefetch.cancel(future)
+    path, content = prefetch.result(future)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from nedrug_log import get_logger
+from nedrug_metrics import register_gauge
+from nedrug_profile import profiler
+
+log = get_logger("prefetch")
+
+DEFAULT_WORKERS = 2
+
+
+class PrefetchPool:
+    """
+    fetch 함수를 백그라운드 스레드에서 미리 실행하는 풀
+
+    fetch 는 cancelled 키워드 인자(threading.Event)를 받아, 설정되면 가능한 한 빨리 작업을 그만둬야 합니다.
+    같은 key 로 이미 진행 중인 작업이 있으면 그 Future 를 그대로 돌려줍니다.
+    스레드 풀은 처음 submit() 할 때 만들어집니다.
+    """
+
+    def __init__(self, fetch, workers=None, enabled=None):
+        self.fetch = fetch
+        self.workers = int(workers or os.environ.get("NEDRUG_PREFETCH_WORKERS", 0)) or DEFAULT_WORKERS
+        if enabled is None:
+            enabled = os.environ.get("NEDRUG_PREFETCH", "1").lower() not in ("0", "false", "off", "no")
+        self.enabled = enabled
+        self._executor = None
+        self._pending = {}  # key -> Future
+        self._lock = threading.Lock()
+        register_gauge("prefetch_pending", self.pending, "진행 중이거나 결과를 기다리는 선행 다운로드 수")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def pending(self):
+        """진행 중이거나 아직 결과를 가져가지 않은 선행 작업 수"""
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, key, *args):
+        """fetch(*args) 를 백그라운드에서 시작. 사용하지 않으면 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+            cancelled = threading.Event()
+            future = self._executor.submit(self.fetch, *args, cancelled=cancelled)
+            future.key = key
+            future.cancelled_event = cancelled
+            self._pending[key] = future
+        profiler.count("prefetch_started")
+        log.debug("    ⏩ 첨부파일 선행 다운로드 시작: %s", key)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            if self._pending.get(future.key) is future:
+                del self._pending[future.key]
+
+    def result(self, future):
+        """선행 작업 결과 (끝나지 않았으면 기다림)"""
+        self._forget(future)
+        with profiler.stage("prefetch_wait"):
+            result = future.result()
+        profiler.count("prefetch_used")
+        return result
+
+    def cancel(self, future):
+        """필요 없어진 선행 작업 취소. 이미 실행 중이면 cancelled 를 설정해 다음 청크에서 멈추게 하고 결과는 버림"""
+        if future is None:
+            return
+        self._forget(future)
+        future.cancelled_event.set()
+        if future.cancel():
+            profiler.count("prefetch_cancelled")
+        elif future.done():
+            profiler.count("prefetch_unused")
+        else:
+            profiler.count("prefetch_stopped")
+
+    def close(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.cancelled_event.set()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
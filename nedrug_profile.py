@@ -0,0 +1,222 @@
+"""
+실행 프로파일(단계별 소요 시간) 계측 유틸리티
+
+사용 예:
+    from nedrug_profile import profiler
+
+    with profiler.stage("fetch"):
+        response = session.get(url)
+    profiler.add_bytes(len(response.content))
+    profiler.count("pdf_downloaded")
+    profiler.add_items()
+
+    @profiler.timed("parse")
+    def extract_links_from_html(html_content, page_num): ...
+
+    profiler.write_report("run_profile")   # run_profile.json / run_profile.csv
+
+단계 이름은 fetch, parse, download, pdf_text, regex, report 를 공통으로 사용합니다.
+
+단계별 소요 시간은 건수/합계/최대값과 HISTOGRAM_BUCKETS 버킷별 건수를 기록할 때마다 누적하고,
+백분위수(p50/p95/p99)는 단계마다 최대 RESERVOIR_SIZE 개의 표본(reservoir sampling)으로 계산합니다.
+기록 건수가 RESERVOIR_SIZE 이하면 정확한 값이고, 상주 모드처럼 오래 돌아도 메모리와 집계 비용이 늘지 않습니다.
+"""
+
+import bisect
+import csv
+import functools
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# 소요 시간 히스토그램 버킷 상한 (초, 오름차순) - nedrug_metrics 의 기본 버킷
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESERVOIR_SIZE = 2048
+
+def _percentile(sorted_values, pct):
+    """정렬된 리스트에서 nearest-rank 방식 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _StageStats:
+    """한 단계의 누적 통계 (건수/합계/최대, 버킷별 건수, 백분위수용 표본)"""
+
+    __slots__ = ("count", "total", "max", "bucket_counts", "samples")
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bucket_counts = [0] * bucket_count  # 버킷별 (누적 아님) 건수, 마지막 상한 초과는 세지 않음
+        self.samples = []
+
+    def add(self, seconds, buckets, rng):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        index = bisect.bisect_left(buckets, seconds)
+        if index < len(buckets):
+            self.bucket_counts[index] += 1
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(seconds)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = seconds
+
+
+class RunProfiler:
+    """단계별 타이머와 카운터를 모으는 가벼운 계측기 (스레드 안전)"""
+
+    def __init__(self, name="nedrug", buckets=HISTOGRAM_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+            self.timings = {}  # 단계 이름 -> _StageStats
+            self.counters = {}
+            self.bytes_transferred = 0
+            self.items = 0
+
+    @contextmanager
+    def stage(self, name):
+        """with 블록의 소요 시간을 name 단계로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """함수 전체의 소요 시간을 name 단계로 기록하는 데코레이터"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self.timings.get(name)
+            if stats is None:
+                stats = self.timings[name] = _StageStats(len(self.buckets))
+            stats.add(seconds, self.buckets, self._rng)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_bytes(self, n):
+        with self._lock:
+            self.bytes_transferred += n or 0
+
+    def add_items(self, n=1):
+        with self._lock:
+            self.items += n
+
+    def histograms(self, buckets=None):
+        """
+        단계별 누적 히스토그램 {단계: ([버킷 상한별 누적 건수], 건수, 합계)} - Prometheus 노출용
+
+        buckets: 오름차순 상한 목록 (초, 없으면 self.buckets). 기록할 때 쓰는 self.buckets 중 일부여야 합니다.
+        """
+        if buckets is None:
+            buckets = self.buckets
+        try:
+            positions = [self.buckets.index(bound) for bound in buckets]
+        except ValueError:
+            raise ValueError(f"히스토그램 버킷은 {self.buckets} 중에서 골라야 합니다: {tuple(buckets)}") from None
+        with self._lock:
+            snapshot = {name: (list(stats.bucket_counts), stats.count, stats.total)
+                        for name, stats in self.timings.items()}
+        result = {}
+        for name, (bucket_counts, count, total) in snapshot.items():
+            running, cumulative = 0, []
+            for count_in_bucket in bucket_counts:
+                running += count_in_bucket
+                cumulative.append(running)
+            result[name] = ([cumulative[position] for position in positions], count, total)
+        return result
+
+    def summary(self):
+        """단계별 통계(건수/합계/평균/p50/p95/p99/최대)와 전체 처리량 요약"""
+        with self._lock:
+            elapsed = time.perf_counter() - self._start
+            stages = {}
+            for name, stats in self.timings.items():
+                ordered = sorted(stats.samples)
+                stages[name] = {
+                    "count": stats.count,
+                    "total_s": round(stats.total, 6),
+                    "mean_s": round(stats.total / stats.count, 6),
+                    "p50_s": round(_percentile(ordered, 50), 6),
+                    "p95_s": round(_percentile(ordered, 95), 6),
+                    "p99_s": round(_percentile(ordered, 99), 6),
+                    "max_s": round(stats.max, 6),
+                }
+            return {
+                "name": self.name,
+                "started_at": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+                "elapsed_s": round(elapsed, 3),
+                "items": self.items,
+                "items_per_sec": round(self.items / elapsed, 3) if elapsed > 0 else 0.0,
+                "bytes_transferred": self.bytes_transferred,
+                "counters": dict(self.counters),
+                "stages": stages,
+            }
+
+    def write_report(self, path_prefix):
+        """path_prefix.json / path_prefix.csv 로 실행 프로파일 저장. 저장된 경로 튜플 반환"""
+        data = self.summary()
+        json_path = f"{path_prefix}.json"
+        csv_path = f"{path_prefix}.csv"
+        try:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+            columns = ["stage", "count", "total_s", "mean_s", "p50_s", "p95_s", "p99_s", "max_s"]
+            with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for stage_name, stats in data["stages"].items():
+                    writer.writerow([stage_name] + [stats[c] for c in columns[1:]])
+                writer.writerow([])
+                writer.writerow(["elapsed_s", data["elapsed_s"]])
+                writer.writerow(["items", data["items"]])
+                writer.writerow(["items_per_sec", data["items_per_sec"]])
+                writer.writerow(["bytes_transferred", data["bytes_transferred"]])
+                for counter_name, value in data["counters"].items():
+                    writer.writerow([counter_name, value])
+            print(f"⏱️  실행 프로파일 저장: {json_path}, {csv_path}")
+        except OSError as e:
+            print(f"❌ 실행 프로파일 저장 중 오류 발생: {e}")
+        return json_path, csv_path
+
+    def print_summary(self):
+        """단계별 소요 시간 요약 출력"""
+        data = self.summary()
+        print(f"\n⏱️  실행 프로파일 ({data['name']}):")
+        print(f"   전체 소요: {data['elapsed_s']:.1f}초, 처리 항목: {data['items']}개 ({data['items_per_sec']:.2f}건/초)")
+        print(f"   전송량: {data['bytes_transferred'] / 1024:.1f} KB")
+        for stage_name, stats in data["stages"].items():
+            print(f"   - {stage_name:<9} {stats['count']:5d}회  합계 {stats['total_s']:8.2f}s  "
+                  f"p50 {stats['p50_s'] * 1000:7.1f}ms  p95 {stats['p95_s'] * 1000:7.1f}ms  p99 {stats['p99_s'] * 1000:7.1f}ms")
+
+
+# 스크립트 전체에서 공유하는 기본 계측기
+profiler = RunProfiler()
@@ -0,0 +1,239 @@
+"""
+대량 실행용 간결한 레코드 타입과 본문 텍스트 보관소
+
+전체 목록(수만 건)을 처리할 때 항목마다 긴 한글 키를 가진 dict 와 상세 본문/PDF 텍스트를
+메모리에 계속 들고 있지 않도록 합니다.
+    - 레코드는 __slots__ 클래스 (키 문자열을 항목마다 저장하지 않음)
+    - 단계/상태/성분명처럼 반복되는 값은 sys.intern 으로 한 벌만 유지
+    - 긴 텍스트는 TextStore(임시 파일)에 기록하고 레코드에는 참조(ID)만 보관
+
+기존 코드와 호환되도록 레코드는 dict 처럼 record["A_제목"], record.get(...), record[...] = ... 로 쓸 수 있고,
+to_dict() / records_to_rows() 로 기존과 같은 엑셀/텍스트 출력용 데이터를 만듭니다.
+
+    record = FinaleRecord(title=title, stage="의견조회", ...)
+    df = pd.DataFrame.from_records(records_to_rows(records), columns=FinaleRecord.KEYS)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from array import array
+
+SPILL_THRESHOLD = 512 # 이 길이(문자) 이상인 텍스트만 TextStore 에 기록
+
+
+def intern_text(value):
+    """반복되는 짧은 문자열(단계, 상태, 성분명 등)을 한 벌만 유지"""
+    return sys.intern(value) if isinstance(value, str) and value else (value or "")
+
+
+class TextStore:
+    """
+    긴 텍스트를 임시 파일에 이어 쓰고 참조로 돌려받는 보관소
+
+    put() 은 짧은 텍스트는 그대로, 긴 텍스트는 정수 ID 를 반환하고 get() 은 둘 다 문자열로 돌려줍니다.
+    파일은 close() 또는 프로세스 종료 시 삭제됩니다.
+    """
+
+    def __init__(self, directory=None, threshold=SPILL_THRESHOLD):
+        self.threshold = threshold
+        self._file = tempfile.TemporaryFile(prefix="nedrug_text_", dir=directory)
+        self._offsets = array('q')
+        self._lengths = array('q')
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size_bytes(self):
+        return self._end
+
+    def put(self, text):
+        """텍스트 보관. 반환값: 참조 (짧은 텍스트는 문자열 그대로, 긴 텍스트는 정수 ID)"""
+        if not isinstance(text, str) or len(text) < self.threshold:
+            return text or "" # 짧은 텍스트 또는 이미 참조인 값
+        data = text.encode("utf-8")
+        with self._lock:
+            self._file.seek(self._end)
+            self._file.write(data)
+            self._offsets.append(self._end)
+            self._lengths.append(len(data))
+            self._end += len(data)
+            return len(self._offsets) - 1
+
+    def get(self, ref):
+        """참조로 텍스트 읽기"""
+        if not isinstance(ref, int):
+            return ref or ""
+        with self._lock:
+            self._file.seek(self._offsets[ref])
+            return self._file.read(self._lengths[ref]).decode("utf-8")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def default_text_store():
+    """프로세스 전체에서 함께 쓰는 TextStore (처음 필요할 때 생성)"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TextStore(os.environ.get("NEDRUG_TEXT_STORE_DIR") or None)
+        return _default_store
+
+
+class SlotRecord:
+    """
+    __slots__ 레코드의 공통 부분: 기존 dict 키로 읽고 쓸 수 있게 합니다.
+
+    하위 클래스는 FIELDS = ((dict 키, 속성 이름), ...) 와 같은 순서의 __slots__ 를 정의합니다.
+    INTERNED 에 있는 속성은 값을 sys.intern 해서 저장합니다.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    INTERNED = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KEY_TO_ATTR = dict(cls.FIELDS)
+
+    def __init__(self, **values):
+        for _, attr in self.FIELDS:
+            self._set(attr, values.get(attr, ""))
+
+    def _set(self, attr, value):
+        object.__setattr__(self, attr, intern_text(value) if attr in self.INTERNED else value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """기존 dict (예: 스냅샷 파일의 레코드) 에서 생성. 이미 레코드면 복사본"""
+        record = cls.__new__(cls)
+        for key, attr in cls.FIELDS:
+            record._set(attr, data.get(key, ""))
+        return record
+
+    def __getitem__(self, key):
+        return getattr(self, self._KEY_TO_ATTR[key])
+
+    def __setitem__(self, key, value):
+        self._set(self._KEY_TO_ATTR[key], value)
+
+    def __contains__(self, key):
+        return key in self._KEY_TO_ATTR
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def keys(self):
+        return [key for key, _ in self.FIELDS]
+
+    def values(self):
+        return [self[key] for key, _ in self.FIELDS]
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class FinaleRecord(SlotRecord):
+    """nedrug_finale_with_url 의 항목 레코드 (엑셀 열 A~I)"""
+
+    FIELDS = (
+        ("A_제목", "title"),
+        ("B_단계", "stage"),
+        ("C_시행날짜", "exec_date"),
+        ("D_제출날짜", "submit_deadline"),
+        ("E_예정일", "plan_date"),
+        ("F_반영일자", "reflect_date"),
+        ("G_원료성분명", "ingredient"),
+        ("H_관련 URL", "url"),
+        ("I_관련 PDF", "pdf_path"),
+    )
+    KEYS = tuple(key for key, _ in FIELDS)
+    INTERNED = frozenset({"stage", "exec_date", "submit_deadline", "plan_date", "reflect_date", "ingredient"})
+    __slots__ = tuple(attr for _, attr in FIELDS)
+
+
+class LinkRecord(SlotRecord):
+    """목록 페이지에서 수집한 링크 (nedrug_url_beta)"""
+
+    FIELDS = (
+        ("sequence", "sequence"),
+        ("title", "title"),
+        ("url", "url"),
+        ("page", "page"),
+        ("status", "status"),
+    )
+    __slots__ = tuple(attr for _, attr in FIELDS)
+
+
+class DetailRecord(SlotRecord):
+    """
+    상세 페이지 내용 (nedrug_url_beta)
+
+    detail_content 는 TextStore 에 기록하고 참조만 보관합니다. record["detail_content"] 로 읽으면 텍스트가 반환됩니다.
+    """
+
+    FIELDS = (
+        ("url", "url"),
+        ("title", "title"),
+        ("detail_content", "content_ref"),
+        ("original_title", "original_title"),
+        ("sequence", "sequence"),
+    )
+    __slots__ = tuple(attr for _, attr in FIELDS) + ("store",)
+
+    def __init__(self, store=None, **values):
+        object.__setattr__(self, "store", store if store is not None else default_text_store())
+        values.setdefault("content_ref", values.pop("detail_content", ""))
+        super().__init__(**values)
+
+    @classmethod
+    def from_dict(cls, data, store=None):
+        values = {attr: data.get(key, "") for key, attr in cls.FIELDS}
+        values["detail_content"] = values.pop("content_ref")
+        return cls(store=store, **values)
+
+    def _set(self, attr, value):
+        if attr == "content_ref":
+            value = self.store.put(value)
+        super()._set(attr, value)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        return self.store.get(value) if key == "detail_content" else value
+
+
+def records_to_rows(records, record_type=FinaleRecord):
+    """레코드(또는 dict) 목록 -> record_type.KEYS 순서의 튜플 목록 (DataFrame.from_records 용)"""
+    keys = [key for key, _ in record_type.FIELDS]
+    return [tuple(record.get(key, "") for key in keys) for record in records]
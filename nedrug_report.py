@@ -0,0 +1,323 @@
+"""
+엑셀 보고서 작성 (단계별 시트 + 성분별 시트, CSV/Parquet 부가 출력)
+
+레코드를 한 번 훑어 중복을 없애고 단계(의견조회/사전예고/변경명령)별 행 목록으로 나눈 뒤,
+시트마다 xlsxwriter 로 행을 바로 씁니다. pandas DataFrame 을 단계마다 복사하고 하이퍼링크/PDF 칸을 다시
+덮어쓰던 방식보다 빠르고 메모리를 적게 씁니다.
+
+    - 행이 STREAM_ROWS 보다 많으면 constant_memory 모드 (다 쓴 행은 임시 파일로 내보내 메모리를 거의 쓰지 않음),
+      그 이하는 임시 파일 없이 메모리에서 바로 압축 (작은 보고서는 이쪽이 빠름)
+    - 시트당 하이퍼링크 제한(65,530개)을 넘는 URL 은 HYPERLINK 수식으로 씀 (수식은 개수 제한이 없지만 쓰는 데 더 느림)
+
+    - 관련 URL 칸은 하이퍼링크, PDF파일 칸은 파일이 있을 때만 파일명 (예전 보고서와 같은 모양)
+      NEDRUG_REPORT_PDFS=0 으로 추출에 필요 없는 첨부파일을 받지 않은 항목은 '미다운로드: <첨부파일 이름>'
+    - 부가 출력(side_outputs): 'csv' 는 시트 행을 쓰는 같은 반복에서 시트별 CSV(utf-8-sig)도 씀,
+      'parquet' 는 pyarrow 가 설치되어 있을 때 시트별 .parquet 파일
+    - 파일 이름: <엑셀 파일 이름>_<시트>.csv / .parquet (엑셀 파일과 같은 폴더)
+
+환경변수:
+    NEDRUG_REPORT_SIDE_OUTPUTS  부가 출력 형식 (쉼표 구분, 예: csv,parquet)
+    NEDRUG_REPORT_PDFS          1(기본) / 0 - 필드 추출에 PDF 가 필요 없던 항목도 PDF파일 칸을 위해 첨부파일을 받을지
+
+    summary = write_workbook(records, "요약.xlsx", side_outputs=["csv"])
+    summary.sheets   # {'의견조회': 120, '사전예고': 40, '변경명령': 300, '성분별': 85}
+"""
+
+import csv
+import importlib.util
+import os
+
+from nedrug_ingredients import group_by_ingredient
+from nedrug_log import get_logger
+from nedrug_profile import profiler
+from nedrug_records import FinaleRecord, records_to_rows
+
+log = get_logger("report")
+
+# 시트 이름 -> (열 제목, 레코드 키, 열 너비)
+STAGE_SHEETS = {
+    "의견조회": (
+        ("제목", "A_제목", 35),
+        ("단계", "B_단계", 12),
+        ("시행날짜", "C_시행날짜", 15),
+        ("제출날짜", "D_제출날짜", 15),
+        ("원료/성분명(영문)", "G_원료성분명", 25),
+        ("관련 URL", "H_관련 URL", 35),
+        ("PDF파일", "I_관련 PDF", 45),
+    ),
+    "사전예고": (
+        ("제목", "A_제목", 35),
+        ("단계", "B_단계", 12),
+        ("예정일", "E_예정일", 15),
+        ("원료/성분명(영문)", "G_원료성분명", 25),
+        ("관련 URL", "H_관련 URL", 35),
+        ("PDF파일", "I_관련 PDF", 45),
+    ),
+    "변경명령": (
+        ("제목", "A_제목", 35),
+        ("단계", "B_단계", 12),
+        ("시행날짜", "C_시행날짜", 15),
+        ("반영일자", "F_반영일자", 15),
+        ("원료/성분명(영문)", "G_원료성분명", 25),
+        ("관련 URL", "H_관련 URL", 35),
+        ("PDF파일", "I_관련 PDF", 45),
+    ),
+}
+INGREDIENT_SHEET = "성분별"
+INGREDIENT_COLUMNS = (
+    ("원료/성분명(영문)", 25),
+    ("건수", 10),
+    ("의견조회", 10),
+    ("사전예고", 10),
+    ("변경명령", 10),
+    ("제목", 80),
+)
+
+SIDE_OUTPUT_FORMATS = ("csv", "parquet")
+
+# 엑셀 제한: 시트당 하이퍼링크 수, URL 길이 (넘으면 일반 문자열로 씀), 셀 글자 수
+MAX_URLS_PER_SHEET = 65530
+MAX_URL_LENGTH = 2079
+MAX_FORMULA_URL_LENGTH = 255  # HYPERLINK 수식의 주소 길이
+MAX_CELL_LENGTH = 32767
+
+# 이보다 행이 많으면 constant_memory 모드로 씀
+STREAM_ROWS = 20000
+
+_KEY_INDEX = {key: index for index, key in enumerate(FinaleRecord.KEYS)}
+_TITLE_INDEX = _KEY_INDEX["A_제목"]
+_STAGE_INDEX = _KEY_INDEX["B_단계"]
+_INGREDIENT_INDEX = _KEY_INDEX["G_원료성분명"]
+_PDF_KEY = "I_관련 PDF"
+PDF_NOT_DOWNLOADED_PREFIX = "미다운로드: " # PDF파일 칸에 그대로 표시하는 자리표시 (받지 않은 첨부파일 이름 앞)
+
+
+def report_pdfs_enabled():
+    """필드 추출에 PDF 가 필요 없던 항목도 보고서 PDF파일 칸을 위해 첫 첨부파일을 받을지 (NEDRUG_REPORT_PDFS)"""
+    return os.environ.get("NEDRUG_REPORT_PDFS", "1").lower() not in ("0", "false", "off", "no")
+
+
+def pdf_placeholder(filename):
+    """받지 않은 첨부파일의 PDF파일 칸 값"""
+    return f"{PDF_NOT_DOWNLOADED_PREFIX}{filename}"
+
+
+def side_output_formats(value=None):
+    """부가 출력 형식 목록 (value 가 없으면 NEDRUG_REPORT_SIDE_OUTPUTS)"""
+    if value is None:
+        value = os.environ.get("NEDRUG_REPORT_SIDE_OUTPUTS", "")
+    if isinstance(value, str):
+        value = value.split(",")
+    formats = []
+    for name in value:
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in SIDE_OUTPUT_FORMATS:
+            log.warning("⚠️  알 수 없는 부가 출력 형식: %s (가능: %s)", name, ", ".join(SIDE_OUTPUT_FORMATS))
+        elif name not in formats:
+            formats.append(name)
+    return formats
+
+
+def report_rows(records):
+    """레코드 -> FinaleRecord.KEYS 순서의 행 튜플 목록 (완전히 같은 행은 처음 것만)"""
+    return list(dict.fromkeys(records_to_rows(records)))
+
+
+def group_rows(rows):
+    """한 번 훑어 단계별로 나눔 {단계: [행]} (행 순서 유지)"""
+    groups = {}
+    for row in rows:
+        stage = row[_STAGE_INDEX]
+        group = groups.get(stage)
+        if group is None:
+            group = groups[stage] = []
+        group.append(row)
+    return groups
+
+
+def ingredient_summary(rows):
+    """성분별 시트 행 [(성분명, 건수, 의견조회, 사전예고, 변경명령, 제목들)] (대표 이름 기준, 복합제는 성분마다)"""
+    summary = []
+    for name, group in group_by_ingredient(rows, key=_INGREDIENT_INDEX).items():
+        if not name:
+            continue
+        counts = {stage: 0 for stage in STAGE_SHEETS}
+        for row in group:
+            if row[_STAGE_INDEX] in counts:
+                counts[row[_STAGE_INDEX]] += 1
+        titles = " / ".join(dict.fromkeys(row[_TITLE_INDEX] for row in group))[:MAX_CELL_LENGTH]
+        summary.append((name, len(group), *counts.values(), titles))
+    return summary
+
+
+def side_output_path(output_path, sheet_name, extension):
+    return f"{os.path.splitext(output_path)[0]}_{sheet_name}.{extension}"
+
+
+class ReportSummary:
+    """write_workbook() 결과: 행 수, 시트별 행 수, 단계별 건수, 부가 출력 파일"""
+
+    def __init__(self, path, rows, sheets, stage_counts, side_outputs):
+        self.path = path
+        self.rows = rows
+        self.sheets = sheets
+        self.stage_counts = stage_counts
+        self.side_outputs = side_outputs
+
+    def __repr__(self):
+        return f"ReportSummary({self.path!r}, rows={self.rows}, sheets={self.sheets!r})"
+
+
+class _PdfNames:
+    """PDF 경로 -> 엑셀에 표시할 파일명 (파일이 없으면 빈 문자열, 경로별로 한 번만 확인)"""
+
+    def __init__(self):
+        self._names = {}
+
+    def __call__(self, path):
+        if not path:
+            return ""
+        if path.startswith(PDF_NOT_DOWNLOADED_PREFIX):
+            return path
+        name = self._names.get(path)
+        if name is None:
+            name = self._names[path] = os.path.basename(path) if os.path.exists(path) else ""
+        return name
+
+
+def _sheet_tables(rows):
+    """시트 이름 -> (열 제목, 행 목록) - 단계 시트는 STAGE_SHEETS 순서, 비어 있는 시트는 제외"""
+    pdf_name = _PdfNames()
+    groups = group_rows(rows)
+    tables = {}
+    for sheet_name, columns in STAGE_SHEETS.items():
+        stage_rows = groups.get(sheet_name)
+        if not stage_rows:
+            continue
+        indexes = [_KEY_INDEX[key] for _, key, _ in columns]
+        pdf_column = [key for _, key, _ in columns].index(_PDF_KEY)
+        table = []
+        for row in stage_rows:
+            values = [row[index] or "" for index in indexes]
+            values[pdf_column] = pdf_name(values[pdf_column])
+            table.append(values)
+        tables[sheet_name] = table
+    ingredient_rows = ingredient_summary(rows)
+    if ingredient_rows:
+        tables[INGREDIENT_SHEET] = ingredient_rows
+    return groups, tables
+
+
+def _sheet_columns(sheet_name):
+    """시트의 [(열 제목, 열 너비)]"""
+    if sheet_name == INGREDIENT_SHEET:
+        return list(INGREDIENT_COLUMNS)
+    return [(title, width) for title, _, width in STAGE_SHEETS[sheet_name]]
+
+
+def _open_csv(path, headers):
+    f = open(path, "w", encoding="utf-8-sig", newline="")
+    writer = csv.writer(f)
+    writer.writerow(headers)
+    return f, writer
+
+
+def _write_parquet(path, headers, table):
+    import pyarrow
+    import pyarrow.parquet
+
+    columns = {header: [row[index] for row in table] for index, header in enumerate(headers)}
+    pyarrow.parquet.write_table(pyarrow.table(columns), path)
+
+
+def write_workbook(records, output_path, side_outputs=None, rows=None):
+    """
+    레코드를 단계별 시트 + 성분별 시트 엑셀로 저장
+
+    side_outputs: 'csv'/'parquet' 목록 (없으면 NEDRUG_REPORT_SIDE_OUTPUTS)
+    rows: 이미 구한 report_rows(records) 결과 (파일 이름에 건수를 넣으려고 먼저 구한 경우)
+    반환값: ReportSummary
+    """
+    formats = side_output_formats(side_outputs)
+    if "parquet" in formats and not importlib.util.find_spec("pyarrow"):
+        log.warning("⚠️  Parquet 부가 출력에는 pyarrow 가 필요합니다. 건너뜁니다.")
+        formats.remove("parquet")
+
+    with profiler.stage("report"):
+        if rows is None:
+            rows = report_rows(records)
+        groups, tables = _sheet_tables(rows)
+        side_paths = _write_sheets(output_path, tables, with_csv="csv" in formats, stream=len(rows) > STREAM_ROWS)
+        if "parquet" in formats:
+            for sheet_name, table in tables.items():
+                path = side_output_path(output_path, sheet_name, "parquet")
+                _write_parquet(path, [title for title, _ in _sheet_columns(sheet_name)], table)
+                side_paths.append(path)
+    return ReportSummary(output_path, len(rows), {name: len(table) for name, table in tables.items()},
+                         {stage: len(group) for stage, group in groups.items()}, side_paths)
+
+
+def _hyperlink_formula(url):
+    return '=HYPERLINK("{}")'.format(url.replace('"', '""'))
+
+
+def _write_sheets(output_path, tables, with_csv=False, stream=True):
+    """
+    시트별로 행을 바로 씀 (stream 이면 constant_memory, 아니면 메모리에서 압축)
+    with_csv 이면 같은 반복에서 시트별 CSV 도 씀. 반환값: 쓴 CSV 파일 경로 목록
+    """
+    import xlsxwriter  # 엑셀 단계에서만 필요
+
+    csv_paths = []
+    workbook = xlsxwriter.Workbook(output_path, {"constant_memory": True} if stream else {"in_memory": True})
+    try:
+        # pandas to_excel 의 제목 행과 같은 모양
+        header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        hyperlink_format = workbook.add_format({"font_color": "blue", "underline": 1})
+        for sheet_name, table in tables.items():
+            columns = _sheet_columns(sheet_name)
+            headers = [title for title, _ in columns]
+            worksheet = workbook.add_worksheet(sheet_name)
+            for column, (title, width) in enumerate(columns):
+                worksheet.set_column(column, column, width)
+                worksheet.write_string(0, column, title, header_format)
+            url_column = headers.index("관련 URL") if "관련 URL" in headers else -1
+
+            csv_file = csv_writer = None
+            if with_csv:
+                csv_paths.append(side_output_path(output_path, sheet_name, "csv"))
+                csv_file, csv_writer = _open_csv(csv_paths[-1], headers)
+            write_string, write_number = worksheet.write_string, worksheet.write_number
+            write_url, write_formula = worksheet.write_url, worksheet.write_formula
+            urls = plain_urls = 0
+            try:
+                for row_num, values in enumerate(table, start=1):
+                    for column, value in enumerate(values):
+                        if not value and value != 0:
+                            continue  # 빈 칸은 쓰지 않음
+                        if column == url_column:
+                            if urls < MAX_URLS_PER_SHEET and len(value) <= MAX_URL_LENGTH:
+                                write_url(row_num, column, value, hyperlink_format, value)
+                                urls += 1
+                                continue
+                            if len(value) <= MAX_FORMULA_URL_LENGTH:
+                                write_formula(row_num, column, _hyperlink_formula(value), hyperlink_format, value)
+                                continue
+                            plain_urls += 1
+                        if isinstance(value, int):
+                            write_number(row_num, column, value)
+                        else:
+                            write_string(row_num, column, value)
+                    if csv_writer is not None:
+                        csv_writer.writerow(values)
+            finally:
+                if csv_file is not None:
+                    csv_file.close()
+            if plain_urls:
+                log.warning("⚠️  [%s] URL %s개는 엑셀 하이퍼링크 길이 제한을 넘어 문자열로 저장했습니다.",
+                            sheet_name, plain_urls)
+    finally:
+        workbook.close()
+    return csv_paths
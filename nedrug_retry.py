@@ -0,0 +1,209 @@
+"""
+실패 작업 재시도 큐와 실패 보관소(dead letter)
+
+목록 페이지, 상세 페이지, 첨부파일 다운로드가 실패하면 RetryQueue 에 넣고, 본 작업이 끝난 뒤 같은 실행 안에서
+지수 백오프(base_delay × 2^(시도-1), 최대 max_delay, ±10% 무작위)로 다시 시도합니다.
+max_attempts 번까지 실패한 작업은 DeadLetterStore(JSON Lines 파일)에 남고,
+각 스크립트의 --retry-failed 모드가 그 파일에 남은 작업만 다시 처리합니다.
+
+환경변수:
+    NEDRUG_RETRY_ATTEMPTS     작업별 최대 시도 횟수 (첫 시도 포함, 기본 4)
+    NEDRUG_RETRY_BASE_DELAY   첫 재시도 대기 (초, 기본 2)
+    NEDRUG_DEAD_LETTER_FILE   실패 보관소 파일 (기본: 스크립트별 위치의 failed_tasks.jsonl)
+
+    queue = RetryQueue(dead_letters=DeadLetterStore("failed_tasks.jsonl"))
+    queue.failed("detail", url, {"url": url, "title": title}, "503 Server Error")
+    ...
+    queue.run(lambda task: process(task.payload))   # True 를 반환하면 성공
+"""
+
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+from nedrug_log import get_logger
+from nedrug_metrics import register_gauge
+from nedrug_profile import profiler
+
+log = get_logger("retry")
+
+DEAD_LETTER_FILENAME = "failed_tasks.jsonl"
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 60.0
+JITTER = 0.1
+
+
+def backoff_delay(attempts, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, jitter=JITTER):
+    """attempts 번 실패한 뒤 다음 시도까지 대기 시간 (초)"""
+    delay = min(max_delay, base_delay * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+class RetryTask:
+    """재시도할 작업 하나 (kind: list_page/detail/download 등, key: 작업 식별자, payload: 다시 처리할 때 필요한 값)"""
+
+    __slots__ = ("kind", "key", "payload", "attempts", "error", "due")
+
+    def __init__(self, kind, key, payload=None, attempts=1, error="", due=0.0):
+        self.kind = kind
+        self.key = str(key)
+        self.payload = payload or {}
+        self.attempts = attempts
+        self.error = error
+        self.due = due
+
+    def __repr__(self):
+        return f"RetryTask({self.kind!r}, {self.key!r}, attempts={self.attempts})"
+
+    def to_dict(self):
+        return {"kind": self.kind, "key": self.key, "payload": self.payload,
+                "attempts": self.attempts, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["kind"], data["key"], data.get("payload"), data.get("attempts", 1), data.get("error", ""))
+
+
+class DeadLetterStore:
+    """
+    재시도해도 실패한 작업 보관 파일 (JSON Lines, 추가만 함)
+
+    같은 (kind, key) 는 마지막 줄이 유효하며, resolve() 는 해결 표시 줄을 덧붙입니다.
+    compact() 로 아직 남은 작업만 남기고 파일을 다시 씁니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("NEDRUG_DEAD_LETTER_FILE") or DEAD_LETTER_FILENAME
+        self._lock = threading.Lock()
+
+    def _append(self, entry):
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def add(self, task):
+        self._append(dict(task.to_dict(), failed_at=time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def resolve(self, kind, key):
+        self._append({"kind": kind, "key": str(key), "resolved": True})
+
+    def pending(self, kinds=None):
+        """아직 해결되지 않은 작업 목록 (파일에 기록된 순서)"""
+        entries = {}
+        try:
+            with self._lock, open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 쓰다 끊긴 마지막 줄
+                    entries.pop((entry["kind"], entry["key"]), None)
+                    if not entry.get("resolved"):
+                        entries[(entry["kind"], entry["key"])] = entry
+        except FileNotFoundError:
+            return []
+        return [RetryTask.from_dict(entry) for (kind, _), entry in entries.items() if kinds is None or kind in kinds]
+
+    def __len__(self):
+        return len(self.pending())
+
+    def compact(self):
+        """남은 작업만 남기고 파일을 다시 씀 (남은 작업이 없으면 파일 삭제). 반환값: 남은 작업 수"""
+        tasks = self.pending()
+        with self._lock:
+            if not tasks:
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                return 0
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for task in tasks:
+                    f.write(json.dumps(task.to_dict(), ensure_ascii=False) + "\n")
+            os.replace(temp_path, self.path)
+        return len(tasks)
+
+
+class RetryQueue:
+    """
+    같은 실행 안에서 실패 작업을 백오프 후 다시 시도하는 큐 (스레드 안전)
+
+    failed() 로 넣은 작업은 run() 이 예정 시각 순서로 처리합니다.
+    max_attempts 번째 실패는 dead 목록과 dead_letters(있으면 파일)에 남습니다.
+    """
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=DEFAULT_MAX_DELAY, dead_letters=None,
+                 sleep=time.sleep):
+        self.max_attempts = int(max_attempts or os.environ.get("NEDRUG_RETRY_ATTEMPTS", 0)) or DEFAULT_MAX_ATTEMPTS
+        if base_delay is None:
+            base_delay = float(os.environ.get("NEDRUG_RETRY_BASE_DELAY", DEFAULT_BASE_DELAY))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letters = dead_letters
+        self.dead = []  # 이번 실행에서 포기한 작업
+        self._sleep = sleep
+        self._heap = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        register_gauge("retry_queue_depth", self.__len__, "재시도를 기다리는 작업 수")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+    def failed(self, kind, key, payload=None, error="", attempts=1):
+        """
+        attempts 번째 시도가 실패한 작업 등록. 다시 시도할 수 있으면 큐에, 아니면 dead letter 로
+        반환값: 재시도 예정이면 True
+        """
+        task = RetryTask(kind, key, payload, attempts, str(error))
+        if attempts >= self.max_attempts:
+            self.dead.append(task)
+            profiler.count(f"retry_dead_{kind}")
+            log.warning("   💀 %s %s: %s번 시도 모두 실패 (%s)", kind, key, attempts, task.error)
+            if self.dead_letters is not None:
+                self.dead_letters.add(task)
+            return False
+        task.due = time.monotonic() + backoff_delay(attempts, self.base_delay, self.max_delay)
+        with self._lock:
+            heapq.heappush(self._heap, (task.due, next(self._order), task))
+        profiler.count(f"retry_queued_{kind}")
+        return True
+
+    def run(self, handler):
+        """
+        큐가 빌 때까지 예정 시각이 된 작업을 handler(task) 로 다시 처리
+
+        handler 가 참을 반환하면 성공, 거짓을 반환하거나 예외가 나면 다시 failed() 로 넘깁니다.
+        반환값: 성공한 작업 목록
+        """
+        succeeded = []
+        while True:
+            with self._lock:
+                if not self._heap:
+                    break
+                due, _, task = heapq.heappop(self._heap)
+            wait = due - time.monotonic()
+            if wait > 0:
+                self._sleep(wait)
+            log.info("🔁 재시도 %s/%s: %s %s", task.attempts + 1, self.max_attempts, task.kind, task.key)
+            try:
+                ok = handler(task)
+                error = task.error if not ok else ""
+            except Exception as e:
+                ok, error = False, e
+            if ok:
+                profiler.count(f"retry_succeeded_{task.kind}")
+                succeeded.append(task)
+            else:
+                self.failed(task.kind, task.key, task.payload, error, task.attempts + 1)
+        return succeeded
@@ -0,0 +1,80 @@
+"""
+nedrug_finale_with_url 실행 컨텍스트
+
+결과 폴더 이름, 엑셀/PDF 저장 경로, 크롬 옵션 등 한 번의 실행에 필요한 설정을 모읍니다.
+모듈을 import 하는 것만으로는 폴더를 만들거나 selenium 을 로드하지 않으며,
+prepare() 를 호출할 때 폴더를 생성합니다.
+"""
+
+import os
+import threading
+from datetime import datetime
+
+# 현재 Python 스크립트 파일이 위치한 디렉토리를 기본 저장 디렉토리로 설정
+SCRIPT_RUN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PDF_FOLDER_NAME = "nedrug_pdfs"
+
+
+class RunContext:
+    """한 번의 실행에서 사용하는 결과 폴더와 설정"""
+
+    def __init__(self, base_dir=None, started_at=None):
+        self.script_run_dir = base_dir or SCRIPT_RUN_DIR
+        self.started_at = started_at or datetime.now()
+
+        # 결과 디렉토리 이름을 'nedrug_년도_월일_시간_분' 형식으로 구성
+        self.result_folder_name = self.started_at.strftime("nedrug_%Y%m%d_%H%M")
+
+        # 최종 결과물 (엑셀)이 저장될 디렉토리
+        self.excel_save_dir = os.path.join(self.script_run_dir, self.result_folder_name)
+
+        # PDF 파일이 저장될 디렉토리
+        self.download_dir = os.path.join(self.excel_save_dir, PDF_FOLDER_NAME)
+
+        self._validators = None
+        self._validators_lock = threading.Lock()
+
+    def prepare(self):
+        """필요한 디렉토리 생성 후 저장 경로 안내"""
+        os.makedirs(self.excel_save_dir, exist_ok=True)
+        os.makedirs(self.download_dir, exist_ok=True)
+
+        print("📁 저장 경로 설정:")
+        print(f"   스크립트 실행 폴더: {self.script_run_dir}")
+        print(f"   결과 저장 폴더: {self.excel_save_dir}")
+        print(f"   PDF 저장 폴더: {self.download_dir}")
+        return self
+
+    @property
+    def validators(self):
+        """
+        첨부파일 검증값 기록 (nedrug_attachments.AttachmentValidators, 처음 사용할 때 열림)
+
+        결과 폴더는 실행마다 새로 만들어지므로 실행 간에 유지되는 스크립트 폴더에 둡니다.
+        """
+        with self._validators_lock:
+            if self._validators is None:
+                from nedrug_attachments import AttachmentValidators
+
+                self._validators = AttachmentValidators(self.script_run_dir)
+            return self._validators
+
+    def close(self):
+        """검증값 변경 기록을 기록 파일로 합침"""
+        with self._validators_lock:
+            if self._validators is not None:
+                self._validators.close()
+
+    @staticmethod
+    def chrome_options():
+        """크롬(headless) 옵션 생성. selenium 은 이때 처음 로드됩니다."""
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        return options
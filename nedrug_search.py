@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+수집 결과 전문 검색 인덱스 (SQLite FTS5 + 2-gram)
+
+상세 내용(detail_content), 제목, 원료/성분명, PDF 페이지별 텍스트를 로컬 SQLite 파일 하나에 색인합니다.
+한국어는 띄어쓰기 단위로 검색하면 '아세트아미노펜정' 안의 '아세트아미노펜' 같은 부분 문자열을 찾지 못하므로,
+본문을 2글자 단위(2-gram)로 나눠 FTS5(unicode61)에 넣고 검색어도 같은 방식으로 나눠 구(phrase) 검색합니다.
+(FTS5 trigram 토크나이저는 3글자 미만 검색어를 색인으로 찾지 못해 2글자 한국어 단어에 맞지 않음)
+단어의 마지막 글자는 어떤 2-gram 의 첫 글자도 아니므로 한 글자 검색을 위해 1-gram 으로 따로 넣습니다.
+
+문서마다 내용 해시를 저장해 두므로 매 실행 다시 색인해도 바뀐 문서만 갱신됩니다.
+
+사용법:
+    python nedrug_search.py query 아세트아미노펜
+    python nedrug_search.py query "허가사항 변경" --kind pdf --limit 20
+    python nedrug_search.py stats
+
+인덱스 파일 위치: 스크립트 폴더의 nedrug_search.db (환경변수 NEDRUG_SEARCH_DB 로 변경)
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime
+
+SEARCH_DB_FILENAME = "nedrug_search.db"
+
+# 문서 종류: detail(상세 페이지 내용), item(수집 레코드), pdf(PDF 한 페이지)
+DOCUMENT_KINDS = ("detail", "item", "pdf")
+
+_WORD_RE = re.compile(r"\w+")
+
+# 색인 토큰 형식이 바뀌면 올림 (예전 인덱스는 열 때 documents 의 원문으로 다시 색인)
+INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    info_no TEXT,
+    url TEXT,
+    title TEXT,
+    status TEXT,
+    ingredient TEXT,
+    page INTEGER,
+    body TEXT,
+    content_hash TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_info_no ON documents(info_no);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, ingredient, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def default_db_path():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.environ.get("NEDRUG_SEARCH_DB") or os.path.join(base_dir, SEARCH_DB_FILENAME)
+
+
+def _normalize(text):
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _word_bigrams(word):
+    if len(word) <= 2:
+        return [word]
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def to_bigrams(text):
+    """색인용 2-gram 문자열 ('아세트아미노펜' -> '아세 세트 트아 아미 미노 노펜 펜', 마지막 글자는 1-gram)"""
+    grams = []
+    for word in _WORD_RE.findall(_normalize(text)):
+        grams.extend(_word_bigrams(word))
+        if len(word) > 1:
+            grams.append(word[-1])
+    return " ".join(grams)
+
+
+def build_match_query(query):
+    """
+    검색어를 FTS5 MATCH 식으로 변환
+
+    띄어쓰기로 나뉜 단어는 모두 포함(AND)해야 하며, 각 단어는 2-gram 구(phrase)로 찾습니다.
+    한 글자 단어는 접두어 검색으로 그 글자로 시작하는 2-gram 과 단어 끝 1-gram 을 함께 찾습니다.
+    """
+    terms = []
+    for word in _WORD_RE.findall(_normalize(query)):
+        if len(word) == 1:
+            terms.append(f'"{word}"*')
+        else:
+            terms.append('"' + " ".join(_word_bigrams(word)) + '"')
+    return " AND ".join(terms)
+
+
+def _snippet(text, query, width=40):
+    """원문에서 첫 번째 검색어 주변 문자열"""
+    if not text:
+        return ""
+    flat = re.sub(r"\s+", " ", text)
+    lowered = _normalize(flat)
+    for word in _WORD_RE.findall(_normalize(query)):
+        position = lowered.find(word)
+        if position >= 0:
+            start = max(0, position - width)
+            end = min(len(flat), position + len(word) + width)
+            return ("…" if start else "") + flat[start:end] + ("…" if end < len(flat) else "")
+    return flat[:width * 2] + ("…" if len(flat) > width * 2 else "")
+
+
+def _content_hash(*values):
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(str(value or "").encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class SearchIndex:
+    """
+    SQLite 전문 검색 인덱스
+
+    add_* 메서드는 내용 해시가 같으면 아무것도 하지 않으므로 매 실행 전체를 넘겨도 됩니다.
+    여러 건을 넣을 때는 with index.batch(): 로 묶으면 한 번에 커밋합니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._reindex()
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self.added = 0
+        self.unchanged = 0
+
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _reindex(self):
+        """저장된 원문으로 FTS 토큰을 다시 만듦 (INDEX_VERSION 이 바뀐 예전 인덱스)"""
+        rows = self.conn.execute("SELECT id, title, ingredient, body FROM documents").fetchall()
+        with self.conn:
+            self.conn.execute("DELETE FROM documents_fts")
+            self.conn.executemany(
+                "INSERT INTO documents_fts (rowid, title, ingredient, body) VALUES (?, ?, ?, ?)",
+                [(doc_id, to_bigrams(title), to_bigrams(ingredient), to_bigrams(body))
+                 for doc_id, title, ingredient, body in rows])
+            self.conn.execute(f"PRAGMA user_version={INDEX_VERSION}")
+
+    @contextmanager
+    def batch(self):
+        """블록 안의 추가/갱신을 하나의 트랜잭션으로 커밋"""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.conn.commit()
+
+    def _upsert(self, doc_key, kind, info_no="", url="", title="", status="", ingredient="", page=None, body="",
+                content_hash=None):
+        content_hash = content_hash or _content_hash(title, status, ingredient, body, url)
+        with self._lock:
+            row = self.conn.execute("SELECT id, content_hash FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+            if row and row[1] == content_hash:
+                self.unchanged += 1
+                return False
+            values = (kind, info_no, url, title, status, ingredient, page, body, content_hash,
+                      datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            if row:
+                doc_id = row[0]
+                self.conn.execute(
+                    "UPDATE documents SET kind=?, info_no=?, url=?, title=?, status=?, ingredient=?, page=?, body=?, "
+                    "content_hash=?, updated_at=? WHERE id=?", values + (doc_id,))
+                self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+            else:
+                doc_id = self.conn.execute(
+                    "INSERT INTO documents (kind, info_no, url, title, status, ingredient, page, body, content_hash, "
+                    "updated_at, doc_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values + (doc_key,)).lastrowid
+            self.conn.execute(
+                "INSERT INTO documents_fts (rowid, title, ingredient, body) VALUES (?, ?, ?, ?)",
+                (doc_id, to_bigrams(title), to_bigrams(ingredient), to_bigrams(body)))
+            self.added += 1
+            if not self._batch_depth:
+                self.conn.commit()
+            return True
+
+    def add_detail(self, info_no, url, title, detail_content, status=""):
+        """상세 페이지 내용 색인 (nedrug_url_beta)"""
+        return self._upsert(f"detail:{info_no}", "detail", info_no, url, title, status, "", None, detail_content)
+
+    def add_item(self, info_no, url, title, status, ingredient):
+        """수집 레코드 색인 (nedrug_finale_with_url: 제목/단계/원료성분명)"""
+        return self._upsert(f"item:{info_no}", "item", info_no, url, title, status, ingredient)
+
+    def add_pdf(self, info_no, url, title, status, ingredient, pdf_path, page_texts=None):
+        """
+        PDF 페이지별 텍스트 색인
+
+        PDF 내용과 제목/단계/성분명이 지난번과 같으면 텍스트를 다시 추출하지 않습니다.
+        page_texts 를 넘기면(예: OCR 결과) 추출 대신 그 텍스트를 사용합니다.
+        반환값: 새로 색인한 페이지 수
+        """
+        from nedrug_extract import PdfSource, extract_pdf_page_texts
+
+        # 해시 계산과 텍스트 추출이 같은 mmap 을 사용 (파일을 두 번 읽지 않음)
+        with PdfSource.open(pdf_path) as pdf:
+            content_hash = f"{hashlib.sha256(pdf.view()).hexdigest()}:{_content_hash(title, status, ingredient, url)}"
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT 1 FROM documents WHERE info_no = ? AND kind = 'pdf' AND content_hash = ? LIMIT 1",
+                    (info_no, content_hash)).fetchone()
+                if row:
+                    self.unchanged += 1
+                    return 0
+
+            if page_texts is None:
+                page_texts = extract_pdf_page_texts(pdf)
+
+        changed = 0
+        with self.batch():
+            # 페이지 수가 줄었을 수 있으므로 이전 페이지 문서는 지우고 다시 넣음
+            old_ids = [row[0] for row in self.conn.execute(
+                "SELECT id FROM documents WHERE info_no = ? AND kind = 'pdf'", (info_no,))]
+            for doc_id in old_ids:
+                self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                self.conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            for page, text in enumerate(page_texts, 1):
+                if (text or "").strip():
+                    changed += self._upsert(f"pdf:{info_no}:{page}", "pdf", info_no, url, title, status, ingredient,
+                                            page, text, content_hash=content_hash)
+        return changed
+
+    def search(self, query, kind=None, limit=20):
+        """
+        검색 결과 리스트 (관련도 순)
+
+        각 결과: {'kind', 'info_no', 'title', 'status', 'ingredient', 'page', 'url', 'snippet', 'score'}
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+        sql = ("SELECT d.kind, d.info_no, d.title, d.status, d.ingredient, d.page, d.url, d.body, "
+               "bm25(documents_fts) AS score FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+               "WHERE documents_fts MATCH ?")
+        params = [match]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        results = []
+        for kind_, info_no, title, status, ingredient, page, url, body, score in rows:
+            results.append({
+                'kind': kind_, 'info_no': info_no, 'title': title, 'status': status, 'ingredient': ingredient,
+                'page': page, 'url': url, 'snippet': _snippet(body or title, query), 'score': round(score, 3),
+            })
+        return results
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {'documents': counts, 'db_bytes': size, 'path': self.path}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="의약품안전나라 수집 결과 전문 검색")
+    parser.add_argument("--db", help="인덱스 파일 경로 (기본: 스크립트 폴더의 nedrug_search.db)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = subparsers.add_parser("query", help="검색")
+    query_parser.add_argument("text", nargs="+", help="검색어 (띄어쓰기로 나눈 단어를 모두 포함하는 문서)")
+    query_parser.add_argument("--kind", choices=DOCUMENT_KINDS, help="문서 종류 제한")
+    query_parser.add_argument("--limit", type=int, default=20, help="최대 결과 수")
+
+    subparsers.add_parser("stats", help="인덱스 현황")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or default_db_path()
+    if not os.path.exists(db_path):
+        print(f"❌ 검색 인덱스가 없습니다: {db_path}")
+        print("   nedrug_url_beta.py 또는 nedrug_finale_with_url.py 를 먼저 실행하세요.")
+        return 1
+
+    with SearchIndex(db_path) as index:
+        if args.command == "stats":
+            stats = index.stats()
+            print(f"📚 검색 인덱스: {stats['path']} ({stats['db_bytes'] / 1024:.1f} KB)")
+            for kind, count in sorted(stats['documents'].items()):
+                print(f"   - {kind}: {count}건")
+            return 0
+
+        query = " ".join(args.text)
+        start = time.perf_counter()
+        results = index.search(query, kind=args.kind, limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"🔎 '{query}' 검색 결과 {len(results)}건 ({elapsed_ms:.1f}ms)")
+        for i, result in enumerate(results, 1):
+            location = f" p.{result['page']}" if result['page'] else ""
+            print(f"{i:3d}. [{result['kind']}{location}] {result['title']} ({result['status'] or '-'})")
+            if result['ingredient']:
+                print(f"     성분: {result['ingredient']}")
+            if result['snippet']:
+                print(f"     {result['snippet']}")
+            print(f"     {result['url']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+목록 행 스냅샷 저장소 (변경 감지)
+
+실행할 때마다 목록의 각 행(제목, 상태 cells[5], 변경반영일 cells[4])을 지문(fingerprint)과 함께 저장해 두고,
+다음 실행에서 새로 읽은 목록과 비교해 신규/변경된 행만 상세 페이지와 PDF 를 다시 처리할 수 있게 합니다.
+예) 같은 공고가 '사전예고' → '변경명령(안) 의견조회' → '변경명령' 으로 바뀌는 경우
+
+    snapshot = SnapshotStore(os.path.join(SCRIPT_RUN_DIR, SNAPSHOT_FILENAME), skip_unchanged=True)
+    change = snapshot.compare(key, title, status, change_reflect_date)
+    if change['kind'] == 'unchanged' and snapshot.skip_unchanged and change['record']:
+        ...  # 지난 실행의 레코드 재사용
+    snapshot.update(key, title, status, change_reflect_date, record)
+    snapshot.save()
+    snapshot.write_change_log(os.path.join(ctx.excel_save_dir, CHANGE_LOG_FILENAME))
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+SNAPSHOT_FILENAME = "nedrug_snapshot.json"
+CHANGE_LOG_FILENAME = "변경내역.csv"
+
+# 지문에 포함되는 목록 행 필드
+FINGERPRINT_FIELDS = ("title", "status", "change_reflect_date")
+
+FIELD_LABELS = {"title": "제목", "status": "상태", "change_reflect_date": "변경반영일"}
+
+
+def item_key(href, title=""):
+    """목록 행을 구분하는 키 (상세 URL 의 infoNo, 없으면 URL 또는 제목)"""
+    match = re.search(r"infoNo=(\d+)", href or "")
+    if match:
+        return match.group(1)
+    return href or title
+
+
+def row_fingerprint(title, status, change_reflect_date):
+    """목록 행 지문 (공백 차이는 무시)"""
+    values = [re.sub(r"\s+", " ", value or "").strip() for value in (title, status, change_reflect_date)]
+    return hashlib.sha1("\x1f".join(values).encode("utf-8")).hexdigest()
+
+
+def _record_to_json(value):
+    """레코드 객체(nedrug_records.FinaleRecord 등)는 dict 로 저장"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"JSON 으로 저장할 수 없는 값: {type(value).__name__}")
+
+
+class SnapshotStore:
+    """
+    목록 행 스냅샷 (JSON 파일 하나)
+
+    skip_unchanged=True 이면 호출 측에서 변경 없는 행은 지난 레코드를 재사용하도록 합니다.
+    이번 실행에서 감지한 신규/변경 내역은 changes 에 모였다가 write_change_log() 로 저장됩니다.
+    (상주 모드에서는 확인 주기마다 write_change_log() 가 같은 파일에 이어 씁니다)
+    """
+
+    def __init__(self, path, skip_unchanged=False):
+        self.path = path
+        self.skip_unchanged = skip_unchanged
+        self.rows = {}
+        self.changes = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.rows = json.load(f).get("rows", {})
+        except (OSError, ValueError):
+            self.rows = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def compare(self, key, title, status, change_reflect_date):
+        """
+        지난 스냅샷과 비교
+
+        반환값: {'kind': 'new'|'changed'|'unchanged', 'changed_fields': [(필드, 이전 값, 현재 값)], 'record': 지난 레코드}
+        """
+        with self._lock:
+            previous = self.rows.get(key)
+        if previous is None:
+            return {"kind": "new", "changed_fields": [], "record": None}
+
+        current = {"title": title, "status": status, "change_reflect_date": change_reflect_date}
+        if previous.get("fingerprint") == row_fingerprint(title, status, change_reflect_date):
+            return {"kind": "unchanged", "changed_fields": [], "record": previous.get("record")}
+        changed_fields = [
+            (field, previous.get(field, ""), current[field])
+            for field in FINGERPRINT_FIELDS
+            if (previous.get(field, "") or "").strip() != (current[field] or "").strip()
+        ]
+        return {"kind": "changed", "changed_fields": changed_fields, "record": previous.get("record")}
+
+    def update(self, key, title, status, change_reflect_date, record=None, change=None):
+        """
+        이번 실행에서 본 행을 스냅샷에 반영하고, 신규/변경이면 변경 내역에 추가
+
+        change 에는 compare() 결과를 넘깁니다 (없으면 여기서 비교).
+        """
+        change = change or self.compare(key, title, status, change_reflect_date)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            previous = self.rows.get(key, {})
+            self.rows[key] = {
+                "title": title,
+                "status": status,
+                "change_reflect_date": change_reflect_date,
+                "fingerprint": row_fingerprint(title, status, change_reflect_date),
+                "first_seen": previous.get("first_seen", now),
+                "last_seen": now,
+                "record": record if record is not None else previous.get("record"),
+            }
+            if change["kind"] != "unchanged":
+                self.changes.append({
+                    "detected_at": now,
+                    "key": key,
+                    "kind": change["kind"],
+                    "title": title,
+                    "status": status,
+                    "changed_fields": change["changed_fields"],
+                })
+
+    def save(self):
+        """스냅샷 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            data = {"updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "rows": self.rows}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1, default=_record_to_json)
+            os.replace(temp_path, self.path)
+
+    def write_change_log(self, path):
+        """
+        모인 신규/변경 내역을 CSV 로 저장하고 비웁니다 (엑셀에서 바로 열 수 있도록 UTF-8 BOM).
+        파일이 이미 있으면 뒤에 이어 씁니다. 내역이 없으면 None
+        """
+        with self._lock:
+            changes, self.changes = self.changes, []
+        if not changes:
+            return None
+        kind_labels = {"new": "신규", "changed": "변경"}
+        write_header = not os.path.exists(path)
+        with open(path, "a", encoding="utf-8-sig" if write_header else "utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["감지 시각", "infoNo", "구분", "제목", "현재 상태", "변경 항목", "이전 값", "현재 값"])
+            for change in changes:
+                base = [change["detected_at"], change["key"], kind_labels.get(change["kind"], change["kind"]),
+                        change["title"], change["status"]]
+                if not change["changed_fields"]:
+                    writer.writerow(base + ["", "", ""])
+                for field, before, after in change["changed_fields"]:
+                    writer.writerow(base + [FIELD_LABELS.get(field, field), before, after])
+        return path
@@ -0,0 +1,327 @@
+"""
+작업자들이 함께 쓰는 실행 상태 (항목 중복 방지, 레코드 수집, 카운터)
+
+항목 처리 함수가 main 의 records 리스트에 직접 append 하고 '이미 처리했나' 를 따로 확인하면,
+작업자가 여러 개일 때 확인과 추가 사이에 다른 작업자가 끼어들어 같은 항목을 두 번 처리하거나 레코드를 잃습니다.
+이 모듈의 상태 객체는 확인과 추가를 한 번에(원자적으로) 처리합니다.
+
+    MemoryState   한 프로세스 안의 스레드끼리 공유 (잠금)
+    SQLiteState   여러 프로세스가 같은 파일을 공유 (SQLite WAL, 프로세스/스레드마다 연결)
+
+두 백엔드의 메서드는 같습니다.
+    state.claim("item", key)          처음 가져간 작업자만 True (처리 실패 시 release 로 반납)
+    state.add_record(key, record)     같은 key 의 레코드가 이미 있으면 False
+    state.update_record(key, record)  추가한 뒤 바뀐 레코드 저장 (OCR 결과 반영 등)
+    state.records()                   추가된 순서대로 레코드 목록
+    state.incr("items_failed")        카운터 증가 후 새 값
+
+SQLiteState 의 행은 실행 ID(run_id)별로 나뉩니다. 함께 일하는 작업자들은 같은 run_id 를 넘기고,
+run_id 없이 연 상태는 새 실행 ID 로 시작하므로 지난 실행의 claim/레코드/카운터를 보지 않습니다.
+처리 중에 죽은 작업자의 claim 은 리스(lease) 시간이 지나거나 같은 호스트의 프로세스가 없어지면 다른 작업자가 다시 가져갑니다.
+RUN_RETENTION_DAYS 보다 오래된 실행의 행은 상태 파일을 열 때 지웁니다.
+
+환경변수:
+    NEDRUG_STATE_DB      SQLite 상태 파일 (없으면 MemoryState). 같은 파일과 실행 ID 를 쓰는 프로세스끼리 항목을 나눠 처리합니다.
+    NEDRUG_RUN_ID        함께 일하는 작업자들이 공유하는 실행 ID (없으면 새로 만듦)
+    NEDRUG_STATE_LEASE   claim 리스 시간 (초, 기본 900)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from nedrug_log import get_logger
+from nedrug_records import FinaleRecord
+
+log = get_logger("state")
+
+BUSY_TIMEOUT_MS = 30000
+DEFAULT_LEASE_SECONDS = 900
+RUN_RETENTION_DAYS = 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    run_id TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    PRIMARY KEY (run_id, namespace, key)
+);
+CREATE TABLE IF NOT EXISTS records (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    run_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+def new_run_id():
+    """새 실행 ID (시각 + 호스트 + pid + 무작위 접미사)"""
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{socket.gethostname()}_{os.getpid()}_{os.urandom(3).hex()}"
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _owner_alive(owner):
+    """claim 주인 프로세스가 살아 있는지 (다른 호스트의 주인은 알 수 없으므로 살아 있다고 봄)"""
+    try:
+        host, pid, _ = owner.rsplit(":", 2)
+        pid = int(pid)
+    except ValueError:
+        return True
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # 권한 없음 등: 프로세스는 있음
+    return True
+
+
+class MemoryState:
+    """한 프로세스 안에서 여러 스레드가 공유하는 실행 상태"""
+
+    def __init__(self, record_type=FinaleRecord):
+        self.record_type = record_type
+        self._lock = threading.Lock()
+        self._claims = {}    # namespace -> set(key)
+        self._records = {}   # key -> record (추가 순서 유지)
+        self._counters = {}
+
+    def claim(self, namespace, key):
+        with self._lock:
+            claimed = self._claims.setdefault(namespace, set())
+            if key in claimed:
+                return False
+            claimed.add(key)
+            return True
+
+    def release(self, namespace, key):
+        with self._lock:
+            self._claims.get(namespace, set()).discard(key)
+
+    def add_record(self, key, record):
+        with self._lock:
+            if key in self._records:
+                return False
+            self._records[key] = record
+            return True
+
+    def update_record(self, key, record):
+        with self._lock:
+            self._records[key] = record
+
+    def records(self):
+        with self._lock:
+            return list(self._records.values())
+
+    def record_count(self):
+        with self._lock:
+            return len(self._records)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            value = self._counters[name] = self._counters.get(name, 0) + amount
+            return value
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+            self._records.clear()
+            self._counters.clear()
+
+    def close(self):
+        pass
+
+
+class SQLiteState:
+    """
+    SQLite 파일을 공유하는 실행 상태 (여러 프로세스/스레드)
+
+    WAL 모드라 한 작업자가 쓰는 동안에도 다른 작업자가 읽을 수 있고, 쓰기는 SQLite 잠금으로 차례로 처리됩니다.
+    sqlite3 연결은 스레드끼리 공유하지 않도록 스레드마다 따로 엽니다.
+    레코드는 record_type.to_dict() 를 JSON 으로 저장하고 records() 에서 record_type.from_dict() 로 되돌립니다.
+
+    모든 행은 run_id 로 나뉘며, 조회/집계도 이 실행(run_id)의 행만 봅니다.
+    claim 은 lease_seconds 가 지났거나 주인 프로세스가 죽었고 아직 레코드가 없으면 다른 작업자가 다시 가져갈 수 있습니다.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path, record_type=FinaleRecord, run_id=None, lease_seconds=None):
+        self.path = path
+        self.record_type = record_type
+        self.run_id = run_id or os.environ.get("NEDRUG_RUN_ID") or new_run_id()
+        if lease_seconds is None:
+            lease_seconds = float(os.environ.get("NEDRUG_STATE_LEASE", DEFAULT_LEASE_SECONDS))
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._prepare()
+
+    def _prepare(self):
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                # run_id 가 없던 예전 형식: 실행 간에 이어 쓸 내용이 없으므로 새로 만듦
+                for table in ("runs", "claims", "records", "counters"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute("INSERT OR IGNORE INTO runs (run_id, started_at) VALUES (?, ?)", (self.run_id, time.time()))
+            expired = [run_id for run_id, in conn.execute(
+                "SELECT run_id FROM runs WHERE started_at < ? AND run_id != ?",
+                (time.time() - RUN_RETENTION_DAYS * 86400, self.run_id))]
+            for run_id in expired:
+                for table in ("claims", "records", "counters", "runs"):
+                    conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        if expired:
+            log.info("🧹 %s일 지난 실행 상태 %s건 삭제", RUN_RETENTION_DAYS, len(expired))
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 문장마다 자동 커밋 (트랜잭션이 필요한 곳만 BEGIN IMMEDIATE)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def claim(self, namespace, key):
+        key = str(key)
+        now = time.time()
+        conn = self._conn()
+        if conn.execute("INSERT OR IGNORE INTO claims (run_id, namespace, key, owner, claimed_at) VALUES (?, ?, ?, ?, ?)",
+                        (self.run_id, namespace, key, _owner(), now)).rowcount == 1:
+            return True
+        # 이미 claim 된 항목: 주인이 죽었거나 리스가 지났고 레코드도 없으면 넘겨받음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, claimed_at FROM claims WHERE run_id = ? AND namespace = ? AND key = ?",
+                               (self.run_id, namespace, key)).fetchone()
+            taken = False
+            if row is None:
+                conn.execute("INSERT INTO claims (run_id, namespace, key, owner, claimed_at) VALUES (?, ?, ?, ?, ?)",
+                             (self.run_id, namespace, key, _owner(), now))
+                taken = True
+            elif (now - row[1] > self.lease_seconds or not _owner_alive(row[0])) and not conn.execute(
+                    "SELECT 1 FROM records WHERE run_id = ? AND key = ?", (self.run_id, key)).fetchone():
+                conn.execute("UPDATE claims SET owner = ?, claimed_at = ? WHERE run_id = ? AND namespace = ? AND key = ?",
+                             (_owner(), now, self.run_id, namespace, key))
+                log.info("♻️  만료된 claim 넘겨받음: %s %s (이전 주인 %s)", namespace, key, row[0])
+                taken = True
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return taken
+
+    def release(self, namespace, key):
+        self._conn().execute("DELETE FROM claims WHERE run_id = ? AND namespace = ? AND key = ?",
+                             (self.run_id, namespace, str(key)))
+
+    def _dump(self, record):
+        data = record.to_dict() if hasattr(record, "to_dict") else dict(record)
+        return json.dumps(data, ensure_ascii=False)
+
+    def add_record(self, key, record):
+        cursor = self._conn().execute("INSERT OR IGNORE INTO records (run_id, key, data) VALUES (?, ?, ?)",
+                                      (self.run_id, str(key), self._dump(record)))
+        return cursor.rowcount == 1
+
+    def update_record(self, key, record):
+        self._conn().execute(
+            "INSERT INTO records (run_id, key, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(run_id, key) DO UPDATE SET data = excluded.data",
+            (self.run_id, str(key), self._dump(record)))
+
+    def records(self):
+        rows = self._conn().execute("SELECT data FROM records WHERE run_id = ? ORDER BY seq", (self.run_id,)).fetchall()
+        return [self.record_type.from_dict(json.loads(data)) for data, in rows]
+
+    def record_count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM records WHERE run_id = ?", (self.run_id,)).fetchone()[0]
+
+    def incr(self, name, amount=1):
+        return self._conn().execute(
+            "INSERT INTO counters (run_id, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(run_id, name) DO UPDATE SET value = value + excluded.value RETURNING value",
+            (self.run_id, name, amount)).fetchone()[0]
+
+    def counters(self):
+        return dict(self._conn().execute("SELECT name, value FROM counters WHERE run_id = ?", (self.run_id,)).fetchall())
+
+    def clear(self):
+        """이 실행(run_id)의 claim/레코드/카운터 삭제"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in ("claims", "records", "counters"):
+                conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (self.run_id,))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def open_state(path=None, record_type=FinaleRecord, run_id=None):
+    """
+    path(없으면 NEDRUG_STATE_DB)가 있으면 SQLiteState, 없으면 MemoryState
+
+    run_id(없으면 NEDRUG_RUN_ID, 그것도 없으면 새 ID): 같은 상태 파일에서 함께 일할 작업자끼리 맞추는 실행 ID
+    """
+    path = path or os.environ.get("NEDRUG_STATE_DB")
+    if not path:
+        return MemoryState(record_type)
+    state = SQLiteState(path, record_type, run_id)
+    log.info("🗄️  공유 실행 상태: %s (실행 ID %s)", path, state.run_id)
+    return state
@@ -1,9 +1,24 @@
+import argparse
 import requests
 from bs4 import BeautifulSoup
 import time
 import re
 import os
+import sqlite3
 from urllib.parse import urljoin, parse_qs, urlparse
+from nedrug_archive import DetailArchive, write_detail_text
+from nedrug_boards import DEFAULT_BOARD, get_board
+from nedrug_http_cache import LIST_TTL, HttpCache, detail_ttl
+from nedrug_metrics import start_metrics_server
+from nedrug_profile import profiler
+from nedrug_log import ProgressBar, get_logger, setup_logging
+from nedrug_records import DetailRecord, LinkRecord, intern_text
+from nedrug_retry import DEAD_LETTER_FILENAME, DeadLetterStore, RetryQueue
+from nedrug_search import SearchIndex
+from nedrug_snapshot import item_key
+
+log = get_logger("url_beta")
+STATUS_COLUMN = get_board(DEFAULT_BOARD).columns['status'] # 목록 행의 상태 칸 위치
 
 class IntegratedNedrugScraper:
     def __init__(self):
@@ -16,7 +31,10 @@ class IntegratedNedrugScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
-        self.base_url = "https://nedrug.mfds.go.kr/CCBAR01F012/getList"
+        self.base_url = get_board(DEFAULT_BOARD).list_url
+        self.page_delay = 1  # 목록 페이지 요청 간 대기 (초)
+        self.http_cache = HttpCache()  # 목록/상세 페이지 디스크 캐시
+        self.retry_queue = RetryQueue(dead_letters=DeadLetterStore())  # 실패 페이지 재시도 (끝까지 실패하면 failed_tasks.jsonl)
 
     # ==================== 1단계: URL 수집 ====================
     
@@ -26,14 +44,14 @@ class IntegratedNedrugScraper:
         
         try:
             # 첫 페이지 요청
-            response = self.session.get(self.base_url, timeout=15)
+            response = self.http_cache.get(self.session, self.base_url, ttl=LIST_TTL, timeout=15)
             response.raise_for_status()
             response.encoding = 'utf-8'
             
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # 방법 1: 마지막 페이지 버튼을 클릭했을 때의 URL 파악
-            test_response = self.session.get(self.base_url, params={'page': 999}, timeout=15)
+            test_response = self.http_cache.get(self.session, self.base_url, params={'page': 999}, ttl=LIST_TTL, timeout=15)
             
             if '?totalPages=' in test_response.url:
                 # URL에서 totalPages 추출
@@ -69,15 +87,19 @@ class IntegratedNedrugScraper:
                 'limit': 10
             }
             
-            response = self.session.get(self.base_url, params=params, timeout=15)
-            response.raise_for_status()
+            with profiler.stage("fetch"):
+                response = self.http_cache.get(self.session, self.base_url, params=params, ttl=LIST_TTL, timeout=15)
+                response.raise_for_status()
+            if not response.from_cache:
+                profiler.add_bytes(len(response.content))
             response.encoding = 'utf-8'
             return response.text
             
         except requests.RequestException as e:
-            print(f"❌ 페이지 {page_num} 요청 중 오류 발생: {e}")
+            log.warning("❌ 페이지 %s 요청 중 오류 발생: %s", page_num, e)
             return None
 
+    @profiler.timed("parse")
     def extract_links_from_html(self, html_content, page_num):
         """HTML에서 제목 링크들을 추출"""
         if not html_content:
@@ -115,18 +137,20 @@ class IntegratedNedrugScraper:
                             full_url = urljoin(base_url, href)
                         
                         sequence_num = cells[0].get_text().strip()
+                        status = cells[STATUS_COLUMN].get_text().strip() if len(cells) > STATUS_COLUMN else ""
                         
-                        links.append({
-                            'sequence': sequence_num,
-                            'title': title,
-                            'url': full_url,
-                            'page': page_num
-                        })
+                        links.append(LinkRecord(
+                            sequence=sequence_num,
+                            title=title,
+                            url=full_url,
+                            page=page_num,
+                            status=intern_text(status) # 상세 페이지 캐시 유지 시간(detail_ttl) 기준
+                        ))
             
             return links
             
         except Exception as e:
-            print(f"❌ 페이지 {page_num} 파싱 중 오류 발생: {e}")
+            log.warning("❌ 페이지 %s 파싱 중 오류 발생: %s", page_num, e)
             return []
 
     def collect_all_urls(self):
@@ -146,26 +170,29 @@ class IntegratedNedrugScraper:
             print(f"📈 예상 항목 수: {estimated_items}개")
             print("=" * 40)
             
-            for page_num in range(1, total_pages + 1):
-                print(f"📄 페이지 {page_num}/{total_pages} 처리 중...")
+            with ProgressBar(total=total_pages, desc="📄 목록") as progress:
+                for page_num in range(1, total_pages + 1):
+                    log.debug("📄 페이지 %s/%s 처리 중...", page_num, total_pages)
                 
-                html_content = self.get_page_data(page_num)
-                if html_content:
-                    page_links = self.extract_links_from_html(html_content, page_num)
-                    if page_links:
-                        all_links.extend(page_links)
-                        print(f"   ✅ {len(page_links)}개 링크 수집")
+                    html_content = self.get_page_data(page_num)
+                    if html_content:
+                        page_links = self.extract_links_from_html(html_content, page_num)
+                        if page_links:
+                            all_links.extend(page_links)
+                            log.debug("   ✅ %s개 링크 수집", len(page_links))
+                        else:
+                            failed_pages.append(page_num)
+                            log.warning("   ⚠️ 페이지 %s: 빈 페이지", page_num)
                     else:
                         failed_pages.append(page_num)
-                        print(f"   ⚠️ 빈 페이지")
-                else:
-                    failed_pages.append(page_num)
-                    print(f"   ❌ 페이지 로딩 실패")
+                        log.warning("   ❌ 페이지 %s: 페이지 로딩 실패", page_num)
+                        self.retry_queue.failed("list_page", page_num, {'page': page_num}, "페이지 로딩 실패")
+                    progress.update(ok=page_num not in failed_pages)
                 
-                time.sleep(1)
+                    time.sleep(self.page_delay)
                 
-                if page_num % 10 == 0:
-                    print(f"📊 현재까지 수집된 링크 수: {len(all_links)}개")
+                    if page_num % 10 == 0:
+                        log.info("📊 현재까지 수집된 링크 수: %s개", len(all_links))
         else:
             # 순차적 탐색
             print("🔍 순차적 탐색 모드로 URL을 수집합니다...")
@@ -176,33 +203,43 @@ class IntegratedNedrugScraper:
             consecutive_empty_pages = 0
             max_empty_pages = 3
             
-            while consecutive_empty_pages < max_empty_pages:
-                print(f"📄 페이지 {page_num} 처리 중...")
+            with ProgressBar(total=0, desc="📄 목록") as progress:
+                while consecutive_empty_pages < max_empty_pages:
+                    log.debug("📄 페이지 %s 처리 중...", page_num)
                 
-                html_content = self.get_page_data(page_num)
-                if html_content:
-                    page_links = self.extract_links_from_html(html_content, page_num)
-                    if page_links:
-                        all_links.extend(page_links)
-                        consecutive_empty_pages = 0
-                        print(f"   ✅ {len(page_links)}개 링크 수집")
+                    html_content = self.get_page_data(page_num)
+                    if html_content:
+                        page_links = self.extract_links_from_html(html_content, page_num)
+                        if page_links:
+                            all_links.extend(page_links)
+                            consecutive_empty_pages = 0
+                            log.debug("   ✅ %s개 링크 수집", len(page_links))
+                        else:
+                            consecutive_empty_pages += 1
+                            log.warning("   ⚠️ 페이지 %s: 빈 페이지 감지 (%s/%s)", page_num, consecutive_empty_pages, max_empty_pages)
                     else:
                         consecutive_empty_pages += 1
-                        print(f"   ⚠️ 빈 페이지 감지 ({consecutive_empty_pages}/{max_empty_pages})")
-                else:
-                    consecutive_empty_pages += 1
-                    print(f"   ❌ 페이지 로딩 실패 ({consecutive_empty_pages}/{max_empty_pages})")
+                        log.warning("   ❌ 페이지 %s: 페이지 로딩 실패 (%s/%s)", page_num, consecutive_empty_pages, max_empty_pages)
+                        self.retry_queue.failed("list_page", page_num, {'page': page_num}, "페이지 로딩 실패")
+                    progress.update(ok=consecutive_empty_pages == 0)
                 
-                time.sleep(1)
+                    time.sleep(self.page_delay)
                 
-                if page_num % 10 == 0:
-                    print(f"📊 현재까지 수집된 링크 수: {len(all_links)}개")
+                    if page_num % 10 == 0:
+                        log.info("📊 현재까지 수집된 링크 수: %s개", len(all_links))
                 
-                page_num += 1
+                    page_num += 1
                 
-                if page_num > 200:  # 무한루프 방지
-                    print("⚠️ 최대 페이지 수(200) 도달. 수집을 종료합니다.")
-                    break
+                    if page_num > 200:  # 무한루프 방지
+                        log.warning("⚠️ 최대 페이지 수(200) 도달. 수집을 종료합니다.")
+                        break
+        
+        # 로딩에 실패한 목록 페이지는 백오프 후 다시 시도하고, 페이지 순서대로 다시 정렬
+        retried = self.retry_queue.run(lambda task: self._retry_list_page(task, all_links))
+        if retried:
+            retried_pages = {int(task.key) for task in retried}
+            failed_pages = [page for page in failed_pages if page not in retried_pages]
+            all_links.sort(key=lambda link: link['page'])
         
         print("=" * 80)
         print(f"🎉 URL 수집 완료! 총 {len(all_links)}개의 링크를 찾았습니다.")
@@ -212,17 +249,28 @@ class IntegratedNedrugScraper:
         
         return all_links
 
+    def _retry_list_page(self, task, all_links):
+        """재시도 큐의 목록 페이지 한 건 다시 받기 (성공하면 all_links 에 추가)"""
+        page_num = task.payload['page']
+        html_content = self.get_page_data(page_num)
+        if not html_content:
+            return False
+        # 마지막 페이지 뒤의 번호는 사이트가 마지막 페이지를 다시 보여주므로 이미 있는 링크는 제외
+        known_urls = {link['url'] for link in all_links}
+        page_links = [link for link in self.extract_links_from_html(html_content, page_num) if link['url'] not in known_urls]
+        all_links.extend(page_links)
+        log.info("   ✅ 페이지 %s 재시도 성공: %s개 링크", page_num, len(page_links))
+        return True
+
     # ==================== 2단계: 상세 내용 추출 ====================
     
+    @profiler.timed("parse")
     def extract_detail_content(self, html_content, url):
         """상세정보 내용 추출"""
         soup = BeautifulSoup(html_content, 'html.parser')
         
-        result = {
-            'url': url,
-            'title': '',
-            'detail_content': ''
-        }
+        # 본문(detail_content)은 TextStore 에 기록되고 레코드에는 참조만 남음
+        result = DetailRecord(url=url)
         
         try:
             # 1. 제목 추출
@@ -262,19 +310,22 @@ class IntegratedNedrugScraper:
                         break
                         
         except Exception as e:
-            print(f"❌ 내용 추출 중 오류 발생 ({url}): {e}")
+            log.warning("❌ 내용 추출 중 오류 발생 (%s): %s", url, e)
             
         return result
 
-    def get_page_content(self, url):
-        """페이지 내용 가져오기"""
+    def get_page_content(self, url, ttl=None):
+        """페이지 내용 가져오기 (ttl: 캐시 유지 시간, 상세 페이지는 detail_ttl(목록 상태))"""
         try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            with profiler.stage("fetch"):
+                response = self.http_cache.get(self.session, url, ttl=ttl, timeout=15)
+                response.raise_for_status()
+            if not response.from_cache:
+                profiler.add_bytes(len(response.content))
             response.encoding = 'utf-8'
             return response.text
         except requests.RequestException as e:
-            print(f"❌ 페이지 로딩 실패 ({url}): {e}")
+            log.warning("❌ 페이지 로딩 실패 (%s): %s", url, e)
             return None
 
     def extract_details_from_urls(self, url_list, delay=1.5):
@@ -287,41 +338,55 @@ class IntegratedNedrugScraper:
         all_data = []
         failed_urls = []
         
-        for i, link_info in enumerate(url_list, 1):
-            url = link_info['url']
-            title = link_info['title']
-            
-            print(f"📋 처리 중... ({i:4d}/{len(url_list)}) {title[:45]}...")
-            
-            html_content = self.get_page_content(url)
-            if html_content:
-                detail_info = self.extract_detail_content(html_content, url)
-                if detail_info['detail_content'] or detail_info['title']:
-                    detail_info['original_title'] = title
-                    detail_info['sequence'] = link_info['sequence']
-                    all_data.append(detail_info)
-                    print(f"     ✅ 완료")
+        with ProgressBar(total=len(url_list), desc="📋 상세") as progress:
+            for i, link_info in enumerate(url_list, 1):
+                url = link_info['url']
+                title = link_info['title']
+            
+                log.debug("📋 처리 중... (%4d/%s) %s...", i, len(url_list), title[:45])
+            
+                html_content = self.get_page_content(url, detail_ttl(link_info['status']))
+                if html_content:
+                    detail_info = self.extract_detail_content(html_content, url)
+                    if detail_info['detail_content'] or detail_info['title']:
+                        detail_info['original_title'] = title
+                        detail_info['sequence'] = link_info['sequence']
+                        all_data.append(detail_info)
+                        profiler.add_items()
+                        log.debug("     ✅ 완료")
+                        progress.update(ok=True)
+                    else:
+                        log.warning("     ⚠️ 내용 없음: %s", url)
+                        self.http_cache.invalidate(url)  # 해석 못 한 페이지는 캐시에 남기지 않음
+                        failed_urls.append(url)
+                        self.retry_queue.failed("detail", url, self._detail_payload(link_info), "내용 없음")
+                        progress.update(ok=False)
                 else:
-                    print(f"     ⚠️ 내용 없음")
+                    log.warning("     ❌ 실패: %s", url)
                     failed_urls.append(url)
-            else:
-                print(f"     ❌ 실패")
-                failed_urls.append(url)
-            
-            # 서버 부하 방지를 위한 지연
-            if i < len(url_list):
-                time.sleep(delay)
-            
-            # 진행 상황 중간 보고
-            if i % 50 == 0:
-                success_rate = len(all_data) / i * 100
-                remaining_time = (len(url_list) - i) * delay / 60
-                print(f"\n📊 중간 진행 상황:")
-                print(f"   진행률: {i}/{len(url_list)} ({i/len(url_list)*100:.1f}%)")
-                print(f"   성공: {len(all_data)}개, 실패: {len(failed_urls)}개")
-                print(f"   성공률: {success_rate:.1f}%")
-                print(f"   남은 시간: 약 {remaining_time:.1f}분")
-                print("-" * 80)
+                    self.retry_queue.failed("detail", url, self._detail_payload(link_info), "페이지 로딩 실패")
+                    progress.update(ok=False)
+            
+                # 서버 부하 방지를 위한 지연
+                if i < len(url_list):
+                    time.sleep(delay)
+            
+                # 진행 상황 중간 보고
+                if i % 50 == 0:
+                    success_rate = len(all_data) / i * 100
+                    remaining_time = (len(url_list) - i) * delay / 60
+                    log.info("\n📊 중간 진행 상황:")
+                    log.info("   진행률: %s/%s (%.1f%%)", i, len(url_list), i/len(url_list)*100)
+                    log.info("   성공: %s개, 실패: %s개", len(all_data), len(failed_urls))
+                    log.info("   성공률: %.1f%%", success_rate)
+                    log.info("   남은 시간: 약 %.1f분", remaining_time)
+                    log.info("-" * 80)
+        
+        # 실패한 상세 페이지는 백오프 후 다시 시도 (끝까지 실패한 것만 failed_urls 에 남음)
+        retried = self.retry_queue.run(lambda task: self._retry_detail(task, all_data))
+        if retried:
+            retried_urls = {task.key for task in retried}
+            failed_urls = [url for url in failed_urls if url not in retried_urls]
         
         print("\n" + "=" * 80)
         print(f"🎉 상세 내용 추출 완료!")
@@ -332,41 +397,59 @@ class IntegratedNedrugScraper:
         
         return all_data, failed_urls
 
+    @staticmethod
+    def _detail_payload(link_info):
+        return {'url': link_info['url'], 'title': link_info['title'], 'sequence': link_info['sequence'],
+                'status': link_info['status']}
+
+    def _retry_detail(self, task, all_data):
+        """재시도 큐의 상세 페이지 한 건 다시 처리 (성공하면 all_data 에 추가)
+
+        캐시 항목을 먼저 지워 재시도마다 네트워크에서 새로 받습니다.
+        """
+        url = task.payload['url']
+        self.http_cache.invalidate(url)
+        html_content = self.get_page_content(url, detail_ttl(task.payload.get('status')))
+        if not html_content:
+            return False
+        detail_info = self.extract_detail_content(html_content, url)
+        if not (detail_info['detail_content'] or detail_info['title']):
+            self.http_cache.invalidate(url)
+            return False
+        detail_info['original_title'] = task.payload['title']
+        detail_info['sequence'] = task.payload['sequence']
+        all_data.append(detail_info)
+        profiler.add_items()
+        log.info("   ✅ 재시도 성공: %s", url)
+        return True
+
     # ==================== 3단계: 결과 저장 ====================
     
+    @profiler.timed("report")
     def save_to_file(self, data_list, filename="detail_context.txt"):
         """추출한 데이터를 파일로 저장"""
         try:
-            # 순번으로 정렬
-            try:
-                data_sorted = sorted(data_list, key=lambda x: int(x['sequence']) if x['sequence'].isdigit() else 0)
-            except:
-                data_sorted = data_list
-            
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write("의약품안전나라 변경명령 상세정보\n")
-                f.write(f"수집 일시: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 80 + "\n\n")
-                
-                for i, data in enumerate(data_sorted, 1):
-                    title = data.get('original_title') or data.get('title', '제목 없음')
-                    
-                    f.write(f"{data.get('sequence', i)}. {title}\n")
-                    f.write(f"URL: {data['url']}\n")
-                    f.write("-" * 80 + "\n")
-                    
-                    if data['detail_content']:
-                        f.write(f"{data['detail_content']}\n")
-                    else:
-                        f.write("내용을 찾을 수 없습니다.\n")
-                    
-                    f.write("\n" + "=" * 80 + "\n\n")
+                write_detail_text(f, data_list)
                     
             print(f"💾 상세 내용이 {filename} 파일에 저장되었습니다.")
             
         except Exception as e:
             print(f"❌ 파일 저장 중 오류 발생: {e}")
 
+    @profiler.timed("report")
+    def save_to_archive(self, data_list, directory=None):
+        """상세 내용을 압축 보관소(detail_archive)에 추가 (바뀐 항목만 기록)"""
+        try:
+            with DetailArchive(directory) as archive:
+                for data in data_list:
+                    title = data.get('original_title') or data.get('title', '')
+                    archive.append(item_key(data['url'], title), data)
+            print(f"📦 상세 내용 보관소 갱신: {archive.appended}건 추가/변경, {archive.unchanged}건 변경 없음 ({archive.directory})")
+        except OSError as e:
+            print(f"❌ 보관소 저장 중 오류 발생: {e}")
+
+    @profiler.timed("report")
     def save_urls_to_file(self, links, filename='nedrug_links.txt'):
         """URL 리스트를 파일로 저장 (백업용)"""
         try:
@@ -391,6 +474,19 @@ class IntegratedNedrugScraper:
         except Exception as e:
             print(f"❌ URL 파일 저장 중 오류 발생: {e}")
 
+    @profiler.timed("index")
+    def update_search_index(self, data_list, db_path=None):
+        """상세 내용을 전문 검색 인덱스에 반영 (바뀐 문서만 갱신)"""
+        try:
+            with SearchIndex(db_path) as index:
+                with index.batch():
+                    for data in data_list:
+                        title = data.get('original_title') or data.get('title', '')
+                        index.add_detail(item_key(data['url'], title), data['url'], title, data['detail_content'])
+                print(f"🔎 검색 인덱스 갱신: {index.added}건 추가/변경, {index.unchanged}건 변경 없음 ({index.path})")
+        except sqlite3.Error as e:
+            print(f"❌ 검색 인덱스 갱신 중 오류 발생: {e}")
+
     def save_failed_urls(self, failed_urls, filename="failed_urls.txt"):
         """실패한 URL들 저장"""
         if failed_urls:
@@ -433,11 +529,20 @@ class IntegratedNedrugScraper:
             # 3단계: 결과 저장
             print(f"\n[3단계] 결과 저장 중...")
             if detail_data:
-                self.save_to_file(detail_data)
+                self.save_to_archive(detail_data)
+                if os.environ.get("NEDRUG_DETAIL_TEXT", "1").lower() not in ("0", "false", "off", "no"):
+                    self.save_to_file(detail_data)
+                self.update_search_index(detail_data)
             
             if failed_urls:
                 self.save_failed_urls(failed_urls)
             
+            # 실행 프로파일 저장
+            profiler.count("links_collected", len(all_links))
+            profiler.count("details_failed", len(failed_urls))
+            profiler.print_summary()
+            profiler.write_report("run_profile_url_beta")
+            
             # 최종 결과 보고
             print("\n" + "=" * 80)
             print("🎉 스크래핑 완료!")
@@ -448,10 +553,15 @@ class IntegratedNedrugScraper:
             print(f"📈 성공률: {len(detail_data)/(len(all_links))*100:.1f}%")
             print("=" * 80)
             print("📁 생성된 파일:")
-            print("   - detail_context.txt: 상세 내용 (메인 결과)")
+            print("   - detail_context.txt: 상세 내용 (메인 결과, NEDRUG_DETAIL_TEXT=0 이면 생략)")
+            print("   - detail_archive/: 상세 내용 압축 보관소 (python nedrug_archive.py export|get|stats)")
             print("   - nedrug_links.txt: URL 목록 (백업)")
+            print("   - nedrug_search.db: 전문 검색 인덱스 (python nedrug_search.py query <검색어>)")
             if failed_urls:
                 print("   - failed_urls.txt: 실패한 URL 목록")
+            if self.retry_queue.dead:
+                print(f"   - {self.retry_queue.dead_letters.path}: 재시도해도 실패한 작업 (--retry-failed 로 다시 처리)")
+            print("   - run_profile_url_beta.json/.csv: 단계별 소요 시간")
             print("=" * 80)
             
             return detail_data
@@ -461,15 +571,65 @@ class IntegratedNedrugScraper:
         except Exception as e:
             print(f"❌ 오류 발생: {e}")
 
-def main():
+    def retry_failed(self, detail_delay=1.5):
+        """
+        실패 보관소(failed_tasks.jsonl)에 남은 목록 페이지/상세 페이지만 다시 처리
+
+        성공한 항목은 보관소/검색 인덱스에 추가되고 detail_context.txt 는 보관소 전체에서 다시 만듭니다.
+        이번에도 실패한 작업은 보관소 파일에 다시 남습니다.
+        """
+        store = self.retry_queue.dead_letters
+        tasks = store.pending(("list_page", "detail"))
+        if not tasks:
+            print(f"✅ 다시 처리할 실패 작업이 없습니다. ({store.path})")
+            return []
+        print(f"🔁 실패 작업 {len(tasks)}건 다시 처리 ({store.path})")
+        for task in tasks:
+            store.resolve(task.kind, task.key)  # 이번에도 실패하면 새로 기록됨
+
+        links = [LinkRecord(sequence=task.payload['sequence'], title=task.payload['title'],
+                            url=task.payload['url'], page=0, status=task.payload.get('status', ''))
+                 for task in tasks if task.kind == "detail"]
+        for task in tasks:
+            if task.kind == "list_page" and not self._retry_list_page(task, links):
+                self.retry_queue.failed(task.kind, task.key, task.payload, "페이지 로딩 실패")
+        self.retry_queue.run(lambda task: self._retry_list_page(task, links))
+        # 마지막 페이지 뒤의 번호를 다시 받으면 이미 보관한 항목이 나오므로 제외
+        archived = DetailArchive().entries
+        links = [link for link in links if item_key(link['url'], link['title']) not in archived]
+
+        detail_data, failed_urls = self.extract_details_from_urls(links, detail_delay)
+        if detail_data:
+            self.save_to_archive(detail_data)
+            if os.environ.get("NEDRUG_DETAIL_TEXT", "1").lower() not in ("0", "false", "off", "no"):
+                count = DetailArchive().export_text("detail_context.txt")
+                print(f"💾 보관소 전체 {count}건으로 detail_context.txt 를 다시 만들었습니다.")
+            self.update_search_index(detail_data)
+        remaining = store.compact()
+        print(f"🔁 재처리 결과: 성공 {len(detail_data)}건, 남은 실패 작업 {remaining}건")
+        return detail_data
+
+def main(argv=None):
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="의약품안전나라 통합 스크래퍼")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help=f"지난 실행에서 재시도해도 실패한 작업({DEAD_LETTER_FILENAME})만 다시 처리")
+    args = parser.parse_args(argv)
+
+    setup_logging()
     print("🔧 의약품안전나라 통합 스크래퍼")
     print("⚡ 항상 최신 URL부터 수집하여 당일 업데이트된 정보를 확보합니다.")
     
     scraper = IntegratedNedrugScraper()
+    metrics_server = start_metrics_server()  # NEDRUG_METRICS_PORT 가 있을 때만
     
-    # 전체 프로세스 실행 (항상 새로운 URL 수집부터 시작)
-    data = scraper.run_complete_process(detail_delay=1.5)
+    if args.retry_failed:
+        data = scraper.retry_failed(detail_delay=1.5)
+    else:
+        # 전체 프로세스 실행 (항상 새로운 URL 수집부터 시작)
+        data = scraper.run_complete_process(detail_delay=1.5)
+    if metrics_server:
+        metrics_server.stop()
     
     if data:
         print(f"\n🎊 총 {len(data)}개의 문서가 성공적으로 처리되었습니다!")